@@ -0,0 +1,8 @@
+"""
+iHelper.tech build benchmarks
+"""
+
+from .corpus import generate_corpus, SCALES
+from .suite import BenchmarkSuite, compare_results
+
+__all__ = ['generate_corpus', 'SCALES', 'BenchmarkSuite', 'compare_results']
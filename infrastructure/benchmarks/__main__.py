@@ -0,0 +1,93 @@
+"""
+Benchmark CLI
+
+    python -m infrastructure.benchmarks generate /tmp/corpus --scale medium
+    python -m infrastructure.benchmarks run --scale small --output results.json
+    python -m infrastructure.benchmarks compare baseline.json results.json
+"""
+
+import sys
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+from .corpus import SCALES, generate_corpus
+from .suite import BenchmarkSuite, compare_results, load_results, save_results
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _sections(args) -> int:
+    return args.sections if args.sections else SCALES[args.scale]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the iHelper.tech build pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generate', help='Create a synthetic library')
+    generate.add_argument('output', help='Directory to create (replaced if it exists)')
+
+    run = subparsers.add_parser('run', help='Run the benchmarks and write JSON results')
+    run.add_argument('--corpus', help='Existing corpus to use instead of generating one')
+    run.add_argument('--output', default='benchmark_results.json', help='Results file')
+    run.add_argument('--repeat', type=int, default=3, help='Runs per benchmark')
+    run.add_argument('--sample', type=int, default=200,
+                     help='Sections timed by the per-page benchmarks')
+    run.add_argument('--only', nargs='+', choices=BenchmarkSuite.BENCHMARKS,
+                     help='Run only these benchmarks')
+    run.add_argument('--baseline', help='Compare against this results file afterwards')
+    run.add_argument('--threshold', type=float, default=0.10,
+                     help='Allowed slowdown before a benchmark counts as a regression')
+
+    for sub in (generate, run):
+        sub.add_argument('--scale', choices=SCALES, default='small', help='Corpus size preset')
+        sub.add_argument('--sections', type=int, help='Exact section count, overriding --scale')
+        sub.add_argument('--seed', type=int, default=0, help='Random seed for the corpus')
+
+    compare = subparsers.add_parser('compare', help='Flag regressions against a baseline')
+    compare.add_argument('baseline', help='Saved baseline results')
+    compare.add_argument('current', help='Results to check')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='Allowed slowdown before a benchmark counts as a regression')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate_corpus(Path(args.output), _sections(args), seed=args.seed)
+        return 0
+
+    if args.command == 'run':
+        # Keep per-section build logging out of the benchmark output
+        logging.getLogger('infrastructure.build').setLevel(logging.ERROR)
+        if args.corpus:
+            corpus = Path(args.corpus)
+        else:
+            corpus = Path(tempfile.mkdtemp(prefix='ihelper-bench-')) / 'corpus'
+            generate_corpus(corpus, _sections(args), seed=args.seed)
+        results = BenchmarkSuite(corpus, repeat=args.repeat, sample=args.sample).run(args.only)
+        results['environment']['seed'] = args.seed
+        save_results(results, Path(args.output))
+        logger.info(f"Wrote results to {args.output}")
+        if not args.baseline:
+            return 0
+        baseline, current = load_results(Path(args.baseline)), results
+    else:
+        baseline, current = load_results(Path(args.baseline)), load_results(Path(args.current))
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'benchmark':<24} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}  status")
+    for row in rows:
+        base = f"{row['baseline'] * 1000:.1f}" if row['baseline'] is not None else '-'
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        print(f"{row['name']:<24} {base:>12} {row['current'] * 1000:>12.1f} {ratio:>7}  {row['status']}")
+    return 1 if any(row['status'] == 'regression' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
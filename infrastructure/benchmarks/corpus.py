@@ -0,0 +1,190 @@
+"""
+Corpus Generator - Builds synthetic libraries in the repository layout for benchmarking
+"""
+
+import json
+import random
+import shutil
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Optional imports
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Named corpus sizes used by the benchmark CLI
+SCALES = {'small': 50, 'medium': 1000, 'large': 10000}
+
+WORDS = (
+    'library resource guide template workflow automation marketing strategy content '
+    'analysis design review prompt model data pipeline process team project goal '
+    'metric feedback learning tutorial example practice system network growth email '
+    'social audience campaign research summary framework checklist planning tool'
+).split()
+
+# Fixed timestamp so generated configs, and everything built from them, are reproducible
+GENERATED_AT = datetime(2025, 1, 1).isoformat()
+
+# README size classes (paragraph count range) and how often each occurs
+SIZE_CLASSES = [((2, 4), 0.6), ((10, 20), 0.3), ((60, 120), 0.1)]
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + '.'
+
+
+def _paragraph(rng: random.Random) -> str:
+    return ' '.join(_sentence(rng, rng.randint(8, 16)) for _ in range(rng.randint(2, 6)))
+
+
+def _table(rng: random.Random) -> str:
+    columns = rng.randint(3, 5)
+    header = '| ' + ' | '.join(rng.choice(WORDS).title() for _ in range(columns)) + ' |'
+    divider = '|' + '---|' * columns
+    rows = ['| ' + ' | '.join(rng.choice(WORDS) for _ in range(columns)) + ' |'
+            for _ in range(rng.randint(3, 12))]
+    return '\n'.join([header, divider] + rows)
+
+
+def _section_config(section_id: str, title: str, description: str, keywords: List[str]) -> Dict:
+    """Mirror the section_config.json layout used by real sections"""
+    return {
+        "version": "1.0.0",
+        "template": {
+            "type": "standard",
+            "slots": {
+                "meta": {
+                    "title": title,
+                    "description": description,
+                    "keywords": keywords,
+                    "subtitle": f"Essential Resources for {title}",
+                    "breadcrumb": title
+                },
+                "navigation": {"type": "auto", "sections": []},
+                "content": {
+                    "source": "README.md",
+                    "processors": ["markdown", "directives", "resources"]
+                },
+                "resources": {
+                    "include": ["*.md", "*.pdf", "*.ipynb"],
+                    "exclude": ["README.md", "SEO.md"]
+                },
+                "footer": {"type": "standard"}
+            }
+        },
+        "build": {
+            "assets": {"optimize": True, "copy": ["images", "css", "js"]},
+            "validation": {"required": ["README.md", "SEO.md"], "schema": "standard"}
+        },
+        "metadata": {
+            "section_id": section_id,
+            "category": "",
+            "tags": keywords,
+            "created": GENERATED_AT,
+            "modified": GENERATED_AT,
+            "author": "iHelper.tech"
+        }
+    }
+
+
+def _readme(rng: random.Random, title: str, section_names: List[str], shared: List[str]) -> str:
+    (low, high), = rng.choices([size for size, _ in SIZE_CLASSES],
+                               weights=[weight for _, weight in SIZE_CLASSES])
+    parts = [f'# {title}', '', '## Introduction', '', _paragraph(rng), '']
+    for i in range(rng.randint(low, high)):
+        if i % 8 == 0:
+            parts += [f'## {_sentence(rng, 3)[:-1]}', '']
+        roll = rng.random()
+        if roll < 0.1:
+            parts += [_table(rng), '']
+        elif roll < 0.18:
+            parts += ['```python', f'def {rng.choice(WORDS)}_{i}():',
+                      f'    return "{_sentence(rng, 4)}"', '```', '']
+        elif roll < 0.25:
+            parts += [f'- {_sentence(rng, 6)}' for _ in range(rng.randint(3, 7))] + ['']
+        else:
+            parts += [_paragraph(rng), '']
+    if shared and rng.random() < 0.3:
+        parts += ['## Shared Notes', '', f'@include(file:../_shared/{rng.choice(shared)})', '']
+    if section_names:
+        links = rng.sample(section_names, min(3, len(section_names)))
+        parts += ['## Related', ''] + [f'- [{name}](../{name}/index.html)' for name in links] + ['']
+    parts += ['## Summary', '', _paragraph(rng), '']
+    return '\n'.join(parts)
+
+
+def _write_image(path: Path, rng: random.Random) -> None:
+    size = (rng.choice([320, 800, 1600]), rng.choice([240, 600, 1000]))
+    color = tuple(rng.randrange(256) for _ in range(3))
+    img = Image.new('RGB', size, color)
+    # A few stripes so the encoder has real work to do
+    for x in range(0, size[0], 16):
+        img.paste(tuple(255 - c for c in color), (x, 0, x + 4, size[1]))
+    if path.suffix == '.jpg':
+        img.save(path, quality=90)
+    else:
+        img.save(path)
+
+
+def generate_corpus(root: Path, sections: int, seed: int = 0, image_ratio: float = 0.1,
+                    template_root: Optional[Path] = None) -> Path:
+    """Create a buildable synthetic library under root and return root"""
+    root = Path(root)
+    template_root = Path(template_root) if template_root else REPO_ROOT
+    rng = random.Random(seed)
+    if root.exists():
+        shutil.rmtree(root)
+    content_dir = root / 'content' / 'sections'
+    content_dir.mkdir(parents=True)
+
+    # Reuse the real build config, templates and static assets
+    shutil.copy2(template_root / 'build_config.json', root / 'build_config.json')
+    shutil.copytree(template_root / 'config', root / 'config')
+    shutil.copytree(template_root / 'static', root / 'static')
+
+    # Fragments pulled in by @include directives
+    shared_dir = content_dir / '_shared'
+    shared_dir.mkdir()
+    shared = []
+    for i in range(max(1, sections // 20)):
+        name = f'snippet_{i}.md'
+        (shared_dir / name).write_text(f'### Note {i}\n\n{_paragraph(rng)}\n', encoding='utf-8')
+        shared.append(name)
+
+    names = []
+    for i in range(sections):
+        topic = '_'.join(rng.choice(WORDS).title() for _ in range(2))
+        # Two-digit prefix keeps the names within the builder's and enricher's patterns
+        names.append(f'{i % 49 + 1:02d}_S{i:05d}_{topic}')
+
+    for i, name in enumerate(names):
+        section_dir = content_dir / name
+        section_dir.mkdir()
+        title = name.split('_', 2)[2].replace('_', ' ')
+        keywords = title.lower().split()
+        description = _sentence(rng, 14)
+        neighbours = names[max(0, i - 20):i] + names[i + 1:i + 20]
+        (section_dir / 'README.md').write_text(_readme(rng, title, neighbours, shared), encoding='utf-8')
+        (section_dir / 'SEO.md').write_text(f'# SEO Information for {title}\n\n{description}\n', encoding='utf-8')
+        config = _section_config(name, title, description, keywords)
+        (section_dir / 'section_config.json').write_text(json.dumps(config, indent=4), encoding='utf-8')
+        if rng.random() < 0.2:
+            (section_dir / 'notes.md').write_text(_paragraph(rng), encoding='utf-8')
+        if HAS_PIL and rng.random() < image_ratio:
+            images_dir = section_dir / 'images'
+            images_dir.mkdir()
+            for j in range(rng.randint(1, 3)):
+                _write_image(images_dir / f'figure_{j}.{rng.choice(["png", "jpg"])}', rng)
+
+    logger.info(f"Generated {sections} sections in {root}")
+    return root
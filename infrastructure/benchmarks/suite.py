@@ -0,0 +1,210 @@
+"""
+Benchmark Suite - Times the build pipeline on a synthetic corpus and compares runs
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from ..build.build import Builder
+from ..build.core.content import ContentProcessor
+from ..build.core.content.chunked_markdown import ChunkedMarkdown, ChunkedMarkdownRenderer
+from ..build.core.metadata import MetadataEnricher
+from ..build.core.assets.html_minifier import minify
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+
+
+class BenchmarkSuite:
+    """Runs each benchmark several times against one corpus"""
+
+    # Order matters: warm and incremental builds reuse the cold build's output
+    BENCHMARKS = ('build_cold', 'build_warm', 'build_incremental', 'process_markdown', 'markdown_long',
+                  'minify_html', 'enrich_metadata_cold', 'enrich_metadata_warm', 'related_sections')
+
+    def __init__(self, corpus_root: Path, repeat: int = 3, sample: int = 200):
+        self.root = Path(corpus_root)
+        self.repeat = repeat
+        # Per-page benchmarks time this many sections so large corpora stay practical
+        self.sample = sample
+        self.content_dir = self.root / 'content' / 'sections'
+        self.build_dir = self.root / 'build'
+        self._edits = 0
+
+    def _sections(self) -> List[Path]:
+        return sorted(d for d in self.content_dir.iterdir()
+                      if d.is_dir() and Builder.SECTION_PATTERN.match(d.name))
+
+    def _time(self, fn: Callable[[], None], setup: Optional[Callable[[], None]] = None) -> List[float]:
+        runs = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - start)
+        return runs
+
+    def _clear_build(self) -> None:
+        for path in (self.build_dir, self.root / '.cache'):
+            if path.exists():
+                shutil.rmtree(path)
+
+    def _edit_one_section(self) -> None:
+        self._edits += 1
+        readme = self._sections()[0] / 'README.md'
+        with open(readme, 'a', encoding='utf-8') as f:
+            f.write(f'\nBenchmark edit {self._edits}.\n')
+
+    def bench_build_cold(self) -> Dict:
+        return {'runs': self._time(lambda: Builder(self.root).build(), self._clear_build),
+                'items': len(self._sections())}
+
+    def bench_build_warm(self) -> Dict:
+        return {'runs': self._time(lambda: Builder(self.root).build()), 'items': len(self._sections())}
+
+    def bench_build_incremental(self) -> Dict:
+        return {'runs': self._time(lambda: Builder(self.root).build(), self._edit_one_section), 'items': 1}
+
+    def bench_process_markdown(self) -> Dict:
+        sections = self._sections()[:self.sample]
+
+        def run():
+            # A fresh uncached processor each run, so markdown2 does the work every time
+            processor = ContentProcessor(self.content_dir)
+            for section_dir in sections:
+                processor.process_markdown(section_dir)
+        return {'runs': self._time(run), 'items': len(sections)}
+
+    def bench_markdown_long(self) -> Dict:
+        # One very long document made of the sample READMEs, rendered in chunks
+        document = '\n\n'.join((d / 'README.md').read_text(encoding='utf-8')
+                                 for d in self._sections()[:self.sample])
+        renderer = ChunkedMarkdownRenderer(ContentProcessor(self.content_dir).markdown_extensions,
+                                           min_size=0)
+        try:
+            if renderer.render(document) != ChunkedMarkdown(extras=renderer.extras).convert(document):
+                raise RuntimeError("Chunked rendering differs from a single pass")
+            return {'runs': self._time(lambda: renderer.render(document)), 'items': len(document)}
+        finally:
+            renderer.close()
+
+    def bench_minify_html(self) -> Dict:
+        pages = [d / 'index.html' for d in sorted(self.build_dir.iterdir())
+                 if (d / 'index.html').exists()][:self.sample]
+        documents = [page.read_text(encoding='utf-8') for page in pages]
+
+        def run():
+            for document in documents:
+                minify(document)
+        return {'runs': self._time(run), 'items': len(documents)}
+
+    def _enricher(self) -> MetadataEnricher:
+        return MetadataEnricher(str(self.content_dir), cache_dir=str(self.root / '.cache' / 'metadata'))
+
+    def _clear_enricher_cache(self) -> None:
+        cache = Path(self._enricher().cache_file)
+        if cache.exists():
+            cache.unlink()
+
+    def bench_enrich_metadata_cold(self) -> Dict:
+        return {'runs': self._time(lambda: self._enricher().enrich_library_metadata(),
+                                   self._clear_enricher_cache),
+                'items': len(self._sections())}
+
+    def bench_enrich_metadata_warm(self) -> Dict:
+        return {'runs': self._time(lambda: self._enricher().enrich_library_metadata()),
+                'items': len(self._sections())}
+
+    def bench_related_sections(self) -> Dict:
+        builder = Builder(self.root)
+        sections = self._sections()
+        # Prime the term cache so runs time the similarity and navigation work
+        builder.build_navigation(sections)
+        return {'runs': self._time(lambda: builder.build_navigation(sections)), 'items': len(sections)}
+
+    def run(self, only: Optional[List[str]] = None) -> Dict:
+        """Run the selected benchmarks and return a results document"""
+        selected = [name for name in self.BENCHMARKS if not only or name in only]
+        if any(name.startswith(('build_warm', 'build_incremental', 'minify')) for name in selected) \
+                and not (self.build_dir / 'index.html').exists() and 'build_cold' not in selected:
+            # These need rendered output to start from
+            Builder(self.root).build()
+
+        results = {}
+        for name in selected:
+            logger.info(f"Running {name}...")
+            result = getattr(self, f'bench_{name}')()
+            if result is None:
+                continue
+            runs = result['runs']
+            results[name] = {
+                'runs': runs,
+                'min': min(runs),
+                'median': statistics.median(runs),
+                'mean': statistics.fmean(runs),
+                'items': result['items']
+            }
+            logger.info(f"{name}: median {results[name]['median'] * 1000:.1f} ms")
+        return {'version': RESULTS_VERSION, 'environment': self._environment(), 'results': results}
+
+    def _environment(self) -> Dict:
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'commit': _git_commit(),
+            'sections': len(self._sections()),
+            'repeat': self.repeat
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[Dict]:
+    """Compare median times, marking benchmarks slower than baseline by more than threshold"""
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append({'name': name, 'baseline': None, 'current': result['median'],
+                         'ratio': None, 'status': 'new'})
+            continue
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': base['median'], 'current': result['median'],
+                     'ratio': ratio, 'status': status})
+    return rows
+
+
+def load_results(path: Path) -> Dict:
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def save_results(results: Dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding='utf-8')
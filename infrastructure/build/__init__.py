@@ -1,12 +1,26 @@
 """
 iHelper.tech Build System Package
+
+Subsystems load on first use, so `python -m infrastructure.build` starts
+without importing the renderers a command doesn't need.
 """
 
-from .build import build_site
-from .content_processor import ContentProcessor
-from .metadata_manager import MetadataManager
-from .section_manager import SectionManager
-from .template_generator import TemplateGenerator
-from .template_validator import TemplateValidator
+from .core.lazy import lazy_exports
 
 __version__ = "2.0.0"
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Builder': '.build',
+    'BuildError': '.build',
+    'ContentProcessor': '.core.content',
+    'MetadataManager': '.core.metadata',
+    'SectionManager': '.core.section'
+})
+
+__all__ = [
+    'Builder',
+    'BuildError',
+    'ContentProcessor',
+    'MetadataManager',
+    'SectionManager'
+]
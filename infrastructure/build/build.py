@@ -6,34 +6,37 @@ Build System for iHelper.tech Knowledge Library
 import os
 import json
 import shutil
+import time
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import re
+import html
 from datetime import datetime
-import markdown2
-import jinja2
-from PIL import Image
+from markupsafe import Markup
 
-from .core.content import ContentProcessor
+from .core.content import ContentProcessor, DependencyGraph, LinkGraph, SiteIndex
+from .core.content.markdown_preprocessor import Heading
 from .core.metadata import MetadataManager
 from .core.section import SectionManager
-from .core.template import TemplateGenerator, TemplateValidator
+from .core.manifest import BuildManifest, hash_files
+from .core.vfs import SnapshotFS
+from .core.search import SearchIndexer
+from .core.navigation import RelatedSections, SectionTerms, SiteNavigation
+from .core.metadata.metadata_enricher import category_for_prefix
+from .core.profiling import profiler, span, count
+from .core.assets import AssetBundler
+from .core.assets.html_minifier import HtmlMinifier
 from .core.utils import validate_links, check_html_links
 
-# Optional imports
-try:
-    import csscompressor
-    HAS_CSSCOMPRESSOR = True
-except ImportError:
-    HAS_CSSCOMPRESSOR = False
-    
-try:
-    import htmlmin
-    HAS_HTMLMIN = True
-except ImportError:
-    HAS_HTMLMIN = False
+# Jinja, Pillow, brotli and the template tools load with the first stage that needs them
+if TYPE_CHECKING:
+    import jinja2
+    from .core.assets import ImagePipeline, Precompressor
+    from .core.template import TemplateGenerator, TemplateValidator
 
 # Set up logging
 logging.basicConfig(
@@ -51,27 +54,150 @@ class BuildError(Exception):
     pass
 
 class Builder:
-    def __init__(self, root_path: str):
+    DEPENDENCY_GRAPH_FILE = '.dependency_graph.json'
+    LINK_GRAPH_FILE = 'link_graph.json'
+    # Build state once written inside the build directory, removed so it is never deployed
+    LEGACY_STATE_FILES = ('.build_manifest.json', '.dependency_graph.json',
+                          '.precompress_manifest.json', 'search/.index_state.json')
+    SECTION_PATTERN = re.compile(r'^\d{2}_\w+')
+    # Section files listed under Additional Resources on the page
+    RESOURCE_PATTERNS = ('*.md', '*.pdf', '*.ipynb', '*.docx', '*.xlsx', '*.pptx', '*.zip')
+    # Templates under this directory are site-wide and rendered once per build
+    PARTIALS_DIR = 'partials'
+    # Page output is streamed, so only this much is held before hitting the file
+    WRITE_BUFFER = 64 * 1024
+    # Broken links beyond this many pages or URLs are only in the link report
+    MAX_LINK_WARNINGS = 20
+    
+    def __init__(self, root_path: str, executor: Optional[str] = None,
+                 profile: bool = False, cprofile_dir: Optional[str] = None):
         self.root_path = Path(root_path)
+        # Span timings are gathered only when asked for; cProfile dumps are separate and opt-in
+        self.profile = profile
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        if profile:
+            profiler.enable()
+        if self.cprofile_dir is not None:
+            self.cprofile_dir.mkdir(parents=True, exist_ok=True)
         self.config = self._load_config()
         self.build_dir = self.root_path / self.config['build']['output_dir']
         self.static_dir = self.root_path / self.config['build']['static_dir']
-        self.templates_dir = self.root_path / self.config['build']['templates_dir']
+        self.templates_dir = self.root_path / self.config['build']['template_dir']
+        self.content_dir = self.root_path / self.config['build']['content_dir']
+        cache_config = self.config.get('cache', {})
+        self.cache_dir = self.root_path / cache_config.get('dir', '.cache')
+        # Incremental build state lives outside the build directory, which is deployed as-is
+        self.state_dir = self.cache_dir / 'state'
+        
+        # Fingerprinted bundles, resolved in templates through asset_url()
+        self.asset_bundler = AssetBundler(self.root_path, self.build_dir / 'static', self.config['assets'])
+        
+        self.page_template: Optional['jinja2.Template'] = None
+        # Rendered partials by template name, shared with worker processes
+        self.fragments: Dict[str, str] = {}
+        
+        # Shared stat-validated reads for the builder and its components
+        self.fs = SnapshotFS(cache_config.get('snapshot_max_bytes', 64 * 1024 * 1024))
+        
+        # Initialize components
+        self.max_workers = self.config["build"].get("max_workers") or os.cpu_count()
+        self.content_processor = ContentProcessor(
+            self.content_dir,
+            cache_dir=self.cache_dir / 'markdown',
+            cache_max_bytes=cache_config.get('markdown_max_bytes', 100 * 1024 * 1024),
+            fs=self.fs,
+            chunk_workers=self.max_workers,
+            chunk_min_bytes=self.config.get('content', {}).get('chunk_min_bytes', 64 * 1024)
+        )
+        metadata_config = self.config.get('metadata', {})
+        self.metadata_manager = MetadataManager(
+            self.content_dir,
+            fs=self.fs,
+            max_workers=self.max_workers,
+            backend=metadata_config.get('backend', 'json')
+        )
+        self.section_manager = SectionManager(self.content_dir)
         
-        # Set up Jinja2 environment
-        self.jinja_env = jinja2.Environment(
+        search_config = self.config.get('search', {})
+        self.search_indexer = SearchIndexer(
+            self.build_dir / 'search',
+            self.cache_dir / 'search',
+            prefix_length=search_config.get('shard_prefix_length', 2)
+        ) if search_config.get('enabled', True) else None
+        navigation_config = self.config.get('navigation', {})
+        self.related_sections = RelatedSections(
+            top_k=navigation_config.get('related_count', 5),
+            max_features=navigation_config.get('max_features', 1024)
+        )
+        self.section_terms = SectionTerms(self.cache_dir / 'navigation' / 'terms.json')
+        self.links_config = self.config.get('links', {})
+        self.check_external_links = self.config.get('security', {}).get('validate_external_links', False)
+        self.navigation: Optional[SiteNavigation] = None
+        self.executor = executor or self.config["build"].get("executor", "thread")
+        if self.executor not in ('thread', 'process'):
+            raise BuildError(f"Unknown executor: {self.executor}")
+    
+    @cached_property
+    def jinja_env(self) -> 'jinja2.Environment':
+        """Jinja2 environment; compiled templates persist across runs and worker processes"""
+        import jinja2
+        jinja_cache_dir = self.cache_dir / 'jinja'
+        jinja_cache_dir.mkdir(parents=True, exist_ok=True)
+        env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(str(self.templates_dir)),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
+            autoescape=jinja2.select_autoescape(['html', 'xml']),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(str(jinja_cache_dir))
         )
+        env.globals['asset_url'] = self.asset_bundler.url
+        env.globals['has_asset'] = self.asset_bundler.has_asset
+        env.globals['sitewide'] = self.sitewide_fragment
+        env.globals['site_categories'] = self.site_categories
+        return env
         
-        # Initialize components
-        self.content_processor = ContentProcessor(self.config)
-        self.metadata_manager = MetadataManager(self.config)
-        self.section_manager = SectionManager(self.config)
-        self.template_generator = TemplateGenerator(self.config)
-        self.template_validator = TemplateValidator(self.config)
+    @cached_property
+    def image_pipeline(self) -> 'ImagePipeline':
+        """Image stage, created on first use so Pillow loads only when images are processed"""
+        from .core.assets import ImagePipeline
+        assets_config = self.config['assets']
+        return ImagePipeline(
+            self.cache_dir / 'images',
+            max_width=assets_config.get('image_max_width', 1200),
+            max_size=assets_config.get('image_max_size', 500000),
+            webp=assets_config.get('generate_webp', True),
+            max_workers=self.max_workers
+        )
+        
+    @cached_property
+    def precompressor(self) -> Optional['Precompressor']:
+        """Precompression stage, created on first use so brotli loads only when outputs are compressed"""
+        assets_config = self.config['assets']
+        if not assets_config.get('precompress', True):
+            return None
+        from .core.assets import Precompressor
+        return Precompressor(
+            self.build_dir,
+            use_brotli=assets_config.get('brotli', True),
+            max_workers=self.max_workers,
+            state_dir=self.state_dir
+        )
+        
+    @cached_property
+    def template_generator(self) -> Optional['TemplateGenerator']:
+        """Section template generator, created on first use; None without the optional template tools"""
+        try:
+            from .core.template import TemplateGenerator
+        except ImportError:
+            return None
+        return TemplateGenerator(self.config)
         
-        self.max_workers = self.config["build"].get("max_workers", 4)
+    @cached_property
+    def template_validator(self) -> Optional['TemplateValidator']:
+        """Section template validator, created on first use; None without the optional template tools"""
+        try:
+            from .core.template import TemplateValidator
+        except ImportError:
+            return None
+        return TemplateValidator(self.config)
     
     def _load_config(self) -> Dict:
         """Load build configuration"""
@@ -86,113 +212,161 @@ class Builder:
             shutil.rmtree(self.build_dir)
         self.build_dir.mkdir(parents=True)
         
-    def copy_static_assets(self) -> None:
-        """Copy and optimize static assets"""
-        static_build_dir = self.build_dir / 'static'
-        static_build_dir.mkdir(exist_ok=True)
-        
-        # Copy CSS files
-        css_dir = static_build_dir / 'css'
-        css_dir.mkdir(exist_ok=True)
-        for css_file in self.config['build']['assets']['css']:
-            src = self.static_dir / 'css' / css_file
-            dst = css_dir / css_file
-            if src.exists():
-                if self.config['build']['assets']['optimize'] and HAS_CSSCOMPRESSOR:
-                    css_content = src.read_text(encoding='utf-8')
-                    minified = csscompressor.compress(css_content)
-                    dst.write_text(minified, encoding='utf-8')
-                else:
-                    shutil.copy2(src, dst)
-                    
-        # Copy JS files
-        js_dir = static_build_dir / 'js'
-        js_dir.mkdir(exist_ok=True)
-        for js_file in self.config['build']['assets']['js']:
-            src = self.static_dir / 'js' / js_file
-            dst = js_dir / js_file
-            if src.exists():
-                shutil.copy2(src, dst)
+    def copy_static_assets(self) -> bool:
+        """Bundle static assets, returning whether their fingerprinted URLs changed"""
+        return self.asset_bundler.bundle()
                 
-    def process_section(self, section_dir: Path) -> None:
-        """Process a single section"""
+    def precompile_templates(self) -> int:
+        """Compile every template into the bytecode cache and keep the page template loaded"""
+        names = self.jinja_env.list_templates(extensions=['html'])
+        for name in names:
+            self.jinja_env.get_template(name)
+        self.page_template = self.jinja_env.get_template('base.html')
+        return len(names)
+        
+    def render_fragments(self) -> None:
+        """Render the site-wide partials once for this build"""
+        self.fragments = {
+            name: self.jinja_env.get_template(name).render()
+            for name in self.jinja_env.list_templates(extensions=['html'])
+            if name.startswith(f'{self.PARTIALS_DIR}/')
+        }
+        
+    def sitewide_fragment(self, name: str) -> Markup:
+        """Template global returning a partial that renders identically on every page"""
+        fragment = self.fragments.get(name)
+        if fragment is None:
+            # Rendering a section outside build() fills the cache on first use
+            fragment = self.fragments[name] = self.jinja_env.get_template(name).render()
+        return Markup(fragment)
+        
+    def site_categories(self) -> List[Dict[str, str]]:
+        """Template global listing the site's categories"""
+        return self.navigation.category_links() if self.navigation is not None else []
+        
+    def _navigation_source(self, section_dir: Path) -> Dict[str, str]:
+        """Read what the navigation stage needs from one section"""
+        config_path = section_dir / 'section_config.json'
+        section_config = json.loads(self.fs.read_text(config_path)) if self.fs.exists(config_path) else {}
+        meta = section_config.get('template', {}).get('slots', {}).get('meta', {})
+        readme_path = section_dir / 'README.md'
+        return {
+            'name': section_dir.name,
+            'title': meta.get('title') or section_dir.name.split('_', 1)[-1].replace('_', ' '),
+            'category': (section_config.get('metadata', {}).get('category')
+                         or category_for_prefix(section_dir.name.split('_')[0])),
+            'text': self.fs.read_text(readme_path) if self.fs.exists(readme_path) else ''
+        }
+        
+    def build_navigation(self, sections: List[Path]) -> SiteNavigation:
+        """Compute related sections and the site navigation once for this build"""
+        # Reads go through the snapshot layer, so input hashing reuses them
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            sources = list(executor.map(self._navigation_source, sections))
+        terms = self.section_terms.collect({source['name']: source for source in sources})
+        related = self.related_sections.compute(terms)
+        return SiteNavigation.build(sources, related)
+        
+    def _use_navigation(self, navigation: Optional[SiteNavigation]) -> None:
+        """Make a navigation available to templates and metadata"""
+        self.navigation = navigation
+        self.content_processor.related_sections = (
+            {name: navigation.related_ids(name) for name in navigation.pages}
+            if navigation is not None else {}
+        )
+        
+    def process_section(self, section_dir: Path) -> bool:
+        """Process a single section, returning whether it was built"""
         try:
-            # Load section config
-            config_path = section_dir / 'section_config.json'
-            if not config_path.exists():
-                logger.error(f"No config found for {section_dir.name}")
-                return
-                
-            with open(config_path, 'r', encoding='utf-8') as f:
-                section_config = json.load(f)
-                
-            # Create section build directory
-            build_section_dir = self.build_dir / section_dir.name
-            build_section_dir.mkdir(exist_ok=True)
-            
-            # Process README.md
-            readme_path = section_dir / 'README.md'
-            if readme_path.exists():
-                content = readme_path.read_text(encoding='utf-8')
-                html_content = markdown2.markdown(
-                    content,
-                    extras=['metadata', 'tables', 'fenced-code-blocks']
-                )
-            else:
-                html_content = "<p>Content coming soon.</p>"
-                
-            # Load template
-            template = self.jinja_env.get_template('base.html')
-            
-            # Prepare template variables
-            template_vars = {
-                'meta': section_config['template']['slots']['meta'],
-                'content': html_content,
-                'navigation': self._generate_navigation(content),
-                'resources': self._gather_resources(section_dir),
-                'footer': {}  # Add footer content if needed
-            }
+            self.render_section(section_dir)
+            logger.info(f"Successfully built section: {section_dir.name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error building section {section_dir.name}: {str(e)}")
+            return False
             
-            # Render template
-            output = template.render(**template_vars)
+    def render_section(self, section_dir: Path) -> None:
+        """Render a single section, raising on failure"""
+        with span('section', section=section_dir.name):
+            self._render_section(section_dir)
             
-            # Minify if configured
-            if self.config['build']['content']['minify_html'] and HAS_HTMLMIN:
-                output = htmlmin.minify(output)
-                
-            # Write output
-            output_path = build_section_dir / 'index.html'
-            output_path.write_text(output, encoding='utf-8')
+    def _render_section(self, section_dir: Path) -> None:
+        # Load section config
+        config_path = section_dir / 'section_config.json'
+        if not self.fs.exists(config_path):
+            raise BuildError(f"No config found for {section_dir.name}")
             
-            # Copy section assets
-            self._copy_section_assets(section_dir, build_section_dir)
+        with span('read_config'):
+            section_config = json.loads(self.fs.read_text(config_path))
             
-            logger.info(f"Successfully built section: {section_dir.name}")
+        # Create section build directory
+        build_section_dir = self.build_dir / section_dir.name
+        build_section_dir.mkdir(exist_ok=True)
+        
+        # Process README.md, expanding includes and collecting headings in one pass
+        with span('content'):
+            _, html_content, page = self.content_processor.process_page(section_dir)
             
-        except Exception as e:
-            logger.error(f"Error building section {section_dir.name}: {str(e)}")
+        meta = section_config['template']['slots']['meta']
+        if self.search_indexer is not None:
+            with span('search_extract'):
+                self.search_indexer.extract(section_dir.name, meta.get('title', section_dir.name), html_content)
             
-    def _generate_navigation(self, content: str) -> str:
-        """Generate navigation from content headers"""
-        headers = re.findall(r'^(#{1,3})\s+(.+)$', content, re.MULTILINE)
+        # Load template
+        template = self.page_template or self.jinja_env.get_template('base.html')
+        
+        # Prepare template variables; rendered HTML slots must not be autoescaped
+        template_vars = {
+            'meta': meta,
+            'content': Markup(html_content),
+            'navigation': Markup(self._generate_navigation(page.headings)),
+            'resources': Markup(self._gather_resources(section_dir)),
+            'page_nav': self.navigation.page(section_dir.name) if self.navigation is not None else None,
+            'footer': {}  # Add footer content if needed
+        }
+        
+        # Stream template chunks through the minifier straight into the file
+        output_path = build_section_dir / 'index.html'
+        with span('render_page'):
+            size = self._write_page(template.generate(**template_vars), output_path)
+        count('bytes_written', size)
+        
+    def _write_page(self, chunks: Iterable[str], output_path: Path) -> int:
+        """Write rendered chunks to a page atomically, minifying on the way, and return its size"""
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='', buffering=self.WRITE_BUFFER) as f:
+                if self.config['assets']['minify_html']:
+                    minifier = HtmlMinifier(f.write)
+                    for chunk in chunks:
+                        minifier.feed(chunk)
+                    minifier.close()
+                else:
+                    f.writelines(chunks)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return output_path.stat().st_size
+        
+    def _generate_navigation(self, headings: List[Heading]) -> str:
+        """Generate navigation from the headings collected during preprocessing"""
+        headers = [h for h in headings if h.level <= 3]
         if not headers:
             return ""
             
         nav = ['<nav class="section-nav"><ul>']
-        for hashes, title in headers:
-            level = len(hashes)
-            link = re.sub(r'[^\w\s-]', '', title.lower())
-            link = re.sub(r'[-\s]+', '-', link).strip('-')
-            indent = '  ' * (level - 1)
-            nav.append(f'{indent}<li><a href="#{link}">{title}</a></li>')
+        for heading in headers:
+            indent = '  ' * (heading.level - 1)
+            nav.append(f'{indent}<li><a href="#{heading.anchor}">{html.escape(heading.title)}</a></li>')
         nav.append('</ul></nav>')
         return '\n'.join(nav)
         
     def _gather_resources(self, section_dir: Path) -> str:
         """Gather and format additional resources"""
         resources = []
-        for pattern in ['*.md', '*.pdf', '*.ipynb']:
-            for file in section_dir.glob(pattern):
+        for pattern in self.RESOURCE_PATTERNS:
+            for file in self.fs.glob(section_dir, pattern):
                 if file.name not in ['README.md', 'SEO.md']:
                     name = file.stem.replace('_', ' ').title()
                     link = file.name
@@ -209,69 +383,495 @@ class Builder:
             """
         return ""
         
-    def _copy_section_assets(self, src_dir: Path, dst_dir: Path) -> None:
-        """Copy section-specific assets"""
-        # Copy images
-        images_dir = src_dir / 'images'
-        if images_dir.exists():
-            dst_images = dst_dir / 'images'
-            dst_images.mkdir(exist_ok=True)
-            for img in images_dir.glob('*'):
-                if img.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif']:
-                    if self.config['build']['content']['optimize_images']:
-                        self._optimize_image(img, dst_images / img.name)
-                    else:
-                        shutil.copy2(img, dst_images / img.name)
-                        
-    def _optimize_image(self, src: Path, dst: Path) -> None:
-        """Optimize image for web"""
-        try:
-            with Image.open(src) as img:
-                # Convert RGBA to RGB if needed
-                if img.mode == 'RGBA':
-                    bg = Image.new('RGB', img.size, (255, 255, 255))
-                    bg.paste(img, mask=img.split()[3])
-                    img = bg
+    def process_section_images(self, section_dirs: List[Path]) -> None:
+        """Run the image stage for a set of sections"""
+        from .core.assets.image_pipeline import IMAGE_EXTENSIONS
+        assets_config = self.config['assets']
+        webp = assets_config['optimize_images'] and assets_config.get('generate_webp', True)
+        jobs = []
+        for section_dir in section_dirs:
+            images_dir = section_dir / 'images'
+            dst_images = self.build_dir / section_dir.name / 'images'
+            images = [img for img in sorted(images_dir.iterdir()) if img.suffix.lower() in IMAGE_EXTENSIONS] \
+                if images_dir.exists() else []
+            jobs.extend((img, dst_images) for img in images)
+            expected = {img.name for img in images}
+            if webp:
+                expected.update(img.stem + '.webp' for img in images)
+            self._prune_image_output(dst_images, expected)
+                    
+        if assets_config['optimize_images']:
+            self.image_pipeline.run(jobs)
+        else:
+            for img, dst_images in jobs:
+                dst_images.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(img, dst_images / img.name)
                 
-                # Optimize
-                img.save(dst, optimize=True, quality=85)
-        except Exception as e:
-            logger.warning(f"Could not optimize image {src.name}: {str(e)}")
-            shutil.copy2(src, dst)
+    def _prune_image_output(self, dst_images: Path, expected: Set[str]) -> None:
+        """Delete built images (and WebP variants) whose source is gone, and the directory once it is empty"""
+        if not dst_images.is_dir():
+            return
+        for output in dst_images.iterdir():
+            if output.name not in expected:
+                if output.is_dir():
+                    shutil.rmtree(output)
+                else:
+                    output.unlink()
+                logger.debug(f"Removed stale image output: {output.relative_to(self.build_dir)}")
+        if not expected:
+            dst_images.rmdir()
             
-    def build(self) -> None:
-        """Build the entire site"""
+    def _discover_sections(self) -> List[Path]:
+        """Find all section directories under the content directory"""
+        return sorted(d for d in self.content_dir.iterdir()
+                      if d.is_dir() and self.SECTION_PATTERN.match(d.name))
+        
+    def _global_input_hash(self) -> str:
+        """Hash the inputs shared by every section"""
+        files_hash = hash_files([
+            self.root_path / 'build_config.json',
+            *self.templates_dir.rglob('*.html'),
+            # Pages embed the fingerprinted asset URLs
+            self.build_dir / 'static' / AssetBundler.MANIFEST_FILE
+        ], self.root_path)
+        # Every page carries the category menu
+        categories = self.navigation.category_links() if self.navigation is not None else []
+        categories_hash = hashlib.sha1(json.dumps(categories, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"{files_hash}:{categories_hash}"
+        
+    def _section_input_hash(self, section_dir: Path) -> str:
+        """Hash everything that feeds into a section's output"""
+        inputs = [section_dir / 'README.md', section_dir / 'section_config.json']
+        # Files pulled in by @include directives during the last render
+        graph = self.content_processor.dependency_graph
+        inputs.extend(self.content_dir / dep for dep in graph.dependencies(section_dir.name))
+        # Text inputs go through the snapshot layer so rendering reuses the read
+        text_hash = hash_files(inputs, self.content_dir, read_bytes=self.fs.read_bytes)
+        
+        images_dir = section_dir / 'images'
+        images = [p for p in images_dir.iterdir() if p.is_file()] if images_dir.exists() else []
+        images_hash = hash_files(images, self.content_dir)
+        
+        # Only the names of resource files end up in the page
+        resource_names = sorted(
+            f.name for pattern in self.RESOURCE_PATTERNS
+            for f in self.fs.glob(section_dir, pattern)
+        )
+        # Previous/next and related links depend on other sections
+        nav_hash = self.navigation.page_digest(section_dir.name) if self.navigation is not None else ''
+        return f"{text_hash}:{images_hash}:{','.join(resource_names)}:{nav_hash}"
+        
+    def _has_output(self, section_name: str) -> bool:
+        """Whether a section's page is in the build directory; the state in .cache outlives it"""
+        return (self.build_dir / section_name / 'index.html').exists()
+        
+    def _remove_section_output(self, section_name: str) -> None:
+        """Remove the built output of a deleted section"""
+        output_dir = self.build_dir / section_name
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        logger.info(f"Removed output of deleted section: {section_name}")
+            
+    def _process_sections(self, sections: List[Path]) -> List[bool]:
+        """Render sections on the configured executor, returning per-section success"""
+        if self.executor == 'thread' or len(sections) < 2:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(self.process_section, sections))
+                
+        # Rendering is CPU bound, so spread it over processes to get past the GIL
+        results = []
+        processor = self.content_processor
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 initializer=_init_section_worker,
+                                 initargs=(str(self.root_path), processor.site_index, self.fragments,
+                                           self.navigation, self.profile, self.cprofile_dir)) as executor:
+            for result in executor.map(_render_section_in_worker, sections):
+                name, error = result['section'], result['error']
+                processor.markdown_cache.add_stats(result['cache_stats'])
+                if result['profile'] is not None:
+                    profiler.merge(result['profile'])
+                if error is None:
+                    processor.dependency_graph.record(name, result['dependencies'])
+                    processor.link_graph.record(name, result['outbound_links'], result['broken_links'])
+                    logger.info(f"Successfully built section: {name}")
+                else:
+                    logger.error(f"Error building section {name}: {error}")
+                results.append(error is None)
+        return results
+        
+    def _static_outputs(self) -> List[str]:
+        """Site paths produced by copy_static_assets"""
+        return [f'static/{name}' for name in self.asset_bundler.outputs()]
+        
+    def _load_build_state(self, sections: List[Path]) -> None:
+        """Load the graphs kept from the previous build and index the site for this one"""
+        processor = self.content_processor
+        processor.dependency_graph = DependencyGraph.load(self.state_dir / self.DEPENDENCY_GRAPH_FILE)
+        processor.link_graph = LinkGraph.load(self.build_dir / self.LINK_GRAPH_FILE)
+        self._index_site(sections)
+        
+    def _index_site(self, sections: List[Path]) -> None:
+        """Take the once-per-build inventory used for link checks"""
+        self.content_processor.site_index = SiteIndex.scan(
+            self.content_dir, sections, self._static_outputs()
+        )
+        
+    def _save_build_state(self) -> None:
+        """Persist the dependency graph and emit the link graph"""
+        processor = self.content_processor
+        processor.dependency_graph.save(self.state_dir / self.DEPENDENCY_GRAPH_FILE)
+        processor.link_graph.save(self.build_dir / self.LINK_GRAPH_FILE)
+        if self.navigation is not None:
+            self.navigation.save(self.build_dir / SiteNavigation.FILE)
+        
+    def check_output_links(self, check_external: Optional[bool] = None) -> Dict:
+        """Check every link in the built pages and write the report next to the link caches
+        
+        External URLs are checked when security.validate_external_links is set,
+        unless check_external says otherwise.
+        """
+        if check_external is None:
+            check_external = self.check_external_links
+        options = self.links_config
+        kwargs = {
+            'cache_dir': self.cache_dir / 'links',
+            'site_domains': self.config.get('security', {}).get('allowed_domains', []),
+            'max_workers': self.max_workers
+        }
+        if check_external:
+            report = validate_links(
+                self.build_dir,
+                timeout=options.get('timeout', 10),
+                ttl=options.get('ttl_hours', 168) * 3600,
+                error_ttl=options.get('error_ttl_hours', 1) * 3600,
+                max_connections=options.get('max_connections', 32),
+                max_per_host=options.get('max_per_host', 4),
+                **kwargs
+            )
+        else:
+            report = check_html_links(self.build_dir, **kwargs)
+        report_path = self.cache_dir / 'links' / 'report.json'
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        
+        external = report['external']
+        logger.info(
+            f"Link check: {report['links']} links on {report['pages']} pages, "
+            f"{report['broken_count']} broken internal links, {len(external['broken'])} broken of "
+            f"{external['urls']} external URLs ({external['cached']} cached)"
+        )
+        for page, hrefs in list(report['broken'].items())[:self.MAX_LINK_WARNINGS]:
+            logger.warning(f"Broken links in {page}: {', '.join(hrefs)}")
+        for url, result in list(external['broken'].items())[:self.MAX_LINK_WARNINGS]:
+            logger.warning(f"Broken external link {url}: {result['error'] or result['status']}")
+        return report
+        
+    def _forget_section(self, section_name: str) -> None:
+        """Drop a deleted section's output and graph entries"""
+        self._remove_section_output(section_name)
+        self.content_processor.dependency_graph.remove(section_name)
+        self.content_processor.link_graph.remove(section_name)
+        if self.search_indexer is not None:
+            self.search_indexer.forget(section_name)
+        
+    def build(self, force: bool = False) -> List[str]:
+        """Build the site, re-rendering only sections whose inputs changed unless forced
+        
+        Returns the names of the sections that were rebuilt.
+        """
+        main_profile = None
+        if self.cprofile_dir is not None:
+            import cProfile
+            main_profile = cProfile.Profile()
+            main_profile.enable()
+        try:
+            with span('build', force=force):
+                return self._build(force)
+        finally:
+            self.content_processor.end_build()
+            if main_profile is not None:
+                main_profile.disable()
+                main_profile.dump_stats(str(self.cprofile_dir / f'main-{os.getpid()}.prof'))
+                
+    def plan(self, force: bool = False) -> Dict:
+        """Work out which sections a build would rebuild or remove, without rendering anything
+        
+        Runs the same change detection as build(): the global hash and every
+        section's input hash. Navigation is read from the last build rather
+        than recomputed, so no TF-IDF pass runs and no cache is written; a
+        page whose related links shift only because another section changed
+        shows up in the build, not the plan. Static sources are only compared
+        by mtime, since bundle fingerprints come from minified output.
+        """
+        sections = self._discover_sections()
+        self._use_navigation(SiteNavigation.load(self.build_dir / SiteNavigation.FILE))
+        manifest = BuildManifest.load(self.state_dir)
+        self.content_processor.dependency_graph = DependencyGraph.load(self.state_dir / self.DEPENDENCY_GRAPH_FILE)
+        global_changed = force or manifest.global_hash != self._global_input_hash()
+        
+        names = {d.name for d in sections}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            input_hashes = dict(zip(
+                (d.name for d in sections),
+                executor.map(self._section_input_hash, sections)
+            ))
+        return {
+            'sections': len(sections),
+            'global_changed': global_changed,
+            'assets_changed': self.asset_bundler.sources_changed(),
+            'rebuild': [d.name for d in sections
+                        if global_changed or not self._has_output(d.name)
+                        or manifest.is_stale(d.name, input_hashes[d.name])],
+            'remove': sorted(name for name in manifest.sections if name not in names)
+        }
+        
+    def _build(self, force: bool) -> List[str]:
         try:
             logger.info("Starting build process...")
             
-            # Clean build directory
-            self.clean_build_dir()
-            
+            # Clean build directory on a forced build
+            if force:
+                self.clean_build_dir()
+            else:
+                self.build_dir.mkdir(parents=True, exist_ok=True)
+                for name in self.LEGACY_STATE_FILES:
+                    (self.build_dir / name).unlink(missing_ok=True)
+                
             # Copy static assets
-            self.copy_static_assets()
+            with span('static_assets'):
+                self.copy_static_assets()
+                
+            # Related sections and the category menu are computed once, before any page needs them
+            sections = self._discover_sections()
+            with span('navigation', sections=len(sections)):
+                self._use_navigation(self.build_navigation(sections))
+                
+            # Partials embed asset URLs and categories, so render them once both are known
+            with span('templates'):
+                self.precompile_templates()
+                self.render_fragments()
             
-            # Process all sections
-            pattern = re.compile(r'^\d{2}_\w+')
-            sections = [d for d in self.root_path.iterdir() 
-                       if d.is_dir() and pattern.match(d.name)]
+            # Work out which sections changed since the last build
+            with span('load_state'):
+                manifest = BuildManifest.load(self.state_dir)
+                self._load_build_state(sections)
+                self.content_processor.begin_build()
+                global_hash = self._global_input_hash()
+                if force or manifest.global_hash != global_hash:
+                    manifest.reset(global_hash)
+                
+            for section_name in manifest.remove_missing(d.name for d in sections):
+                self._forget_section(section_name)
+                
+            # Hashing is I/O bound, so it stays on threads whatever the render executor
+            with span('hash_inputs'), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                input_hashes = dict(zip(
+                    (d.name for d in sections),
+                    executor.map(self._section_input_hash, sections)
+                ))
+            # A section with no stored search terms would drop out of the index, so it renders again
+            unindexed = set()
+            if self.search_indexer is not None:
+                unindexed.update(self.search_indexer.unindexed(d.name for d in sections))
+            stale = [d for d in sections
+                     if d.name in unindexed or not self._has_output(d.name)
+                     or manifest.is_stale(d.name, input_hashes[d.name])]
+            logger.info(f"Rebuilding {len(stale)} of {len(sections)} sections")
             
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                executor.map(self.process_section, sections)
+            # Process changed sections
+            cache_before = self.content_processor.markdown_cache.stats()
+            with span('render', sections=len(stale)):
+                results = self._process_sections(stale)
+            cache_after = self.content_processor.markdown_cache.stats()
+            logger.info(
+                f"Markdown cache: {cache_after['hits'] - cache_before['hits']} hits, "
+                f"{cache_after['misses'] - cache_before['misses']} misses"
+            )
+                
+            # Images run as their own stage with a dedicated pool and cache
+            with span('images'):
+                self.process_section_images([d for d, built in zip(stale, results) if built])
+                
+            if self.search_indexer is not None:
+                with span('search_index'):
+                    self.search_indexer.update((d.name for d in sections), (d.name for d in stale))
+                
+            # Re-hash rebuilt sections, since their includes may have changed
+            with span('save_state'):
+                for section_dir, built in zip(stale, results):
+                    if built:
+                        manifest.record(section_dir.name, self._section_input_hash(section_dir))
+                manifest.save()
+                self._save_build_state()
+            
+            # Parses only the pages written since the last check
+            check_output = self.links_config.get('check_output', True)
+            if check_output:
+                with span('check_links'):
+                    self.check_output_links()
+            
+            # Compress last, once every output for this build is in place
+            if self.precompressor is not None:
+                with span('precompress'):
+                    self.precompressor.run()
+            
+            # The output check also sees template links, so its broken count supersedes the graph's
+            link_report = self.content_processor.link_graph.report()
+            summary = f"Link graph: {len(link_report['orphans'])} orphaned pages"
+            if not check_output:
+                summary += f", {link_report['broken_count']} broken links"
+            logger.info(summary)
                 
             logger.info("Build completed successfully")
+            return [d.name for d, built in zip(stale, results) if built]
             
         except Exception as e:
             logger.error(f"Build failed: {str(e)}")
             raise BuildError(f"Build failed: {str(e)}")
             
-if __name__ == '__main__':
-    import argparse
-    
-    parser = argparse.ArgumentParser(description='Build iHelper.tech knowledge library')
-    parser.add_argument('--clean', action='store_true',
-                       help='Clean build directory before building')
+    def rebuild_changed(self, changed_paths: Iterable[Path]) -> List[str]:
+        """Rebuild only what a set of changed files affects, keeping caches warm"""
+        changed = [Path(p).resolve() for p in changed_paths]
+        templates_dir = self.templates_dir.resolve()
+        config_path = (self.root_path / 'build_config.json').resolve()
+        if any(p == config_path or p.is_relative_to(templates_dir) for p in changed):
+            # Templates feed every page, so fall back to a full incremental build
+            self.build()
+            return [d.name for d in self._discover_sections()]
+            
+        static_dir = self.static_dir.resolve()
+        if any(p.is_relative_to(static_dir) for p in changed) and self.copy_static_assets():
+            # New fingerprints change the asset URLs embedded in every page
+            self.build()
+            return [d.name for d in self._discover_sections()]
+            
+        content_dir = self.content_dir.resolve()
+        affected = set()
+        for path in changed:
+            self.fs.invalidate(path)
+            if not path.is_relative_to(content_dir):
+                continue
+            affected.update(self.content_processor.invalidate(path))
+            parts = path.relative_to(content_dir).parts
+            if len(parts) > 1 and self.SECTION_PATTERN.match(parts[0]):
+                affected.add(parts[0])
+                
+        sections = self._discover_sections()
+        if affected:
+            # Titles and text feed other pages' related and previous/next links
+            previous = self.navigation or SiteNavigation.load(self.build_dir / SiteNavigation.FILE)
+            navigation = self.build_navigation(sections)
+            self._use_navigation(navigation)
+            if previous is None or navigation.category_links() != previous.category_links():
+                # The category menu is on every page
+                self.build()
+                return [d.name for d in sections]
+            affected.update(navigation.changed_pages(previous, (d.name for d in sections)))
+            
+        if self.search_indexer is not None:
+            affected.update(self.search_indexer.unindexed(d.name for d in sections))
+        manifest = BuildManifest.load(self.state_dir)
+        self._index_site(sections)
+        rebuilt = []
+        for name in sorted(affected):
+            section_dir = self.content_dir / name
+            if not section_dir.is_dir():
+                manifest.remove(name)
+                self._forget_section(name)
+            elif self.process_section(section_dir):
+                manifest.record(name, self._section_input_hash(section_dir))
+                rebuilt.append(name)
+        self.process_section_images([self.content_dir / name for name in rebuilt])
+        if self.search_indexer is not None:
+            self.search_indexer.update((d.name for d in sections), affected)
+        manifest.save()
+        self._save_build_state()
+        self.content_processor.end_build()
+        return rebuilt
+        
+    def close(self) -> None:
+        """Release the worker processes this builder keeps between builds"""
+        self.content_processor.end_build()
+        
+    def watch(self, host: str = '127.0.0.1', port: int = 8000, use_polling: bool = False) -> None:
+        """Serve the build, rebuild on changes and live-reload browsers until interrupted"""
+        from .core.watch import FileWatcher, LiveReloadServer
+        self.build()
+        # Later rebuilds run in this warm process rather than a fresh pool
+        self.executor = 'thread'
+        
+        server = LiveReloadServer(self.build_dir, host, port)
+        server.start()
+        
+        def on_change(paths):
+            start = time.perf_counter()
+            rebuilt = self.rebuild_changed(paths)
+            server.notify_reload()
+            elapsed = (time.perf_counter() - start) * 1000
+            logger.info(f"Rebuilt {len(rebuilt)} sections in {elapsed:.0f} ms")
+            
+        watcher = FileWatcher([self.content_dir, self.templates_dir, self.static_dir],
+                              on_change, use_polling=use_polling)
+        watcher.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch mode")
+        finally:
+            watcher.stop()
+            server.stop()
+            
+# Builder owned by each process-pool worker, created once by the initializer
+_worker_builder: Optional[Builder] = None
+
+_worker_cprofile = None
+
+def _init_section_worker(root_path: str, site_index: Optional[SiteIndex], fragments: Dict[str, str],
+                         navigation: Optional[SiteNavigation], profile: bool = False,
+                         cprofile_dir: Optional[Path] = None) -> None:
+    """Set up the Jinja environment and ContentProcessor once per worker process"""
+    global _worker_builder, _worker_cprofile
+    # A forked worker inherits the parent's spans so far; drop them so they aren't merged twice
+    profiler.drain()
+    _worker_builder = Builder(root_path, executor='thread', profile=profile, cprofile_dir=cprofile_dir)
+    _worker_builder.content_processor.site_index = site_index
+    # Sections are already spread over processes; a nested chunk pool would only oversubscribe
+    _worker_builder.content_processor.markdown_renderer.max_workers = 1
+    # Templates come from the bytecode cache the parent just filled
+    _worker_builder.precompile_templates()
+    _worker_builder.fragments = fragments
+    _worker_builder._use_navigation(navigation)
+    if cprofile_dir is not None:
+        import cProfile
+        _worker_cprofile = cProfile.Profile()
+        _worker_cprofile.enable()
     
-    args = parser.parse_args()
+def _render_section_in_worker(section_dir: Path) -> Dict:
+    """Render a section in a worker, handing errors, graph updates and cache counters back to the parent"""
+    processor = _worker_builder.content_processor
+    name = section_dir.name
+    before = processor.markdown_cache.stats()
+    result = {'section': name, 'error': None, 'dependencies': [],
+              'outbound_links': [], 'broken_links': []}
+    try:
+        _worker_builder.render_section(section_dir)
+        result['dependencies'] = sorted(processor.dependency_graph.dependencies(name))
+        result['outbound_links'] = sorted(processor.link_graph.outbound(name))
+        result['broken_links'] = processor.link_graph.broken(name)
+    except Exception as e:
+        result['error'] = str(e)
+    after = processor.markdown_cache.stats()
+    result['cache_stats'] = {k: after[k] - before[k] for k in after}
+    result['profile'] = profiler.drain() if profiler.enabled else None
+    if _worker_cprofile is not None:
+        # Pool workers exit without running atexit hooks, so dump after every section
+        _worker_cprofile.dump_stats(str(_worker_builder.cprofile_dir / f'worker-{os.getpid()}.prof'))
+        _worker_cprofile.enable()
+    return result
+        
+if __name__ == '__main__':
+    import sys
+    from .cli import main
     
-    builder = Builder('C:/Users/ihelp/Knowledge_Library/iHelper.tech')
-    builder.build()
+    sys.exit(main(['build', *sys.argv[1:]]))
@@ -0,0 +1,327 @@
+"""
+Command line interface for the iHelper.tech build system
+
+Only argparse loads up front; each command imports the subsystem it drives,
+so help, validation and planning never pay for the renderers.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+SECTION_ACTIONS = ['create', 'update', 'validate', 'list']
+METADATA_ACTIONS = ['update', 'migrate', 'update-all', 'export']
+
+
+def _load_config(root: Path) -> dict:
+    """build_config.json under root, or an empty config when there is none"""
+    config_path = root / 'build_config.json'
+    if not config_path.exists():
+        return {}
+    return json.loads(config_path.read_text(encoding='utf-8'))
+
+
+def _content_dir(root: Path) -> Path:
+    """Directory holding the section folders, as configured in build_config.json"""
+    config = _load_config(root)
+    return root / config['build']['content_dir'] if config else root
+
+
+def _print_plan(plan: dict) -> None:
+    print(f"{len(plan['rebuild'])} of {plan['sections']} sections would rebuild")
+    if plan['global_changed']:
+        print("  templates, config or category menu changed: every section rebuilds")
+    if plan['assets_changed']:
+        print("  static sources changed since the last bundle: a new bundle would rebuild every section")
+    for name in plan['rebuild']:
+        print(f"  rebuild {name}")
+    for name in plan['remove']:
+        print(f"  remove  {name}")
+
+
+def run_build(args: argparse.Namespace) -> int:
+    from .build import Builder
+    from .core.profiling import profiler
+
+    builder = Builder(args.root, executor=args.executor,
+                      profile=bool(args.profile), cprofile_dir=args.cprofile)
+    if args.plan:
+        _print_plan(builder.plan(force=args.force or args.clean))
+    elif args.watch:
+        builder.watch(port=args.port, use_polling=args.poll)
+    elif args.precompile:
+        print(f"Compiled {builder.precompile_templates()} templates")
+    else:
+        builder.build(force=args.force or args.clean)
+        if args.profile:
+            profiler.write_trace(args.profile)
+            print(profiler.summary())
+    return 0
+
+
+def run_section(args: argparse.Namespace) -> int:
+    from .core.section import SectionManager
+
+    manager = SectionManager(_content_dir(args.root))
+    if args.action == 'list':
+        for section_id in manager.discover_sections():
+            print(section_id)
+        return 0
+    if not args.section_id:
+        args.parser.error(f"{args.action} needs a section ID")
+    if args.action == 'create':
+        if not args.title or not args.description:
+            args.parser.error('create requires --title and --description')
+        manager.create_section(args.section_id, args.title, args.description)
+    elif args.action == 'update':
+        kwargs = {}
+        if args.title:
+            kwargs['title'] = args.title
+        if args.description:
+            kwargs['description'] = args.description
+        manager.update_section(args.section_id, **kwargs)
+    elif args.action == 'validate':
+        return _report_validation(manager, [args.section_id])
+    return 0
+
+
+def run_metadata(args: argparse.Namespace) -> int:
+    from .core.metadata import MetadataManager
+
+    manager = MetadataManager(_content_dir(args.root), backend=args.backend)
+    if args.action == 'export':
+        if manager.store is None:
+            args.parser.error('export needs --backend sqlite')
+        manager.export_metadata()
+        return 0
+    if args.action == 'update-all':
+        results = manager.update_all()
+    elif not args.section_ids:
+        args.parser.error(f"{args.action} needs at least one section ID")
+    elif args.action == 'update':
+        results = manager.update_sections(args.section_ids)
+    else:
+        results = manager.migrate_sections(args.section_ids)
+    if not all(results.values()):
+        print(f"Failed to {args.action.replace('-', ' ')} metadata", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_enrich(args: argparse.Namespace) -> int:
+    from .core.metadata.metadata_enricher import main
+
+    config = _load_config(args.root)
+    cache_dir = args.root / config.get('cache', {}).get('dir', '.cache') / 'metadata'
+    main(str(_content_dir(args.root)), cache_dir=str(cache_dir))
+    return 0
+
+
+def _report_validation(manager, section_ids: List[str]) -> int:
+    failed = 0
+    for section_id in section_ids:
+        errors = manager.validate_section(section_id)
+        if errors:
+            failed += 1
+            print(f'{section_id}:')
+            for error in errors:
+                print(f'- {error}')
+    if not failed:
+        print(f"{len(section_ids)} sections valid")
+    return 1 if failed else 0
+
+
+def run_validate(args: argparse.Namespace) -> int:
+    from .core.section import SectionManager
+
+    manager = SectionManager(_content_dir(args.root))
+    return _report_validation(manager, args.section_ids or manager.discover_sections())
+
+
+def run_links(args: argparse.Namespace) -> int:
+    from .build import Builder
+
+    report = Builder(args.root).check_output_links(check_external=args.external)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for page, hrefs in report['broken'].items():
+            print(f'{page}:')
+            for href in hrefs:
+                print(f'- {href}')
+        for url, result in report['external']['broken'].items():
+            print(f"{url}: {result['error'] or result['status']} ({len(result['pages'])} pages)")
+    return 1 if report['broken'] or report['external']['broken'] else 0
+
+
+def run_validate_all(args: argparse.Namespace) -> int:
+    from .core.section import SchemaValidator
+
+    config = _load_config(args.root)
+    build_config = config.get('build', {})
+    validator = SchemaValidator(
+        args.root / build_config.get('schema_dir', 'config/schema'),
+        _content_dir(args.root),
+        cache_dir=args.root / config.get('cache', {}).get('dir', '.cache') / 'schema',
+        max_workers=build_config.get('max_workers')
+    )
+    report = validator.validate_all(args.section_ids or None, force=args.force)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for path, errors in report['errors'].items():
+            print(f'{path}:')
+            for error in errors:
+                print(f"- {error['path']}: {error['message']}")
+        print(f"{report['valid']} of {report['files']} files valid "
+              f"({report['validated']} validated, {report['cached']} cached, {report['elapsed_ms']} ms)")
+    return 1 if report['errors'] else 0
+
+
+def run_daemon(args: argparse.Namespace) -> int:
+    from .core.daemon import BuildDaemon
+
+    daemon = BuildDaemon(args.root, socket_path=args.socket, idle_timeout=args.idle_timeout,
+                         executor=args.executor, use_polling=args.poll)
+    daemon.serve()
+    return 0
+
+
+def _socket_path(args: argparse.Namespace) -> Path:
+    from .core.daemon.protocol import default_socket_path
+
+    return args.socket or default_socket_path(args.root)
+
+
+def run_client(args: argparse.Namespace) -> int:
+    from .core.daemon.client import DaemonClient
+    from .core.daemon.protocol import DaemonError
+
+    client = DaemonClient(_socket_path(args), timeout=args.timeout)
+    params = {}
+    if args.action == 'build':
+        params['force'] = args.force
+    elif args.action in ('section', 'validate'):
+        if args.action == 'section' and not args.section_ids:
+            args.parser.error('section needs at least one section ID')
+        params['sections'] = args.section_ids
+    try:
+        result = client.request(args.action, **params)
+    except DaemonError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.action in ('build', 'section'):
+        print(f"Rebuilt {len(result['rebuilt'])} sections")
+        for name in result['rebuilt']:
+            print(f"  {name}")
+    elif args.action == 'validate':
+        for section_id, errors in result['errors'].items():
+            print(f'{section_id}:')
+            for error in errors:
+                print(f'- {error}')
+        if not result['errors']:
+            print(f"{result['checked']} sections valid")
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    return 1 if args.action == 'validate' and result['errors'] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Every command takes the site root, so module entry points can pass it after the command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--root', type=Path, default=Path('.'),
+                        help='Site root holding build_config.json (default: current directory)')
+
+    parser = argparse.ArgumentParser(prog='python -m infrastructure.build',
+                                     description='Build and manage the iHelper.tech knowledge library')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', parents=[common], help='Build the site')
+    build.add_argument('--clean', action='store_true',
+                       help='Clean build directory before building')
+    build.add_argument('--force', action='store_true',
+                       help='Ignore the build manifest and rebuild every section')
+    build.add_argument('--plan', action='store_true',
+                       help='Only print which sections would rebuild; renders nothing')
+    build.add_argument('--executor', choices=['thread', 'process'],
+                       help='Render sections on threads or on a process pool')
+    build.add_argument('--watch', action='store_true',
+                       help='Watch for changes and serve with live reload')
+    build.add_argument('--port', type=int, default=8000,
+                       help='Port for the watch mode server')
+    build.add_argument('--poll', action='store_true',
+                       help='Poll for changes instead of using filesystem events')
+    build.add_argument('--precompile', action='store_true',
+                       help='Only compile templates into the bytecode cache')
+    build.add_argument('--profile', nargs='?', const='build_trace.json', metavar='TRACE',
+                       help='Time build stages, write a Chrome trace file and print a summary')
+    build.add_argument('--cprofile', metavar='DIR',
+                       help='Also dump cProfile stats per process into DIR')
+    build.set_defaults(handler=run_build)
+
+    section = commands.add_parser('section', parents=[common], help='Create, update, validate or list sections')
+    section.add_argument('action', choices=SECTION_ACTIONS)
+    section.add_argument('section_id', nargs='?', help='Section ID (e.g., 01_Welcome_Message)')
+    section.add_argument('--title', help='Section title')
+    section.add_argument('--description', help='Section description')
+    section.set_defaults(handler=run_section, parser=section)
+
+    metadata = commands.add_parser('metadata', parents=[common], help='Update library_metadata.json')
+    metadata.add_argument('action', choices=METADATA_ACTIONS)
+    metadata.add_argument('section_ids', nargs='*', help='Section IDs to process')
+    metadata.add_argument('--backend', choices=['json', 'sqlite'], default='json',
+                          help='Metadata store to update')
+    metadata.set_defaults(handler=run_metadata, parser=metadata)
+
+    enrich = commands.add_parser('enrich', parents=[common], help='Regenerate enriched metadata for every section')
+    enrich.set_defaults(handler=run_enrich)
+
+    validate = commands.add_parser('validate', parents=[common], help='Check section structure and configs')
+    validate.add_argument('section_ids', nargs='*', help='Sections to check (default: all)')
+    validate.set_defaults(handler=run_validate)
+
+    validate_all = commands.add_parser('validate-all', parents=[common],
+                                       help='Check section configs and library metadata against config/schema')
+    validate_all.add_argument('section_ids', nargs='*',
+                              help='Sections to check (default: all, plus library_metadata.json)')
+    validate_all.add_argument('--force', action='store_true', help='Ignore cached results')
+    validate_all.add_argument('--json', action='store_true', help='Print the report as JSON')
+    validate_all.set_defaults(handler=run_validate_all)
+
+    links = commands.add_parser('links', parents=[common], help='Check the links in the built pages')
+    links.add_argument('--external', action=argparse.BooleanOptionalAction,
+                       help='Also check external URLs (default: security.validate_external_links)')
+    links.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    links.set_defaults(handler=run_links)
+
+    daemon = commands.add_parser('daemon', parents=[common],
+                                 help='Keep a warm builder running and serve client requests')
+    daemon.add_argument('--socket', type=Path, help='Unix socket path (default: <root>/.build-daemon.sock)')
+    daemon.add_argument('--idle-timeout', type=float, default=900.0, metavar='SECONDS',
+                        help='Exit after this long without a request')
+    daemon.add_argument('--executor', choices=['thread', 'process'],
+                        help='Executor for the warm-up build; later builds run on threads')
+    daemon.add_argument('--poll', action='store_true',
+                        help='Poll for changes instead of using filesystem events')
+    daemon.set_defaults(handler=run_daemon)
+
+    client = commands.add_parser('client', parents=[common], help='Send a request to the build daemon')
+    client.add_argument('action', choices=['build', 'section', 'validate', 'status', 'stop'])
+    client.add_argument('section_ids', nargs='*', help='Sections to build or validate')
+    client.add_argument('--force', action='store_true', help='Rebuild every section')
+    client.add_argument('--socket', type=Path, help='Unix socket path (default: <root>/.build-daemon.sock)')
+    client.add_argument('--timeout', type=float, help='Seconds to wait for an answer')
+    client.add_argument('--json', action='store_true', help='Print the raw result as JSON')
+    client.set_defaults(handler=run_client, parser=client)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
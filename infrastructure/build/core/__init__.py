@@ -2,15 +2,16 @@
 Core build system components
 """
 
-from .content import ContentProcessor
-from .metadata import MetadataManager
-from .section import SectionManager
-from .template import TemplateGenerator, TemplateValidator
+from .lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ContentProcessor': '.content',
+    'MetadataManager': '.metadata',
+    'SectionManager': '.section'
+})
 
 __all__ = [
     'ContentProcessor',
     'MetadataManager',
-    'SectionManager',
-    'TemplateGenerator',
-    'TemplateValidator'
+    'SectionManager'
 ]
@@ -0,0 +1,15 @@
+"""
+Asset processing module
+"""
+
+from ..lazy import lazy_exports
+
+# Pillow and the minifiers load with the stage that uses them
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'AssetBundler': '.asset_bundler',
+    'HtmlMinifier': '.html_minifier',
+    'ImagePipeline': '.image_pipeline',
+    'Precompressor': '.precompressor'
+})
+
+__all__ = ['AssetBundler', 'HtmlMinifier', 'ImagePipeline', 'Precompressor']
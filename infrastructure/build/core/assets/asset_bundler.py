@@ -0,0 +1,151 @@
+"""
+Asset bundler for concatenating, minifying and fingerprinting static assets
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import importlib.util
+from pathlib import Path
+from typing import Dict, List
+
+# Optional minifiers, imported only when a bundle is actually built
+HAS_CSSCOMPRESSOR = importlib.util.find_spec('csscompressor') is not None
+HAS_RJSMIN = importlib.util.find_spec('rjsmin') is not None
+
+logger = logging.getLogger(__name__)
+
+class AssetBundler:
+    """Builds content-hashed CSS and JS bundles and the manifest mapping them"""
+
+    MANIFEST_FILE = 'asset-manifest.json'
+    HASH_LENGTH = 12
+    # Directories are concatenated in cascade order; unlisted ones follow in config order
+    BUNDLE_ORDER = {
+        'css': ['base_dir', 'components_dir', 'themes_dir'],
+        'js': ['utils_dir', 'core_dir', 'components_dir']
+    }
+
+    def __init__(self, root_path: Path, output_dir: Path, assets_config: Dict):
+        self.root_path = Path(root_path)
+        self.output_dir = Path(output_dir)
+        self.assets_config = assets_config
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, str]:
+        """Load the manifest written by the last bundle run"""
+        manifest_path = self.output_dir / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return {}
+        try:
+            return json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable asset manifest: {str(e)}")
+            return {}
+
+    def _sources(self, kind: str) -> List[Path]:
+        """List a bundle's source files in concatenation order"""
+        dirs = self.assets_config.get(kind, {})
+        order = [key for key in self.BUNDLE_ORDER[kind] if key in dirs]
+        order += [key for key in dirs if key not in order]
+        sources = []
+        for key in order:
+            sources.extend(sorted((self.root_path / dirs[key]).glob(f'*.{kind}')))
+        return sources
+
+    def _bundle_content(self, kind: str, sources: List[Path]) -> str:
+        """Concatenate and minify a bundle's sources"""
+        parts = [src.read_text(encoding='utf-8') for src in sources]
+        if kind == 'css':
+            content = '\n'.join(parts)
+            if self.assets_config.get('minify_css') and HAS_CSSCOMPRESSOR:
+                import csscompressor
+                content = csscompressor.compress(content)
+        else:
+            # Separate scripts so a missing trailing semicolon can't merge statements
+            content = '\n;\n'.join(parts)
+            if self.assets_config.get('minify_js', True) and HAS_RJSMIN:
+                import rjsmin
+                content = rjsmin.jsmin(content)
+        return content
+
+    def bundle(self) -> bool:
+        """Write fingerprinted bundles and the manifest, returning whether any URL changed"""
+        manifest = {}
+        for kind in ('css', 'js'):
+            sources = self._sources(kind)
+            if not sources:
+                continue
+            content = self._bundle_content(kind, sources).encode('utf-8')
+            digest = hashlib.sha256(content).hexdigest()[:self.HASH_LENGTH]
+            name = f'{kind}/site.{kind}'
+            hashed_name = f'{kind}/site.{digest}.{kind}'
+
+            output_path = self.output_dir / hashed_name
+            if not output_path.exists():
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_atomic(output_path, content)
+            manifest[name] = hashed_name
+            logger.info(f"Bundled {len(sources)} {kind.upper()} files into {hashed_name}")
+
+        self._remove_stale(manifest)
+        changed = manifest != self.manifest
+        manifest_path = self.output_dir / self.MANIFEST_FILE
+        if changed or not manifest_path.exists():
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+            self._write_atomic(manifest_path, payload)
+        else:
+            # The manifest's mtime marks the last bundle run, for sources_changed()
+            os.utime(manifest_path)
+        self.manifest = manifest
+        return changed
+
+    def sources_changed(self) -> bool:
+        """Whether any bundle source was modified since the last bundle run, without bundling"""
+        manifest_path = self.output_dir / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return True
+        bundled = manifest_path.stat().st_mtime_ns
+        return any(src.stat().st_mtime_ns > bundled
+                   for kind in ('css', 'js') for src in self._sources(kind))
+
+    def _write_atomic(self, path: Path, content: bytes) -> None:
+        """Write a file so readers never see it half written"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _remove_stale(self, manifest: Dict[str, str]) -> None:
+        """Delete bundles superseded by this run"""
+        current = set(manifest.values())
+        for kind in ('css', 'js'):
+            kind_dir = self.output_dir / kind
+            if not kind_dir.exists():
+                continue
+            for path in kind_dir.glob(f'site.*.{kind}'):
+                if f'{kind}/{path.name}' not in current:
+                    path.unlink()
+
+    def has_asset(self, name: str) -> bool:
+        """Check whether a logical asset name was bundled"""
+        return name in self.manifest
+
+    def url(self, name: str, prefix: str = '/static/') -> str:
+        """Resolve a logical asset name to its fingerprinted URL"""
+        hashed_name = self.manifest.get(name)
+        if hashed_name is None:
+            logger.warning(f"Asset not in manifest: {name}")
+            hashed_name = name
+        return f'{prefix}{hashed_name}'
+
+    def outputs(self) -> List[str]:
+        """Paths of the bundled files relative to the output directory"""
+        return sorted(self.manifest.values())
@@ -0,0 +1,101 @@
+"""
+HTML Minifier - Incremental whitespace and comment removal for streamed pages
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Callable, Iterable
+
+WHITESPACE = re.compile(r'\s+')
+
+
+class HtmlMinifier(HTMLParser):
+    """Minifies HTML fed in arbitrary chunks, passing output to a write callable as it goes
+
+    Whitespace runs in text collapse to one space and comments are dropped
+    (conditional comments are kept). Tags are re-emitted exactly as written,
+    and pre, textarea, script and style content passes through untouched.
+    The parser holds back only an incomplete trailing construct, so memory
+    stays flat however large the page.
+    """
+
+    PRESERVE_TAGS = ('pre', 'textarea', 'script', 'style')
+
+    def __init__(self, write: Callable[[str], object]):
+        # Entities are re-emitted as written, never decoded
+        super().__init__(convert_charrefs=False)
+        self.write = write
+        self._preserve = 0
+        # Start of output counts as whitespace, so leading space is dropped
+        self._space = True
+
+    def feed(self, data: str) -> None:
+        # Template chunks may be Markup, which would escape the parser's buffer when concatenated
+        super().feed(str.__str__(data))
+
+    def _text(self, text: str) -> None:
+        if not text:
+            return
+        self.write(text)
+        self._space = text[-1].isspace()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.PRESERVE_TAGS:
+            self._preserve += 1
+        self._text(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        self._text(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag in self.PRESERVE_TAGS and self._preserve:
+            self._preserve -= 1
+        self._text(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self._preserve:
+            self._text(data)
+            return
+        collapsed = WHITESPACE.sub(' ', data)
+        if self._space and collapsed.startswith(' '):
+            collapsed = collapsed[1:]
+        self._text(collapsed)
+
+    def handle_entityref(self, name):
+        self._text(f'&{name};')
+
+    def handle_charref(self, name):
+        self._text(f'&#{name};')
+
+    def handle_comment(self, data):
+        # Conditional comments carry markup for old browsers
+        if data.startswith('[if') or data.startswith('<![endif'):
+            self._text(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self._text(f'<!{decl}>')
+
+    def handle_pi(self, data):
+        self._text(f'<?{data}>')
+
+    def unknown_decl(self, data):
+        # html.parser strips the ']]' that closes a CDATA section, but only ']' after <![if ...]>
+        if data.startswith('CDATA['):
+            self._text(f'<![{data}]]>')
+        else:
+            self._text(f'<![{data}]>')
+
+
+def minify_stream(chunks: Iterable[str], write: Callable[[str], object]) -> None:
+    """Minify an iterable of HTML chunks into write()"""
+    minifier = HtmlMinifier(write)
+    for chunk in chunks:
+        minifier.feed(chunk)
+    minifier.close()
+
+
+def minify(html: str) -> str:
+    """Minify a whole document held in memory"""
+    parts = []
+    minify_stream((html,), parts.append)
+    return ''.join(parts)
@@ -0,0 +1,197 @@
+"""
+Image Pipeline - Resizes and re-encodes section images in parallel, cached by source hash
+"""
+
+import io
+import os
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..profiling import count
+
+# Optional imports
+try:
+    import PIL
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+
+# Formats whose size can be traded for quality
+LOSSY_FORMATS = ('JPEG', 'WEBP')
+
+# Bump when the layout of a cache entry changes
+CACHE_VERSION = 2
+
+# Cache entries hold these neutral names; byte-identical images share an
+# entry, so the real file names are only given at install time
+ENTRY_IMAGE = 'image'
+ENTRY_WEBP = 'image.webp'
+
+
+def _encode(img: 'Image.Image', fmt: str, max_size: int, settings: Dict) -> bytes:
+    """Encode an image, stepping quality down until it fits the size budget"""
+    quality = settings['quality']
+    while True:
+        buffer = io.BytesIO()
+        if fmt in LOSSY_FORMATS:
+            img.save(buffer, format=fmt, optimize=True, quality=quality)
+        else:
+            img.save(buffer, format=fmt, optimize=True)
+        data = buffer.getvalue()
+        if (fmt not in LOSSY_FORMATS or len(data) <= max_size
+                or quality - settings['quality_step'] < settings['min_quality']):
+            return data
+        quality -= settings['quality_step']
+
+
+def optimize_image(src: str, entry_dir: str, settings: Dict) -> Dict:
+    """Resize and encode one image into a cache entry directory (runs in a worker process)"""
+    src_path, entry_path = Path(src), Path(entry_dir)
+    # Build the entry beside its final name and rename it into place, so a
+    # crashed worker never leaves a half-written entry that looks like a hit
+    work_path = entry_path.with_name(f'{entry_path.name}.{os.getpid()}.tmp')
+    work_path.mkdir(parents=True, exist_ok=True)
+    try:
+        result = _optimize_into(src_path, work_path, settings)
+        if result['error'] is None:
+            try:
+                os.rename(work_path, entry_path)
+            except OSError:
+                # Another worker finished the same image first
+                pass
+        return result
+    finally:
+        shutil.rmtree(work_path, ignore_errors=True)
+
+
+def _optimize_into(src_path: Path, entry_path: Path, settings: Dict) -> Dict:
+    """Write the optimized image and its WebP variant into a directory"""
+    src = str(src_path)
+    outputs = []
+    try:
+        with Image.open(src_path) as opened:
+            fmt = opened.format or 'PNG'
+            img = opened.copy() if fmt != 'GIF' else None
+
+        if img is None:
+            # Re-encoding would drop GIF animation frames
+            shutil.copyfile(src_path, entry_path / ENTRY_IMAGE)
+            return {'source': src, 'outputs': [ENTRY_IMAGE], 'error': None}
+
+        max_width = settings['max_width']
+        if img.width > max_width:
+            height = max(1, round(img.height * max_width / img.width))
+            img = img.resize((max_width, height), Image.LANCZOS)
+
+        original = img
+        if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+            # JPEG has no alpha channel, so flatten onto white
+            original = Image.new('RGB', img.size, (255, 255, 255))
+            original.paste(img, mask=img.convert('RGBA').split()[3])
+        (entry_path / ENTRY_IMAGE).write_bytes(_encode(original, fmt, settings['max_size'], settings))
+        outputs.append(ENTRY_IMAGE)
+
+        if settings['webp']:
+            (entry_path / ENTRY_WEBP).write_bytes(_encode(img, 'WEBP', settings['max_size'], settings))
+            outputs.append(ENTRY_WEBP)
+        return {'source': src, 'outputs': outputs, 'error': None}
+    except Exception as e:
+        return {'source': src, 'outputs': [], 'error': str(e)}
+
+
+class ImagePipeline:
+    """Dedicated image stage: Pillow work on a process pool, results cached by source hash plus settings"""
+
+    def __init__(self, cache_dir: Path, max_width: int = 1200, max_size: int = 500000,
+                 quality: int = 85, min_quality: int = 40, quality_step: int = 5,
+                 webp: bool = True, max_workers: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.settings = {
+            'max_width': max_width,
+            'max_size': max_size,
+            'quality': quality,
+            'min_quality': min_quality,
+            'quality_step': quality_step,
+            'webp': webp
+        }
+        self._salt = json.dumps({
+            'version': CACHE_VERSION,
+            'settings': self.settings,
+            'pillow': PIL.__version__ if HAS_PIL else None
+        }, sort_keys=True).encode('utf-8')
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, src: Path) -> str:
+        digest = hashlib.sha256(self._salt)
+        with open(src, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def run(self, jobs: List[Tuple[Path, Path]]) -> None:
+        """Optimize (source image, destination directory) pairs, encoding only cache misses"""
+        if not jobs:
+            return
+        if not HAS_PIL:
+            logger.warning("Pillow not installed. Image optimization skipped.")
+            for src, dst_dir in jobs:
+                dst_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst_dir / src.name)
+            return
+
+        # Hashing and copying are I/O bound and stay on threads
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            keys = list(executor.map(lambda job: self._cache_key(job[0]), jobs))
+
+        # Identical images in one run are encoded once
+        misses: Dict[str, Path] = {}
+        for (src, _), key in zip(jobs, keys):
+            if key not in misses and not self._entry_dir(key).is_dir():
+                misses[key] = src
+        self.hits += len(jobs) - len(misses)
+        self.misses += len(misses)
+        count('image_cache.hits', len(jobs) - len(misses))
+        count('image_cache.misses', len(misses))
+
+        failed = set()
+        if misses:
+            pool = ProcessPoolExecutor if len(misses) > 1 else ThreadPoolExecutor
+            with pool(max_workers=self.max_workers) as executor:
+                futures = {key: executor.submit(optimize_image, str(src), str(self._entry_dir(key)), self.settings)
+                           for key, src in misses.items()}
+                for key, future in futures.items():
+                    result = future.result()
+                    if result['error'] is not None:
+                        logger.warning(f"Could not optimize image {misses[key].name}: {result['error']}")
+                        failed.add(key)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda item: self._install(*item, failed),
+                              ((src, dst_dir, key) for (src, dst_dir), key in zip(jobs, keys))))
+        logger.info(f"Images: {len(jobs) - len(misses)} cached, {len(misses)} encoded")
+
+    def _install(self, src: Path, dst_dir: Path, key: str, failed: set) -> None:
+        """Copy a cached result under this source's names (or the untouched original after a failure)"""
+        dst_dir.mkdir(parents=True, exist_ok=True)
+        if key in failed:
+            shutil.copy2(src, dst_dir / src.name)
+            return
+        entry = self._entry_dir(key)
+        shutil.copyfile(entry / ENTRY_IMAGE, dst_dir / src.name)
+        if (entry / ENTRY_WEBP).exists():
+            shutil.copyfile(entry / ENTRY_WEBP, dst_dir / (src.stem + '.webp'))
@@ -0,0 +1,172 @@
+"""
+Precompressor - Writes maximum-level .gz and .br siblings for compressible build outputs
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# brotli loads in the workers that compress, so importing this module stays cheap
+HAS_BROTLI = importlib.util.find_spec('brotli') is not None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.json', '.svg', '.xml', '.txt', '.map')
+
+# Sibling suffix for each encoding
+ENCODINGS = {'gzip': '.gz', 'br': '.br'}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_file(path: str, encodings: List[str]) -> Dict:
+    """Write compressed siblings for one file (runs in a worker process)"""
+    src = Path(path)
+    data = src.read_bytes()
+    sizes = {}
+    for encoding in encodings:
+        if encoding == 'gzip':
+            # mtime=0 keeps the output identical for identical input
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            import brotli
+            compressed = brotli.compress(data, quality=11)
+        sibling = src.with_name(src.name + ENCODINGS[encoding])
+        if len(compressed) < len(data):
+            _write_atomic(sibling, compressed)
+            sizes[encoding] = len(compressed)
+        elif sibling.exists():
+            # Not worth serving; fall back to the original
+            sibling.unlink()
+    return {'size': len(data), 'compressed': sizes}
+
+
+class Precompressor:
+    """Post-render stage compressing changed outputs on a process pool"""
+
+    STATE_FILE = '.precompress_manifest.json'
+    MIN_SIZE = 256
+
+    def __init__(self, build_dir: Path, use_brotli: bool = True, max_workers: Optional[int] = None,
+                 state_dir: Optional[Path] = None):
+        self.build_dir = Path(build_dir)
+        # The manifest is build state, not an output; the builder keeps it out of the deployed tree
+        self.state_path = Path(state_dir or build_dir) / self.STATE_FILE
+        self.max_workers = max_workers
+        self.use_brotli = use_brotli
+        self.encodings = ['gzip', 'br'] if use_brotli and HAS_BROTLI else ['gzip']
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable precompression state: {str(e)}")
+            return {}
+
+    def _outputs(self) -> List[Path]:
+        """Compressible files in the build, skipping build state files"""
+        return sorted(
+            path for path in self.build_dir.rglob('*')
+            if path.suffix in COMPRESSIBLE_EXTENSIONS and path.is_file()
+            and not path.name.startswith('.') and path.stat().st_size >= self.MIN_SIZE
+        )
+
+    def _remove_orphans(self, previous: Dict[str, Dict], state: Dict[str, Dict]) -> None:
+        """Delete siblings the last run wrote that this run no longer keeps
+
+        Only files listed in the manifest are touched; a shipped archive such
+        as foo.tar.gz is an output in its own right, not an orphan.
+        """
+        for name, entry in previous.items():
+            kept = state.get(name, {}).get('compressed', {})
+            for encoding in entry.get('compressed', {}):
+                if encoding in ENCODINGS and encoding not in kept:
+                    (self.build_dir / (name + ENCODINGS[encoding])).unlink(missing_ok=True)
+
+    def _is_current(self, path: Path, entry: Optional[Dict], digest: str) -> bool:
+        if entry is None or entry['hash'] != digest or entry['encodings'] != self.encodings:
+            return False
+        return all(path.with_name(path.name + ENCODINGS[encoding]).exists()
+                   for encoding in entry['compressed'])
+
+    def run(self) -> Dict[str, int]:
+        """Compress every changed output and return byte totals for the whole build"""
+        if self.use_brotli and not HAS_BROTLI:
+            logger.warning("brotli not installed. Only .gz files will be written.")
+        previous = self._load_state()
+        outputs = self._outputs()
+
+        # Hashing is I/O bound and stays on threads
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = list(executor.map(_hash_file, outputs))
+
+        state = {}
+        changed = []
+        for path, digest in zip(outputs, digests):
+            name = path.relative_to(self.build_dir).as_posix()
+            entry = previous.get(name)
+            if self._is_current(path, entry, digest):
+                state[name] = entry
+            else:
+                changed.append((path, name, digest))
+
+        if changed:
+            pool = ProcessPoolExecutor if len(changed) > 1 else ThreadPoolExecutor
+            with pool(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(compress_file, str(path), self.encodings)
+                           for path, _, _ in changed]
+                for (path, name, digest), future in zip(changed, futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"Could not precompress {name}: {str(e)}")
+                        continue
+                    state[name] = {'hash': digest, 'encodings': self.encodings, **result}
+
+        self._remove_orphans(previous, state)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.state_path, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
+
+        totals = {
+            'files': len(state),
+            'compressed': len(changed),
+            'bytes': sum(entry['size'] for entry in state.values())
+        }
+        for encoding in self.encodings:
+            totals[f'{encoding}_saved'] = sum(
+                entry['size'] - entry['compressed'][encoding]
+                for entry in state.values() if encoding in entry['compressed']
+            )
+        saved = ', '.join(f"{encoding} saves {totals[f'{encoding}_saved']:,} bytes"
+                          for encoding in self.encodings)
+        logger.info(
+            f"Precompressed {len(changed)} of {len(state)} outputs "
+            f"({totals['bytes']:,} bytes); {saved}"
+        )
+        return totals
@@ -0,0 +1,7 @@
+"""
+Build cache module
+"""
+
+from .markdown_cache import MarkdownCache
+
+__all__ = ['MarkdownCache']
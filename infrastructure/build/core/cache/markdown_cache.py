@@ -0,0 +1,153 @@
+"""
+Markdown Cache - Content-addressed on-disk cache of rendered markdown
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+class MarkdownCache:
+    """Rendered HTML keyed by a hash of the source, the markdown2 extras and its version"""
+
+    def __init__(self, cache_dir: Union[str, Path], extras: List[str],
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.extras = list(extras)
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @cached_property
+    def _salt(self) -> bytes:
+        # markdown2 loads with the first lookup, which is about to render anyway
+        import markdown2
+        return json.dumps({
+            'extras': self.extras,
+            'markdown2': markdown2.__version__
+        }, sort_keys=True).encode('utf-8')
+
+    def key(self, source: str) -> str:
+        """Cache key for a markdown source under the current renderer settings"""
+        digest = hashlib.sha256(self._salt)
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        # Fan out by prefix so no single directory grows huge
+        return self.cache_dir / key[:2] / f'{key}.html'
+
+    def get(self, source: str) -> Optional[str]:
+        """Return cached HTML for a source, or None on a miss"""
+        path = self._entry_path(self.key(source))
+        try:
+            html = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # Refresh the mtime, which drives least-recently-used eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return html
+
+    def put(self, source: str, html: str) -> None:
+        """Store rendered HTML atomically, evicting old entries if over the size cap"""
+        path = self._entry_path(self.key(source))
+        data = html.encode('utf-8')
+        # Rewriting an entry, e.g. after another process stored it, replaces its bytes rather than adding to them
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write markdown cache entry: {str(e)}")
+            return
+
+        with self._lock:
+            self.writes += 1
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - replaced
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.cache_dir.glob('*/*.html'):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache is back under 90% of its cap"""
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime_ns)
+        size = sum(st.st_size for _, st in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for path, st in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= st.st_size
+            evicted += 1
+        with self._lock:
+            self._size = size
+            self.evictions += evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, write and eviction counters for this process"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions
+            }
+
+    def add_stats(self, counts: Dict[str, int]) -> None:
+        """Fold in counters reported by another process, e.g. a pool worker"""
+        with self._lock:
+            self.hits += counts.get('hits', 0)
+            self.misses += counts.get('misses', 0)
+            self.writes += counts.get('writes', 0)
+            self.evictions += counts.get('evictions', 0)
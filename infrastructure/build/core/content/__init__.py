@@ -4,5 +4,8 @@ Content processing module
 
 from .content_processor import ContentProcessor
 from .content_generator import ContentGenerator
+from .dependency_graph import DependencyGraph
+from .link_graph import LinkGraph
+from .site_index import SiteIndex
 
-__all__ = ['ContentProcessor', 'ContentGenerator']
+__all__ = ['ContentProcessor', 'ContentGenerator', 'DependencyGraph', 'LinkGraph', 'SiteIndex']
@@ -0,0 +1,252 @@
+"""
+Chunked Markdown - Renders very long documents in parallel with output identical to a single pass
+"""
+
+import os
+import re
+import random
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import markdown2
+
+logger = logging.getLogger(__name__)
+
+# ATX heading at the left margin; only taken as a boundary after a blank line
+HEADING_LINE = re.compile(r'^#', re.M)
+
+# Options whose processing looks across the whole document after block rendering
+UNSUPPORTED_EXTRAS = ('toc', 'target-blank-links', 'nofollow', 'markdown-in-html')
+
+# Chunking calls markdown2 internals; other versions render in a single pass
+MARKDOWN2_VERSION = '2.5.5'
+
+
+class ChunkedMarkdown(markdown2.Markdown):
+    """markdown2 converter whose block rendering can run on slices of a document
+
+    convert() runs in three phases. The document-wide steps that come before
+    block rendering (metadata, raw HTML hashing, fenced code, footnote and
+    link definitions) run once on the whole text. The prepared text is then
+    cut at top-level headings, which by now cannot sit inside fenced code or
+    raw HTML, and each chunk's block gamut is rendered by a worker holding a
+    copy of the document state. Workers hand back the hashes they created
+    and the header texts they saw; the parent assigns header ids in document
+    order, merges the hashes and runs the footnote and unhashing steps once
+    over the stitched text, exactly as a single pass would.
+    """
+
+    # Set in workers: header ids are left as placeholders for the parent to number
+    _defer_header_ids = False
+
+    def header_id_from_text(self, text, prefix, n=None):
+        if not self._defer_header_ids:
+            return super().header_id_from_text(text, prefix, n)
+        self._deferred_headers.append((text, prefix, n))
+        return self._header_placeholder(len(self._deferred_headers) - 1)
+
+    def _header_placeholder(self, index: int) -> str:
+        return markdown2._hash_text(f'<<header-id {index}>>')
+
+    def _encode_email_address(self, addr: str) -> str:
+        # markdown2 obfuscates mailto links with the global random(), so no two
+        # renders agree; seed per address to keep output reproducible across processes
+        rng = random.Random(addr)
+        chars = []
+        for ch in 'mailto:' + addr:
+            r = rng.random()
+            # Roughly 10% raw, 45% hex, 45% decimal; '@' and '_' are always encoded
+            if r > 0.9 and ch not in '@_':
+                chars.append(ch)
+            elif r < 0.45:
+                chars.append('&#%s;' % hex(ord(ch))[1:])
+            else:
+                chars.append('&#%s;' % ord(ch))
+        return '<a href="%s">%s</a>' % (''.join(chars), ''.join(chars[7:]))
+
+    def supports_chunking(self) -> bool:
+        """Chunking is only exact for the plain conversion pipeline of the pinned markdown2"""
+        return (markdown2.__version__ == MARKDOWN2_VERSION
+                and not self.safe_mode and not self.use_file_vars
+                and hasattr(self, '_do_footnote_marker')
+                and not any(extra in self.extras for extra in UNSUPPORTED_EXTRAS))
+
+    def prepare(self, text: str) -> str:
+        """Run the document-wide steps that precede block rendering"""
+        self.reset()
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text += '\n\n'
+        text = self._detab(text)
+        text = self._ws_only_line_re.sub('', text)
+        if 'metadata' in self.extras:
+            text = self._extract_metadata(text)
+        text = self.preprocess(text)
+        text = self._hash_html_blocks(text, raw=True)
+        if 'footnotes' in self.extras:
+            text = self._strip_footnote_definitions(text)
+        return self._strip_link_definitions(text)
+
+    def state(self) -> Dict:
+        """Document state a worker needs to render any chunk"""
+        return {
+            'urls': self.urls,
+            'titles': self.titles,
+            'html_blocks': self.html_blocks,
+            'footnotes': getattr(self, 'footnotes', None),
+            'footnote_marker': getattr(self, '_footnote_marker', None),
+            'escape_table': self._escape_table,
+            'code_table': self._code_table
+        }
+
+    def merge(self, result: Dict) -> str:
+        """Fold a rendered chunk's hashes back in and number its headers in document order"""
+        self.html_blocks.update(result['html_blocks'])
+        self.html_spans.update(result['html_spans'])
+        self._escape_table.update(result['escape_table'])
+        self._code_table.update(result['code_table'])
+        html = result['html']
+        for index, (text, prefix, n) in enumerate(result['headers']):
+            header_id = super().header_id_from_text(text, prefix, n)
+            html = html.replace(f' id="{self._header_placeholder(index)}"', f' id="{header_id}"', 1)
+        return html
+
+    def finish(self, text: str) -> 'markdown2.UnicodeWithAttrs':
+        """Run the document-wide steps that follow block rendering"""
+        if 'footnotes' in self.extras:
+            text = self._do_footnote_marker(text)
+            text = self._add_footnotes(text)
+        text = self.postprocess(text)
+        text = self._unescape_special_chars(text)
+        text = self._unhash_html_spans(text)
+        rv = markdown2.UnicodeWithAttrs(text + '\n')
+        if 'metadata' in self.extras:
+            rv.metadata = self.metadata
+        return rv
+
+
+def split_blocks(text: str, target_size: int) -> List[str]:
+    """Cut prepared text at headings that follow a blank line, into chunks of about target_size"""
+    chunks = []
+    start = 0
+    for match in HEADING_LINE.finditer(text):
+        pos = match.start()
+        if pos - start < target_size or text[pos - 2:pos] != '\n\n':
+            continue
+        chunks.append(text[start:pos])
+        start = pos
+    chunks.append(text[start:])
+    return chunks
+
+
+def _init_chunk_worker(salt: bytes) -> None:
+    """Share the parent's hash salt so hashed blocks mean the same thing in every process"""
+    markdown2.SECRET_SALT = salt
+
+
+def render_chunk(extras: Sequence[str], state: Dict, text: str) -> Dict:
+    """Render one chunk's blocks against the document state (runs in a worker process)"""
+    md = ChunkedMarkdown(extras=list(extras))
+    md.reset()
+    md.urls = state['urls']
+    md.titles = state['titles']
+    md.html_blocks = dict(state['html_blocks'])
+    if state['footnotes'] is not None:
+        md.footnotes = state['footnotes']
+        md._footnote_marker = state['footnote_marker']
+    md._escape_table = dict(state['escape_table'])
+    md._code_table = dict(state['code_table'])
+    md._defer_header_ids = True
+    md._deferred_headers = []
+    html = md._run_block_gamut(text)
+    return {
+        'html': html,
+        'headers': md._deferred_headers,
+        'html_blocks': {k: v for k, v in md.html_blocks.items() if k not in state['html_blocks']},
+        'html_spans': md.html_spans,
+        'escape_table': {k: v for k, v in md._escape_table.items() if k not in state['escape_table']},
+        'code_table': {k: v for k, v in md._code_table.items() if k not in state['code_table']}
+    }
+
+
+class ChunkedMarkdownRenderer:
+    """Renders long documents across a process pool, short ones in a single pass"""
+
+    def __init__(self, extras: Sequence[str], max_workers: Optional[int] = None,
+                 min_size: int = 64 * 1024, chunk_size: int = 16 * 1024):
+        self.extras = list(extras)
+        self.max_workers = max_workers or os.cpu_count()
+        self.min_size = min_size
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Sections render on threads, so two long documents can ask for the pool at once
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # The pool starts from a render thread; forking there could copy a lock another thread holds
+                context = multiprocessing.get_context('forkserver') \
+                    if 'forkserver' in multiprocessing.get_all_start_methods() else None
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                                     initializer=_init_chunk_worker,
+                                                     initargs=(markdown2.SECRET_SALT,))
+            return self._executor
+
+    def render(self, text: str) -> str:
+        """Convert markdown, splitting it over the pool when it is long enough to pay off"""
+        md = ChunkedMarkdown(extras=self.extras)
+        if len(text) < self.min_size or self.max_workers < 2 or not md.supports_chunking():
+            return md.convert(text)
+        prepared = md.prepare(text)
+        # Aim for enough chunks to keep every worker busy, but none below chunk_size
+        target = max(self.chunk_size, len(prepared) // (self.max_workers * 2))
+        chunks = split_blocks(prepared, target)
+        if len(chunks) < 2:
+            return md.finish(md._run_block_gamut(prepared))
+
+        results = self._pool().map(render_chunk, repeat(self.extras), repeat(md.state()), chunks)
+        # Each chunk's paragraphs are already stripped of outer blank lines; rejoin as one pass would
+        html = '\n\n'.join(md.merge(result).strip('\n') for result in results)
+        logger.debug(f"Rendered {len(text):,} bytes of markdown in {len(chunks)} chunks")
+        return md.finish(html)
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check that chunked rendering matches a single pass')
+    parser.add_argument('paths', nargs='+', help='Markdown files or directories to check')
+    parser.add_argument('--chunk-size', type=int, default=1024,
+                        help='Target chunk size in bytes; small values force many boundaries')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes')
+    args = parser.parse_args()
+
+    extras = ['metadata', 'tables', 'fenced-code-blocks', 'header-ids', 'footnotes', 'smarty-pants']
+    renderer = ChunkedMarkdownRenderer(extras, max_workers=args.workers, min_size=0,
+                                       chunk_size=args.chunk_size)
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(sorted(path.rglob('*.md')) if path.is_dir() else [path])
+    mismatches = 0
+    try:
+        for path in files:
+            text = path.read_text(encoding='utf-8')
+            if renderer.render(text) != ChunkedMarkdown(extras=extras).convert(text):
+                mismatches += 1
+                print(f"MISMATCH {path}")
+    finally:
+        renderer.close()
+    print(f"Checked {len(files)} files: {mismatches} mismatches")
+    raise SystemExit(1 if mismatches else 0)
@@ -1,13 +1,22 @@
 from functools import cached_property
-from typing import Dict, Tuple, Optional, List, Any, Union
+from typing import TYPE_CHECKING, Dict, Tuple, Optional, List, Any, Union
 from pathlib import Path
 import re
 import json
-import markdown2
 import logging
-from functools import lru_cache
 from datetime import datetime
 
+from .dependency_graph import DependencyGraph
+from .markdown_preprocessor import MarkdownPreprocessor, PreprocessResult
+from .link_graph import LinkGraph
+from .site_index import SiteIndex
+from ..cache.markdown_cache import MarkdownCache, DEFAULT_MAX_BYTES
+from ..vfs import SnapshotFS
+from ..profiling import span, count
+
+if TYPE_CHECKING:
+    from .chunked_markdown import ChunkedMarkdownRenderer
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,16 +41,61 @@ class ValidationError(ContentProcessingError):
     pass
 
 class ContentProcessor:
-    def __init__(self, root_path: Union[str, Path]):
+    REQUIRED_SECTIONS = ['Introduction', 'Content', 'Summary']
+    
+    def __init__(self, root_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                 cache_max_bytes: int = DEFAULT_MAX_BYTES, fs: Optional[SnapshotFS] = None,
+                 chunk_workers: Optional[int] = None, chunk_min_bytes: int = 64 * 1024):
         self.root_path = Path(root_path)
+        self._resolved_root = self.root_path.resolve()
+        self.fs = fs or SnapshotFS()
         self.library_metadata = self._load_library_metadata()
+        # Rendered markdown shared across runs and worker processes
+        self.markdown_cache = (
+            MarkdownCache(cache_dir, self.markdown_extensions, cache_max_bytes)
+            if cache_dir is not None else None
+        )
+        self.chunk_workers = chunk_workers
+        self.chunk_min_bytes = chunk_min_bytes
+        self.dependency_graph = DependencyGraph()
+        self.link_graph = LinkGraph()
+        # Set by the builder once per build; without it links are checked on disk
+        self.site_index: Optional[SiteIndex] = None
+        # Computed related sections by folder name, set by the builder's navigation stage
+        self.related_sections: Dict[str, List[str]] = {}
+        self.preprocessor = MarkdownPreprocessor(self._resolve_include)
+        # Preprocessed include fragments keyed by (kind, resolved path), reset per build
+        self._fragment_cache: Dict[Tuple[str, Path], PreprocessResult] = {}
+        
+    def begin_build(self) -> None:
+        """Drop per-build caches so every include is re-read once in the new build"""
+        self._fragment_cache.clear()
+        
+    def end_build(self) -> None:
+        """Release the chunked rendering pool until the next long document"""
+        # Nothing to release if no page was rendered
+        renderer = self.__dict__.get('markdown_renderer')
+        if renderer is not None:
+            renderer.close()
+        
+    def invalidate(self, path: Union[str, Path]) -> List[str]:
+        """Forget cached work that depends on a changed file and return the affected pages"""
+        path = Path(path)
+        path = path.resolve() if path.is_absolute() else (self.root_path / path).resolve()
+        self.fs.invalidate(path)
+        if path == self._resolved_root / 'library_metadata.json':
+            self.library_metadata = self._load_library_metadata()
+        key = self._dependency_key(path)
+        self._fragment_cache = {
+            k: v for k, v in self._fragment_cache.items() if key not in v.dependencies
+        }
+        return self.dependency_graph.pages_to_rebuild([key])
         
-    @lru_cache(maxsize=1)
     def _load_library_metadata(self) -> Dict[str, Any]:
         """Load global library metadata"""
         metadata_file = self.root_path / 'library_metadata.json'
-        if metadata_file.exists():
-            return json.loads(metadata_file.read_text(encoding='utf-8'))
+        if self.fs.exists(metadata_file):
+            return json.loads(self.fs.read_text(metadata_file))
         return {}
         
     def parse_frontmatter(self, content: str) -> Tuple[Dict, str]:
@@ -59,44 +113,42 @@ class ContentProcessor:
         
         return {}, content
         
-    @lru_cache(maxsize=100)
     def process_markdown(self, folder_path: Path) -> Tuple[Dict, str]:
-        """Process markdown file with frontmatter and additional resources"""
+        """Process markdown file with frontmatter"""
+        metadata, html_content, _ = self.process_page(folder_path)
+        return metadata, html_content
+        
+    def process_page(self, folder_path: Path) -> Tuple[Dict, str, PreprocessResult]:
+        """Process a page, also returning the preprocessing facts for later build stages"""
         readme_path = folder_path / 'README.md'
-        if not readme_path.exists():
-            return self._generate_default_metadata(folder_path), '<p>Content coming soon.</p>'
+        if not self.fs.exists(readme_path):
+            return (self._generate_default_metadata(folder_path), '<p>Content coming soon.</p>',
+                    PreprocessResult(content=''))
             
-        content = readme_path.read_text(encoding='utf-8')
+        content = self.fs.read_text(readme_path)
         metadata, markdown_content = self.parse_frontmatter(content)
         
         # Enhance metadata with library-wide information
         metadata = self._enhance_metadata(metadata, folder_path)
         
-        # Process content
-        markdown_content = self._process_content(markdown_content, folder_path)
+        # Process content, recording every file pulled in by includes
+        page_key = self._dependency_key(folder_path.resolve())
+        with span('preprocess'):
+            result = self._process_content(markdown_content, folder_path)
+        self.dependency_graph.record(page_key, result.dependencies)
         
         # Convert to HTML with extras
-        html_content = markdown2.markdown(
-            markdown_content,
-            extras=[
-                'metadata', 'tables', 'fenced-code-blocks', 
-                'header-ids', 'footnotes', 'smarty-pants'
-            ]
-        )
-        
-        # Add additional resources section if available
-        resources = self._gather_resources(folder_path)
-        if resources:
-            html_content += resources
-            
+        html_content = self.parse_markdown(result.content)
         
         # Validate content
-        is_valid, validation_errors = self.validate_content(markdown_content)
-        if not is_valid:
-            logger.warning("Content validation failed:")
+        with span('link_check'):
+            broken_links = self._check_links(result, folder_path, page_key)
+        validation_errors = self._validate_result(result, broken_links)
+        if validation_errors:
+            logger.warning(f"Content validation failed for {folder_path.name}:")
             for error in validation_errors:
                 logger.warning(f"- {error}")
-        return metadata, html_content
+        return metadata, html_content, result
         
     def _enhance_metadata(self, metadata: Dict, folder_path: Path) -> Dict:
         """Enhance metadata with additional information"""
@@ -115,93 +167,70 @@ class ContentProcessor:
             'difficulty': section_metadata.get('difficulty', 'Beginner'),
             'last_updated': datetime.now().strftime('%Y-%m-%d'),
             'section_id': section_id,
-            'related_sections': section_metadata.get('related_sections', [])
+            'related_sections': section_metadata.get('related_sections') or self.related_sections.get(folder_name, [])
         }
         
         return enhanced
         
-    def _process_content(self, content: str, folder_path: Path) -> str:
-        """Process markdown content with enhanced features"""
-        # Fix internal links
-        content = self._fix_internal_links(content)
-        
-        # Process custom directives
-        content = self._process_directives(content, folder_path)
-        
-        return content
+    def _process_content(self, content: str, folder_path: Path) -> PreprocessResult:
+        """Fix internal links, expand directives and collect headings and links in one pass"""
+        return self.preprocessor.run(content, folder_path)
         
-    def _fix_internal_links(self, content: str) -> str:
-        """Convert relative markdown links to proper HTML paths"""
-        def replace_link(match):
-            link_text = match.group(1)
-            link_path = match.group(2)
-            
-            if link_path.endswith('.md'):
-                link_path = link_path[:-3] + '.html'
-            return f'[{link_text}]({link_path})'
-            
-        pattern = r'\[(.*?)\]\((.*?\.md)\)'
-        return re.sub(pattern, replace_link, content)
-        
-    def _process_directives(self, content: str, folder_path: Path) -> str:
-        """Process custom markdown directives"""
-        # Process code includes
-        content = re.sub(
-            r'@include\(code:(.*?)\)',
-            lambda m: self._include_code(m.group(1), folder_path),
-            content
-        )
-        
-        # Process file references
-        content = re.sub(
-            r'@include\(file:(.*?)\)',
-            lambda m: self._include_file(m.group(1), folder_path),
-            content
-        )
-        
-        return content
-        
-    def _include_code(self, filepath: str, base_path: Path) -> str:
-        """Include code file with syntax highlighting"""
+    def _resolve_include(self, kind: str, filepath: str, base_path: Path,
+                         stack: Tuple[Path, ...]) -> PreprocessResult:
+        """Resolve an @include directive for the preprocessor"""
         try:
             file_path = (base_path / filepath).resolve()
-            if file_path.exists() and file_path.is_relative_to(self.root_path):
-                ext = file_path.suffix.lstrip('.')
-                code = file_path.read_text(encoding='utf-8')
-                return f'```{ext}\n{code}\n```'
         except Exception:
-            pass
-        return f'<!-- Failed to include code from {filepath} -->'
-        
-    def _include_file(self, filepath: str, base_path: Path) -> str:
-        """Include general file content"""
+            file_path = None
+        if file_path is None or not file_path.is_relative_to(self._resolved_root):
+            return PreprocessResult(content=self._include_failure(kind, filepath))
+            
+        fragment = self._include_fragment(kind, file_path, stack)
+        if fragment is None:
+            # Record the target even if it is missing, so creating it later invalidates the page
+            return PreprocessResult(content=self._include_failure(kind, filepath),
+                                    dependencies={self._dependency_key(file_path)})
+        return fragment
+        
+    def _include_fragment(self, kind: str, file_path: Path,
+                          stack: Tuple[Path, ...]) -> Optional[PreprocessResult]:
+        """Read and expand an included file once per build"""
+        cached = self._fragment_cache.get((kind, file_path))
+        if cached is not None:
+            return cached
+        if file_path in stack:
+            logger.warning(f"Circular include of {file_path}")
+            return None
+        if not self.fs.is_file(file_path):
+            return None
+            
         try:
-            file_path = (base_path / filepath).resolve()
-            if file_path.exists() and file_path.is_relative_to(self.root_path):
-                content = file_path.read_text(encoding='utf-8')
-                return content
+            text = self.fs.read_text(file_path)
         except Exception:
-            pass
+            return None
+            
+        if kind == 'code':
+            ext = file_path.suffix.lstrip('.')
+            fragment = PreprocessResult(content=f'```{ext}\n{text}\n```')
+        else:
+            fragment = self.preprocessor.run(text, file_path.parent, stack + (file_path,))
+        fragment.dependencies.add(self._dependency_key(file_path))
+        self._fragment_cache[(kind, file_path)] = fragment
+        return fragment
+        
+    def _include_failure(self, kind: str, filepath: str) -> str:
+        """Placeholder left in the page when an include cannot be resolved"""
+        if kind == 'code':
+            return f'<!-- Failed to include code from {filepath} -->'
         return f'<!-- Failed to include file {filepath} -->'
         
-    @lru_cache(maxsize=50)
-    def _gather_resources(self, folder_path: Path) -> str:
-        """Gather and format additional resources in the folder"""
-        resources = []
-        
-        # Look for specific file types
-        for ext in ['.pdf', '.docx', '.xlsx', '.pptx', '.zip']:
-            files = list(folder_path.glob(f'*{ext}'))
-            if files:
-                resources.append(f'<h3>Additional {ext.upper()[1:]} Resources</h3>')
-                resources.append('<ul>')
-                for file in files:
-                    resources.append(f'<li><a href="{file.name}">{file.stem}</a></li>')
-                resources.append('</ul>')
-        
-        if resources:
-            return '\n<section class="additional-resources">\n<h2>Additional Resources</h2>\n' + '\n'.join(resources) + '\n</section>'
-        return ''
+    def _dependency_key(self, path: Path) -> str:
+        """Key a resolved path relative to the content root for the dependency graph"""
+        try:
+            return path.relative_to(self._resolved_root).as_posix()
+        except ValueError:
+            return path.as_posix()
         
     def _generate_default_metadata(self, folder_path: Path) -> Dict:
         """Generate default metadata for folders without README"""
@@ -250,42 +279,61 @@ class ContentProcessor:
 
     def validate_content(self, content: str) -> Tuple[bool, List[str]]:
         """Validate content structure and requirements"""
+        result = MarkdownPreprocessor().run(content, self.root_path)
+        errors = self._validate_result(result, self._check_links(result, self.root_path))
+        return len(errors) == 0, errors
+        
+    def _check_links(self, result: PreprocessResult, base_path: Path,
+                     page: Optional[str] = None) -> List[str]:
+        """Return broken internal links, recording the page's cross-section links when known"""
+        if self.site_index is not None:
+            linked, broken = self.site_index.check_links(page or '', result.links)
+            if page is not None:
+                self.link_graph.record(page, linked, broken)
+            return broken
+            
+        # No site index: fall back to checking each distinct link on disk
+        broken = []
+        for href in dict.fromkeys(link.href for link in result.links):
+            path = href.split('#', 1)[0].split('?', 1)[0]
+            if not path or href.lower().startswith(SiteIndex.EXTERNAL_PREFIXES):
+                continue
+            if not self.fs.exists(base_path / path):
+                broken.append(href)
+        return broken
+        
+    def _validate_result(self, result: PreprocessResult, broken_links: List[str]) -> List[str]:
+        """Validate content from the facts collected during preprocessing"""
         errors = []
+        content = result.content
         
         # Check for empty content
         if not content.strip():
             errors.append("Content is empty")
-            return False, errors
+            return errors
             
         # Check for minimum content length
         if len(content) < 100:
             errors.append("Content is too short (minimum 100 characters)")
             
         # Check for required sections
-        required_sections = ['Introduction', 'Content', 'Summary']
-        for section in required_sections:
-            if not re.search(r'#\s*' + re.escape(section), content, re.IGNORECASE):
+        titles = [heading.title.lower() for heading in result.headings]
+        for section in self.REQUIRED_SECTIONS:
+            if not any(title.startswith(section.lower()) for title in titles):
                 errors.append(f"Missing required section: {section}")
                 
         # Check for broken internal links
-        internal_links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
-        for text, link in internal_links:
-            if link.startswith(('http://', 'https://')):
-                continue
-            link_path = self.root_path / link
-            if not link_path.exists():
-                errors.append(f"Broken internal link: {link}")
+        for href in broken_links:
+            errors.append(f"Broken internal link: {href}")
                 
         # Check for proper heading hierarchy
-        headings = re.findall(r'(#{1,6})\s*([^\n]+)', content)
         prev_level = 0
-        for hashes, title in headings:
-            current_level = len(hashes)
-            if current_level > prev_level + 1:
-                errors.append(f"Invalid heading hierarchy: {title}")
-            prev_level = current_level
+        for heading in result.headings:
+            if heading.level > prev_level + 1:
+                errors.append(f"Invalid heading hierarchy: {heading.title}")
+            prev_level = heading.level
             
-        return len(errors) == 0, errors
+        return errors
 
     @cached_property
     def markdown_extensions(self) -> List[str]:
@@ -294,24 +342,30 @@ class ContentProcessor:
             'metadata', 'tables', 'fenced-code-blocks',
             'header-ids', 'footnotes', 'smarty-pants'
         ]
-        
-    @lru_cache(maxsize=1000)
-    def parse_markdown(self, content: str) -> str:
-        """Parse markdown with caching"""
-        return markdown2.markdown(content, extras=self.markdown_extensions)
 
     @cached_property
-    def markdown_extensions(self) -> List[str]:
-        """Get markdown extensions with caching"""
-        return [
-            'metadata', 'tables', 'fenced-code-blocks',
-            'header-ids', 'footnotes', 'smarty-pants'
-        ]
-        
-    @lru_cache(maxsize=1000)
+    def markdown_renderer(self) -> 'ChunkedMarkdownRenderer':
+        """Markdown renderer, created with the first page so markdown2 loads only when needed"""
+        from .chunked_markdown import ChunkedMarkdownRenderer
+        # Very long documents are split at headings and rendered on a process pool
+        return ChunkedMarkdownRenderer(
+            self.markdown_extensions, max_workers=self.chunk_workers, min_size=self.chunk_min_bytes
+        )
+
     def parse_markdown(self, content: str) -> str:
-        """Parse markdown with caching"""
-        return markdown2.markdown(content, extras=self.markdown_extensions)
+        """Parse markdown, reusing HTML from the on-disk cache when available"""
+        if self.markdown_cache is None:
+            with span('markdown2'):
+                return self.markdown_renderer.render(content)
+        html = self.markdown_cache.get(content)
+        if html is None:
+            count('markdown_cache.misses')
+            with span('markdown2'):
+                html = self.markdown_renderer.render(content)
+            self.markdown_cache.put(content, html)
+        else:
+            count('markdown_cache.hits')
+        return html
 
     def optimize_assets(self, folder_path: Path) -> None:
         """Optimize assets in the folder"""
@@ -0,0 +1,94 @@
+"""
+Dependency Graph - Records which files each rendered page pulled in via @include
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyGraph:
+    """Bidirectional map between pages and the files they include"""
+
+    def __init__(self):
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'DependencyGraph':
+        """Load a graph saved by a previous run, empty if missing or unreadable"""
+        graph = cls()
+        path = Path(path)
+        if not path.exists():
+            return graph
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable dependency graph: {str(e)}")
+            return graph
+        for page, dependencies in data.get('pages', {}).items():
+            graph.record(page, dependencies)
+        return graph
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the graph atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {'pages': {page: sorted(deps) for page, deps in sorted(self._dependencies.items())}}
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.deps-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def record(self, page: str, dependencies: Iterable[str]) -> None:
+        """Replace the recorded dependencies of a page"""
+        dependencies = set(dependencies)
+        with self._lock:
+            self._unlink(page)
+            if dependencies:
+                self._dependencies[page] = dependencies
+                for dep in dependencies:
+                    self._dependents.setdefault(dep, set()).add(page)
+
+    def remove(self, page: str) -> None:
+        """Forget a page, e.g. when its section is deleted"""
+        with self._lock:
+            self._unlink(page)
+
+    def _unlink(self, page: str) -> None:
+        """Drop a page from both directions of the graph (caller holds the lock)"""
+        for dep in self._dependencies.pop(page, ()):
+            pages = self._dependents.get(dep)
+            if pages is not None:
+                pages.discard(page)
+                if not pages:
+                    del self._dependents[dep]
+
+    def dependencies(self, page: str) -> Set[str]:
+        """Files a page includes, directly or through nested includes"""
+        with self._lock:
+            return set(self._dependencies.get(page, ()))
+
+    def dependents(self, path: str) -> Set[str]:
+        """Pages that include a file"""
+        with self._lock:
+            return set(self._dependents.get(path, ()))
+
+    def pages_to_rebuild(self, changed_paths: Iterable[str]) -> List[str]:
+        """Pages that must rebuild if any of the given files change"""
+        pages: Set[str] = set()
+        for path in changed_paths:
+            pages |= self.dependents(path)
+        return sorted(pages)
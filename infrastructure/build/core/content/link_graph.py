@@ -0,0 +1,103 @@
+"""
+Link Graph - Cross-section links, inbound and outbound counts and orphaned pages
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+class LinkGraph:
+    """Outbound section links and broken hrefs per page, persisted between incremental builds"""
+
+    def __init__(self):
+        self._outbound: Dict[str, Set[str]] = {}
+        self._broken: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'LinkGraph':
+        """Load the graph emitted by a previous build, empty if missing or unreadable"""
+        graph = cls()
+        path = Path(path)
+        if not path.exists():
+            return graph
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable link graph: {str(e)}")
+            return graph
+        for page, entry in data.get('pages', {}).items():
+            graph.record(page, entry.get('outbound', []), entry.get('broken', []))
+        return graph
+
+    def record(self, page: str, outbound: Iterable[str], broken: Iterable[str]) -> None:
+        """Replace the links recorded for a page"""
+        with self._lock:
+            self._outbound[page] = set(outbound)
+            self._broken[page] = list(broken)
+
+    def remove(self, page: str) -> None:
+        """Forget a page, e.g. when its section is deleted"""
+        with self._lock:
+            self._outbound.pop(page, None)
+            self._broken.pop(page, None)
+
+    def outbound(self, page: str) -> Set[str]:
+        """Sections a page links to"""
+        with self._lock:
+            return set(self._outbound.get(page, ()))
+
+    def broken(self, page: str) -> List[str]:
+        """Hrefs on a page that point nowhere"""
+        with self._lock:
+            return list(self._broken.get(page, ()))
+
+    def report(self) -> Dict:
+        """Per-page inbound and outbound links, orphaned pages and broken links"""
+        with self._lock:
+            pages = sorted(self._outbound)
+            inbound: Dict[str, Set[str]] = {page: set() for page in pages}
+            for page in pages:
+                for target in self._outbound[page]:
+                    if target in inbound:
+                        inbound[target].add(page)
+            return {
+                'pages': {
+                    page: {
+                        'outbound': sorted(self._outbound[page]),
+                        'inbound': sorted(inbound[page]),
+                        'outbound_count': len(self._outbound[page]),
+                        'inbound_count': len(inbound[page]),
+                        'broken': self._broken.get(page, [])
+                    }
+                    for page in pages
+                },
+                'orphans': [page for page in pages if not inbound[page]],
+                'broken_count': sum(len(hrefs) for hrefs in self._broken.values())
+            }
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the report atomically, leaving the file untouched when nothing changed"""
+        path = Path(path)
+        text = json.dumps(self.report(), indent=2)
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                return
+        except (OSError, UnicodeDecodeError):
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.links-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
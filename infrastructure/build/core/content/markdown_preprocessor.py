@@ -0,0 +1,113 @@
+"""
+Markdown Preprocessor - Rewrites links, expands directives and collects page facts in one scan
+"""
+
+import re
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, List, NamedTuple, Optional, Set, Tuple
+
+
+class Heading(NamedTuple):
+    level: int
+    title: str
+    anchor: str
+
+
+class Link(NamedTuple):
+    text: str
+    href: str
+    is_image: bool
+
+
+@dataclass
+class PreprocessResult:
+    """Preprocessed markdown plus the facts later stages need"""
+    content: str
+    headings: List[Heading] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    dependencies: Set[str] = field(default_factory=set)
+
+
+# Called with (kind, target, base_path, include_stack) for every @include directive
+IncludeResolver = Callable[[str, str, Path, Tuple[Path, ...]], PreprocessResult]
+
+
+def slugify(title: str) -> str:
+    """Anchor id for a heading title"""
+    slug = re.sub(r'[^\w\s-]', '', title.lower())
+    return re.sub(r'[-\s]+', '-', slug).strip('-')
+
+
+class MarkdownPreprocessor:
+    """Single-pass tokenizer for the markdown the library feeds to markdown2"""
+
+    # Alternation order matters: fences and headings only match at line start,
+    # and a heading token stops after its hashes so links in the title are still seen
+    TOKEN_PATTERN = re.compile(
+        r'^(?P<fence> {0,3}(?:```|~~~))'
+        r'|^(?P<hashes>#{1,6})[ \t]*(?=[^\s#])'
+        r'|@include\((?P<kind>code|file):(?P<target>.*?)\)'
+        r'|(?P<bang>!?)\[(?P<text>[^\]\n]*)\]\((?P<href>[^)\s]+)\)',
+        re.MULTILINE
+    )
+
+    def __init__(self, resolve_include: Optional[IncludeResolver] = None):
+        self.resolve_include = resolve_include
+
+    def run(self, content: str, base_path: Path,
+            stack: Tuple[Path, ...] = ()) -> PreprocessResult:
+        """Scan content once, returning the rewritten text and everything collected on the way"""
+        result = PreprocessResult(content='')
+        pieces = []
+        position = 0
+        fence = None
+
+        for match in self.TOKEN_PATTERN.finditer(content):
+            start = match.start()
+
+            if match.group('fence') is not None:
+                marker = match.group('fence').strip()
+                if fence is None:
+                    fence = marker
+                elif marker == fence:
+                    fence = None
+                continue
+
+            if match.group('kind') is not None:
+                # Includes expand everywhere, fenced blocks included
+                pieces.append(content[position:start])
+                position = match.end()
+                if self.resolve_include is None:
+                    pieces.append(match.group(0))
+                    continue
+                fragment = self.resolve_include(
+                    match.group('kind'), match.group('target'), base_path, stack
+                )
+                pieces.append(fragment.content)
+                result.headings.extend(fragment.headings)
+                result.links.extend(fragment.links)
+                result.dependencies.update(fragment.dependencies)
+                continue
+
+            if fence is not None:
+                continue
+
+            if match.group('hashes') is not None:
+                end = content.find('\n', match.end())
+                title = content[match.end():end if end != -1 else len(content)]
+                title = title.rstrip().rstrip('#').rstrip()
+                result.headings.append(Heading(len(match.group('hashes')), title, slugify(title)))
+                continue
+
+            href = match.group('href')
+            is_image = bool(match.group('bang'))
+            result.links.append(Link(match.group('text'), href, is_image))
+            if href.endswith('.md') and not is_image:
+                pieces.append(content[position:start])
+                pieces.append(f"[{match.group('text')}]({href[:-3]}.html)")
+                position = match.end()
+
+        pieces.append(content[position:])
+        result.content = ''.join(pieces)
+        return result
@@ -0,0 +1,95 @@
+"""
+Site Index - Every source file and planned output path, for link checks without I/O
+"""
+
+import os
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .markdown_preprocessor import Link
+
+
+class SiteIndex:
+    """Inventory of the site built once per build so link checks become set lookups"""
+
+    EXTERNAL_PREFIXES = ('http:', 'https:', 'mailto:', 'tel:', 'ftp:', 'data:', 'javascript:', '//')
+
+    def __init__(self, sources: Iterable[str], outputs: Iterable[str], sections: Iterable[str]):
+        self.sources: Set[str] = set(sources)
+        self.outputs: Set[str] = set(outputs)
+        self.sections: Set[str] = set(sections)
+
+    @classmethod
+    def scan(cls, content_dir: Path, sections: Iterable[Path],
+             static_outputs: Iterable[str] = ()) -> 'SiteIndex':
+        """Walk the content tree once and plan the outputs each section will produce"""
+        content_dir = Path(content_dir)
+        sources = set()
+        for dirpath, dirnames, filenames in os.walk(content_dir):
+            rel_dir = Path(dirpath).relative_to(content_dir).as_posix()
+            prefix = '' if rel_dir == '.' else rel_dir + '/'
+            sources.update(prefix + name for name in filenames)
+
+        section_names = [Path(s).name for s in sections]
+        outputs = set(static_outputs)
+        outputs.update(f'{name}/index.html' for name in section_names)
+        # One pass over the sources rather than one per section
+        names = set(section_names)
+        for source in sources:
+            parts = source.split('/', 2)
+            if len(parts) == 3 and parts[1] == 'images' and parts[0] in names:
+                outputs.add(source)
+        return cls(sources, outputs, section_names)
+
+    def resolve(self, page: str, href: str) -> Optional[str]:
+        """Site-relative target of a link on a page, or None for external links and anchors"""
+        href = href.strip()
+        if not href or href.startswith('#') or href.lower().startswith(self.EXTERNAL_PREFIXES):
+            return None
+        href = unquote(href.split('#', 1)[0].split('?', 1)[0])
+        if not href:
+            return None
+        if href.startswith('/'):
+            target = posixpath.normpath(href.lstrip('/')) if href != '/' else ''
+        else:
+            target = posixpath.normpath(posixpath.join(page, href))
+        if target in ('', '.'):
+            return 'index.html'
+        if href.endswith('/'):
+            target += '/index.html'
+        return target
+
+    def exists(self, target: str) -> bool:
+        """Check a resolved target against the outputs the build produces"""
+        return target in self.outputs or f'{target}/index.html' in self.outputs
+
+    def section_of(self, target: str) -> Optional[str]:
+        """Section a target belongs to, if any"""
+        head = target.split('/', 1)[0]
+        return head if head in self.sections else None
+
+    def check_links(self, page: str, links: Iterable[Link]) -> Tuple[Set[str], List[str]]:
+        """Return the sections a page links to and the hrefs that point nowhere"""
+        linked: Set[str] = set()
+        broken: List[str] = []
+        seen = set()
+        for link in links:
+            if link.href in seen:
+                continue
+            seen.add(link.href)
+            href = link.href
+            if href.endswith('.md') and not link.is_image:
+                # The preprocessor rewrites .md links to .html, so check the link the page will hold
+                href = href[:-3] + '.html'
+            target = self.resolve(page, href)
+            if target is None:
+                continue
+            if not self.exists(target):
+                broken.append(link.href)
+                continue
+            section = self.section_of(target)
+            if section is not None and section != page:
+                linked.add(section)
+        return linked, broken
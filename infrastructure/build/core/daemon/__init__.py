@@ -0,0 +1,15 @@
+"""
+Build daemon module
+"""
+
+from ..lazy import lazy_exports
+
+# The client must stay cheap to import; only the daemon itself loads the build system
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BuildDaemon': '.build_daemon',
+    'DaemonClient': '.client',
+    'DaemonError': '.protocol',
+    'default_socket_path': '.protocol'
+})
+
+__all__ = ['BuildDaemon', 'DaemonClient', 'DaemonError', 'default_socket_path']
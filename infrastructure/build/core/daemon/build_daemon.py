@@ -0,0 +1,254 @@
+"""
+Build Daemon - Keeps a warm Builder resident and serves build requests over a Unix socket
+"""
+
+import os
+import time
+import socket
+import logging
+import threading
+import socketserver
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..watch import FileWatcher
+from .protocol import DaemonError, MAX_MESSAGE_BYTES, decode_message, default_socket_path, encode_message
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one request line, answers with one response line"""
+
+    # A client that connects and never sends a request can't hold up shutdown
+    timeout = 30
+
+    def handle(self) -> None:
+        daemon: 'BuildDaemon' = self.server.daemon
+        start = time.perf_counter()
+        try:
+            request = decode_message(self.rfile.readline(MAX_MESSAGE_BYTES + 1))
+            response = {'ok': True, 'result': daemon.handle(request)}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        response['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        try:
+            self.wfile.write(encode_message(response))
+        except OSError:
+            logger.debug("Client went away before the response was sent")
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Request threads are joined on close, so in-flight builds finish and get answered
+    daemon_threads = False
+
+    def __init__(self, socket_path: str, daemon: 'BuildDaemon'):
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class BuildDaemon:
+    """Long-lived build server for editor integrations and hooks
+
+    The Builder, its Jinja environment, snapshot reads, metadata and caches
+    stay warm between requests. Builds run one at a time under a lock;
+    status requests bypass it. A file watcher invalidates cached reads as
+    sources change, a changed build_config.json replaces the Builder, and
+    the daemon exits once no request has arrived for idle_timeout seconds.
+    """
+
+    COMMANDS = ('build', 'section', 'validate', 'status', 'stop')
+
+    def __init__(self, root_path: Union[str, Path], socket_path: Optional[Union[str, Path]] = None,
+                 idle_timeout: float = 900.0, executor: Optional[str] = None, use_polling: bool = False):
+        self.root_path = Path(root_path).resolve()
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path(self.root_path)
+        self.idle_timeout = idle_timeout
+        self.executor = executor
+        self.use_polling = use_polling
+        self.builder = None
+        self._config_stamp: Optional[Tuple[int, int]] = None
+        # Set when a reloaded Builder has not built with its new configuration yet
+        self._config_changed = False
+        # Builds and cache invalidation never overlap
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._active = 0
+        self._activity_lock = threading.Lock()
+        self._last_activity = time.monotonic()
+        self.started = time.time()
+        self.requests = 0
+
+    def _config_path(self) -> Path:
+        return self.root_path / 'build_config.json'
+
+    def _stat_config(self) -> Tuple[int, int]:
+        st = self._config_path().stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _load_builder(self) -> None:
+        """Create the Builder and warm it with an incremental build"""
+        from ...build import Builder
+        start = time.perf_counter()
+        self._config_stamp = self._stat_config()
+        self.builder = Builder(self.root_path, executor=self.executor)
+        self.builder.build()
+        # Later builds run in this warm process rather than a fresh pool, as in watch mode
+        self.builder.executor = 'thread'
+        logger.info(f"Builder warmed up in {time.perf_counter() - start:.1f} s")
+
+    def _refresh(self) -> None:
+        """Replace the Builder if its configuration changed since it was created"""
+        if self._stat_config() == self._config_stamp:
+            return
+        from ...build import Builder
+        logger.info("Build configuration changed, reloading the builder")
+        self._config_stamp = self._stat_config()
+        # The old builder's chunk pool workers would otherwise outlive it
+        self.builder.close()
+        self.builder = Builder(self.root_path, executor='thread')
+        # The request that follows does the rebuild, so it reports what changed
+        self._config_changed = True
+
+    def on_change(self, paths: Set[Path]) -> None:
+        """Watcher callback: drop cached reads and rendered fragments for changed files"""
+        with self._lock:
+            builder = self.builder
+            if builder is None:
+                return
+            templates_dir = builder.templates_dir.resolve()
+            for path in paths:
+                builder.content_processor.invalidate(path)
+                if path.resolve().is_relative_to(templates_dir):
+                    # Partials re-render on next use; build() renders them all again anyway
+                    builder.fragments.clear()
+                    builder.page_template = None
+        logger.debug(f"Invalidated {len(paths)} changed files")
+
+    def _check_name(self, name: Any) -> str:
+        """Refuse anything that is not a section folder name, such as a path"""
+        if not isinstance(name, str) or not self.builder.SECTION_PATTERN.fullmatch(name):
+            raise DaemonError(f"Not a section name: {name!r}")
+        return name
+
+    def _section_dir(self, name: Any) -> Path:
+        section_dir = self.builder.content_dir / self._check_name(name)
+        if not section_dir.is_dir():
+            raise DaemonError(f"No such section: {name}")
+        return section_dir
+
+    def build(self, force: bool = False) -> Dict:
+        """Incremental (or forced) build of the whole site"""
+        rebuilt = self.builder.build(force=force)
+        self._config_changed = False
+        return {'rebuilt': rebuilt}
+
+    def build_sections(self, names: Iterable[str]) -> Dict:
+        """Rebuild sections now, with any pages whose navigation they change"""
+        changed = []
+        for section_dir in map(self._section_dir, names):
+            # Editors call right after saving, possibly before the watcher has seen the change
+            changed.extend([section_dir / 'README.md', section_dir / 'section_config.json'])
+        if self._config_changed:
+            # A new configuration can change every page, which rebuild_changed turns into a build
+            changed.append(self._config_path())
+            self._config_changed = False
+        return {'rebuilt': self.builder.rebuild_changed(changed)}
+
+    def validate(self, names: Optional[List[str]] = None) -> Dict:
+        """Check section structure, for every section unless names are given"""
+        manager = self.builder.section_manager
+        names = [self._check_name(name) for name in names] if names else manager.discover_sections()
+        errors = {}
+        for name in names:
+            section_errors = manager.validate_section(name)
+            if section_errors:
+                errors[name] = section_errors
+        return {'checked': len(names), 'errors': errors}
+
+    def status(self) -> Dict:
+        """Uptime and counters; answered without waiting for a running build"""
+        return {
+            'pid': os.getpid(),
+            'root': str(self.root_path),
+            'uptime_s': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'busy': self._lock.locked(),
+            'idle_timeout_s': self.idle_timeout
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        """Run one decoded request and return its result"""
+        command = request.get('command')
+        if command not in self.COMMANDS:
+            raise DaemonError(f"Unknown command: {command!r}")
+        with self._activity_lock:
+            self._active += 1
+            self.requests += 1
+        try:
+            if command == 'status':
+                return self.status()
+            if command == 'stop':
+                self._stop.set()
+                return {'stopping': True}
+            with self._lock:
+                self._refresh()
+                if command == 'build':
+                    return self.build(force=bool(request.get('force')))
+                if command == 'section':
+                    return self.build_sections(request.get('sections') or [])
+                return self.validate(request.get('sections'))
+        finally:
+            with self._activity_lock:
+                self._active -= 1
+                self._last_activity = time.monotonic()
+
+    def _idle(self) -> bool:
+        with self._activity_lock:
+            return not self._active and time.monotonic() - self._last_activity > self.idle_timeout
+
+    def _claim_socket(self) -> None:
+        """Remove a socket left by a daemon that died, refusing to displace a live one"""
+        if not self.socket_path.exists():
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+                return
+        raise DaemonError(f"A build daemon is already listening on {self.socket_path}")
+
+    def serve(self) -> None:
+        """Warm up, then serve requests until stopped or idle for too long"""
+        self._claim_socket()
+        with self._lock:
+            self._load_builder()
+        builder = self.builder
+        watcher = FileWatcher([builder.content_dir, builder.templates_dir, builder.static_dir],
+                              self.on_change, use_polling=self.use_polling)
+
+        # Only the owner may talk to the daemon
+        old_umask = os.umask(0o177)
+        try:
+            server = _DaemonServer(str(self.socket_path), self)
+        finally:
+            os.umask(old_umask)
+        server.timeout = 0.5
+        watcher.start()
+        self._last_activity = time.monotonic()
+        logger.info(f"Build daemon listening on {self.socket_path}")
+        try:
+            while not self._stop.is_set():
+                server.handle_request()
+                if self._idle():
+                    logger.info(f"No requests for {self.idle_timeout:.0f} s, shutting down")
+                    break
+        except KeyboardInterrupt:
+            logger.info("Stopping build daemon")
+        finally:
+            watcher.stop()
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            if self.builder is not None:
+                self.builder.close()
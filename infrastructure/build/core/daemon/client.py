@@ -0,0 +1,45 @@
+"""
+Daemon Client - Sends one request to a running build daemon and returns its result
+"""
+
+import socket
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .protocol import DaemonError, MAX_MESSAGE_BYTES, decode_message, encode_message
+
+
+class DaemonClient:
+    """Thin client for BuildDaemon; imports nothing from the build system"""
+
+    def __init__(self, socket_path: Union[str, Path], timeout: Optional[float] = None):
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+
+    def request(self, command: str, **params: Any) -> Any:
+        """Send a command and return its result, raising DaemonError if it failed"""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(encode_message({'command': command, **params}))
+                with sock.makefile('rb') as f:
+                    line = f.readline(MAX_MESSAGE_BYTES + 1)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise DaemonError(f"No build daemon listening on {self.socket_path}")
+        except socket.timeout:
+            raise DaemonError(f"Build daemon did not answer within {self.timeout} s")
+        if not line:
+            raise DaemonError("Build daemon closed the connection without answering")
+        response = decode_message(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response.get('result')
+
+    def is_running(self) -> bool:
+        """Whether a daemon answers on the socket"""
+        try:
+            self.request('status')
+            return True
+        except DaemonError:
+            return False
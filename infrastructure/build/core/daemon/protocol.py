@@ -0,0 +1,40 @@
+"""
+Daemon protocol - One JSON object per line over a Unix domain socket
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+SOCKET_NAME = '.build-daemon.sock'
+
+# Requests and responses are small; anything larger is a confused or hostile peer
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+
+class DaemonError(Exception):
+    """A daemon request could not be made or was refused"""
+    pass
+
+
+def default_socket_path(root_path: Path) -> Path:
+    """Socket the daemon for a site root listens on"""
+    return Path(root_path).resolve() / SOCKET_NAME
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Serialize a message as a single line of JSON"""
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    """Parse a line received from the socket"""
+    if len(line) > MAX_MESSAGE_BYTES or not line.endswith(b'\n'):
+        raise DaemonError("Message too long or truncated")
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise DaemonError(f"Malformed message: {str(e)}")
+    if not isinstance(message, dict):
+        raise DaemonError("Message must be a JSON object")
+    return message
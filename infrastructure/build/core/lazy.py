@@ -0,0 +1,29 @@
+"""
+Lazy exports - Package attributes imported from their modules on first access
+"""
+
+import sys
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Module __getattr__ and __dir__ for a package whose exports load on demand
+
+    exports maps each public name to the module defining it, relative to the
+    package. Importing the package then costs nothing; a subsystem and its
+    third-party dependencies load the first time one of its names is used.
+    """
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        # Later lookups find the attribute directly and skip this hook
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
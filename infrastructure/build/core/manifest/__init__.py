@@ -0,0 +1,7 @@
+"""
+Incremental build manifest module
+"""
+
+from .build_manifest import BuildManifest, hash_files
+
+__all__ = ['BuildManifest', 'hash_files']
@@ -0,0 +1,114 @@
+"""
+Build Manifest - Persistent record of section input hashes for incremental builds
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def hash_files(paths: Iterable[Path], root: Optional[Path] = None,
+               read_bytes: Optional[Callable[[Path], bytes]] = None) -> str:
+    """Hash the names and contents of a set of files in a stable order"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        name = path.relative_to(root) if root else path
+        digest.update(name.as_posix().encode('utf-8'))
+        digest.update(b'\0')
+        if read_bytes is not None:
+            try:
+                digest.update(read_bytes(path))
+            except (FileNotFoundError, IsADirectoryError):
+                pass
+        elif path.is_file():
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Tracks which inputs produced each built section"""
+
+    FILENAME = '.build_manifest.json'
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = Path(state_dir)
+        self.path = self.state_dir / self.FILENAME
+        self.global_hash = ''
+        self.sections: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, state_dir: Path) -> 'BuildManifest':
+        """Load the manifest from the build state directory, empty if missing or unreadable"""
+        manifest = cls(state_dir)
+        if not manifest.path.exists():
+            return manifest
+        try:
+            data = json.loads(manifest.path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable build manifest: {str(e)}")
+            return manifest
+        if data.get('version') != MANIFEST_VERSION:
+            logger.info("Build manifest version changed, rebuilding everything")
+            return manifest
+        manifest.global_hash = data.get('global_hash', '')
+        manifest.sections = data.get('sections', {})
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically so an interrupted build never leaves it half-written"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'generated': datetime.utcnow().isoformat(),
+            'global_hash': self.global_hash,
+            'sections': dict(sorted(self.sections.items()))
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, prefix='.manifest-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def reset(self, global_hash: str) -> None:
+        """Forget all recorded sections, e.g. after a clean rebuild or a global input change"""
+        self.global_hash = global_hash
+        self.sections = {}
+
+    def is_stale(self, section: str, input_hash: str) -> bool:
+        """Check whether a section must be rebuilt"""
+        entry = self.sections.get(section)
+        return entry is None or entry.get('input_hash') != input_hash
+
+    def record(self, section: str, input_hash: str) -> None:
+        """Record a successfully built section"""
+        self.sections[section] = {
+            'input_hash': input_hash,
+            'built': datetime.utcnow().isoformat()
+        }
+
+    def remove(self, section: str) -> None:
+        """Forget a single section"""
+        self.sections.pop(section, None)
+
+    def remove_missing(self, current_sections: Iterable[str]) -> List[str]:
+        """Drop entries for sections that no longer exist and return their names"""
+        current = set(current_sections)
+        removed = [name for name in self.sections if name not in current]
+        for name in removed:
+            del self.sections[name]
+        return removed
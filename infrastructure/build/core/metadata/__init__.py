@@ -4,5 +4,6 @@ Metadata management module
 
 from .metadata_manager import MetadataManager
 from .metadata_enricher import MetadataEnricher
+from .metadata_store import MetadataStore
 
-__all__ = ['MetadataManager', 'MetadataEnricher']
+__all__ = ['MetadataManager', 'MetadataEnricher', 'MetadataStore']
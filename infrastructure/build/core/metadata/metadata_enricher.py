@@ -1,23 +1,54 @@
-from typing import Any, List, Optional, Union, Dict, Callable
+from typing import Any, List, Optional, Union, Dict, Callable, Tuple
 import os
 import json
-import markdown2
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from ..vfs import SnapshotFS
+
+CACHE_VERSION = 1
+
+# Where the cache was kept before it moved under the build cache directory
+LEGACY_CACHE_FILE = '.metadata_enricher_cache.json'
+
+CATEGORY_RANGES = {'01-10': 'Introduction and Fundamentals', '11-20': 'Advanced Strategies', '21-30': 'Professional Development', '31-40': 'Tools and Resources', '41-50': 'Advanced Topics'}
+
+def category_for_prefix(prefix: str) -> str:
+    """Map a folder's numeric prefix to its library category"""
+    try:
+        number = int(prefix)
+    except ValueError:
+        return 'Uncategorized'
+    for range_key, category in CATEGORY_RANGES.items():
+        start, end = map(int, range_key.split('-'))
+        if start <= number <= end:
+            return category
+    return 'Uncategorized'
 
 class MetadataEnricher:
 
-    def __init__(self: Any, root_path: str, *args: Any, **kwargs: Any) -> Any:
+    def __init__(self: Any, root_path: str, *args: Any, fs: Optional[SnapshotFS] = None,
+                 cache_dir: Optional[str] = None, max_workers: Optional[int] = None, **kwargs: Any) -> Any:
         self.root_path = root_path
+        self.fs = fs or SnapshotFS()
+        self.max_workers = max_workers
         self.metadata_file = os.path.join(root_path, 'library_metadata.json')
+        # Per-folder fingerprints and the metadata they produced, reused while unchanged; no cache_dir, no cache
+        self.cache_file = os.path.join(cache_dir, 'enricher.json') if cache_dir else None
+        self.stats = {'reused': 0, 'generated': 0}
 
     def extract_readme_summary(self: Any, folder_path: str) -> str:
-        """Extract summary from README.md"""
+        """Extract summary from README.md: its text up to the first blank line"""
         readme_path = os.path.join(folder_path, 'README.md')
-        if not os.path.exists(readme_path):
+        try:
+            content = self.fs.read_text(readme_path)
+        except FileNotFoundError:
             return 'No description available.'
-        with open(readme_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            summary = content.split('\n\n')[0] if content.split('\n\n') else content[:200]
-            return summary
+        return content.split('\n\n', 1)[0]
+
+    def _list_content_files(self: Any, folder_path: str) -> List[str]:
+        with os.scandir(folder_path) as entries:
+            return [entry.name for entry in entries if entry.name.endswith(('.md', '.txt', '.html'))]
 
     def generate_folder_metadata(self: Any, folder_name: str) -> Dict[str, Any]:
         """Generate comprehensive metadata for a folder"""
@@ -26,9 +57,7 @@ class MetadataEnricher:
             prefix, title = folder_name.split('_', 1)
         except ValueError:
             prefix, title = ('00', folder_name)
-        categories = {'01-10': 'Introduction and Fundamentals', '11-20': 'Advanced Strategies', '21-30': 'Professional Development', '31-40': 'Tools and Resources', '41-50': 'Advanced Topics'}
-        category = next((cat for range_key, cat in categories.items() if self._in_range(prefix, range_key)), 'Uncategorized')
-        metadata = {'id': folder_name, 'title': title.replace('_', ' '), 'category': category, 'summary': self.extract_readme_summary(folder_path), 'tags': [word.lower() for word in title.split('_')], 'content_files': [f for f in os.listdir(folder_path) if f.endswith(('.md', '.txt', '.html'))], 'difficulty': self._determine_difficulty(folder_name)}
+        metadata = {'id': folder_name, 'title': title.replace('_', ' '), 'category': category_for_prefix(prefix), 'summary': self.extract_readme_summary(folder_path), 'tags': [word.lower() for word in title.split('_')], 'content_files': self._list_content_files(folder_path), 'difficulty': self._determine_difficulty(folder_name)}
         return metadata
 
     def _in_range(self: Any, prefix: str, range_key: str) -> bool:
@@ -42,27 +71,80 @@ class MetadataEnricher:
         prefix = folder_name.split('_')[0]
         return next((diff for range_key, diff in difficulty_map.items() if self._in_range(prefix, range_key)), 'Unspecified')
 
+    def _fingerprint(self: Any, entry: os.DirEntry) -> List[int]:
+        """Folder mtime covers added/removed files; README stat covers the summary"""
+        folder_stat = entry.stat()
+        try:
+            readme_stat = os.stat(os.path.join(entry.path, 'README.md'))
+            readme = [readme_stat.st_mtime_ns, readme_stat.st_size]
+        except FileNotFoundError:
+            readme = [0, -1]
+        return [folder_stat.st_mtime_ns] + readme
+
+    def _scan_folders(self: Any) -> List[os.DirEntry]:
+        """List knowledge block folders with a single directory walk"""
+        prefixes = tuple((str(i).zfill(2) for i in range(1, 50)))
+        with os.scandir(self.root_path) as entries:
+            folders = [entry for entry in entries if entry.name.startswith(prefixes) and entry.is_dir()]
+        return sorted(folders, key=lambda entry: entry.name)
+
+    def _load_cache(self: Any) -> Dict[str, Any]:
+        if self.cache_file is None:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache.get('folders', {}) if cache.get('version') == CACHE_VERSION else {}
+
+    def _write_json(self: Any, path: str, data: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
     def enrich_library_metadata(self: Any) -> Dict[str, Any]:
-        """Generate comprehensive library metadata"""
+        """Generate comprehensive library metadata, regenerating only changed folders"""
+        cache = self._load_cache()
+        folders = self._scan_folders()
+        fingerprints = {entry.name: self._fingerprint(entry) for entry in folders}
+        stale = [entry.name for entry in folders if cache.get(entry.name, {}).get('fingerprint') != fingerprints[entry.name]]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            generated = dict(zip(stale, executor.map(self.generate_folder_metadata, stale)))
+        self.stats = {'reused': len(folders) - len(stale), 'generated': len(stale)}
         library_metadata = {'total_knowledge_blocks': 0, 'categories': {}, 'knowledge_blocks': {}}
-        for folder in sorted(os.listdir(self.root_path)):
-            if os.path.isdir(os.path.join(self.root_path, folder)) and folder.startswith(tuple((str(i).zfill(2) for i in range(1, 50)))):
-                block_metadata = self.generate_folder_metadata(folder)
-                library_metadata['knowledge_blocks'][folder] = block_metadata
-                category = block_metadata['category']
-                library_metadata['categories'][category] = library_metadata['categories'].get(category, 0) + 1
-                library_metadata['total_knowledge_blocks'] += 1
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(library_metadata, f, indent=2)
+        new_cache = {}
+        for entry in folders:
+            block_metadata = generated[entry.name] if entry.name in generated else cache[entry.name]['metadata']
+            new_cache[entry.name] = {'fingerprint': fingerprints[entry.name], 'metadata': block_metadata}
+            library_metadata['knowledge_blocks'][entry.name] = block_metadata
+            category = block_metadata['category']
+            library_metadata['categories'][category] = library_metadata['categories'].get(category, 0) + 1
+            library_metadata['total_knowledge_blocks'] += 1
+        self._write_json(self.metadata_file, library_metadata)
+        if self.cache_file is not None:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            self._write_json(self.cache_file, {'version': CACHE_VERSION, 'folders': new_cache})
+        try:
+            os.unlink(os.path.join(self.root_path, LEGACY_CACHE_FILE))
+        except FileNotFoundError:
+            pass
         return library_metadata
 
-def main(root_path: str, *args: Any, **kwargs: Any) -> Any:
-    enricher = MetadataEnricher(root_path)
+def main(root_path: str, *args: Any, cache_dir: Optional[str] = None, **kwargs: Any) -> Any:
+    enricher = MetadataEnricher(root_path, cache_dir=cache_dir)
     library_metadata = enricher.enrich_library_metadata()
     print('Library Metadata Generated Successfully:')
     print(f'Total Knowledge Blocks: {library_metadata["total_knowledge_blocks"]}')
+    print(f'Folders regenerated: {enricher.stats["generated"]}, reused: {enricher.stats["reused"]}')
     print('Categories:', json.dumps(library_metadata['categories'], indent=2))
 
 if __name__ == '__main__':
-    root_path = 'C:\\Users\\ihelp\\KnowledgeLibrary\\Templates_NEW'
-    main(root_path)
\ No newline at end of file
+    import sys
+    from ...cli import main as cli_main
+    sys.exit(cli_main(['enrich', *sys.argv[1:]]))
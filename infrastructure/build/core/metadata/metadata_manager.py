@@ -3,13 +3,20 @@
 Metadata Manager - Tool for incrementally updating library_metadata.json
 """
 
+import os
+import re
 import json
 import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 import logging
 
+from ..vfs import SnapshotFS
+from .metadata_store import MetadataStore, entry_categories
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,12 +25,37 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class MetadataManager:
-    def __init__(self, root_path: str):
+    SECTION_PATTERN = re.compile(r'^\d{2}_\w+')
+    BACKENDS = ('json', 'sqlite')
+    
+    def __init__(self, root_path: str, fs: Optional[SnapshotFS] = None, max_workers: Optional[int] = None,
+                 backend: str = 'json', db_path: Optional[Path] = None):
         self.root_path = Path(root_path)
+        self.fs = fs or SnapshotFS()
+        self.max_workers = max_workers
         self.metadata_path = self.root_path / 'library_metadata.json'
         self.backup_dir = self.root_path / 'backups' / 'metadata'
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
+        # With the SQLite backend the database is authoritative and the JSON file is an export
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown metadata backend: {backend}")
+        self._store = None
+        self._db_path = Path(db_path) if db_path else self.root_path / 'library_metadata.db'
+        self.backend = backend
+        
+    @property
+    def store(self) -> Optional[MetadataStore]:
+        """The SQLite store, seeded from the JSON file on first use"""
+        if self.backend != 'sqlite':
+            return None
+        if self._store is None:
+            self._store = MetadataStore(self._db_path)
+            if self._store.is_empty() and self.fs.exists(self.metadata_path):
+                count = self._store.import_json(json.loads(self.fs.read_text(self.metadata_path)))
+                logger.info(f"Imported {count} metadata entries into {self._db_path.name}")
+        return self._store
+        
     def backup_metadata(self) -> Path:
         """Create a backup of the current metadata file"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -35,9 +67,10 @@ class MetadataManager:
         
     def load_metadata(self) -> Dict:
         """Load current metadata, creating if doesn't exist"""
-        if self.metadata_path.exists():
-            with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        if self.store is not None:
+            return self.store.export()
+        if self.fs.exists(self.metadata_path):
+            return json.loads(self.fs.read_text(self.metadata_path))
         return {
             "version": "1.0.0",
             "lastUpdated": datetime.utcnow().isoformat(),
@@ -45,66 +78,157 @@ class MetadataManager:
         }
         
     def save_metadata(self, metadata: Dict) -> None:
-        """Save metadata with proper formatting"""
-        with open(self.metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=4, ensure_ascii=False)
+        """Save metadata with proper formatting, replacing the file atomically"""
+        if self.store is not None:
+            keep = {entry['id'] for entry in metadata['entries']}
+            self.store.delete(entry_id for entry_id in self.store.ids() if entry_id not in keep)
+            self.store.import_json(metadata)
+            self.export_metadata()
+            return
+        self._write_json(metadata)
         logger.info("Metadata saved successfully")
         
-    def update_section_metadata(self, section_id: str) -> bool:
-        """Update metadata for a single section"""
+    def export_metadata(self) -> None:
+        """Write the store's deterministic JSON export for the static site"""
+        self._write_json(self.store.export())
+        logger.info(f"Exported metadata to {self.metadata_path.name}")
+        
+    def _write_json(self, metadata: Dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.metadata_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.metadata_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self.fs.invalidate(self.metadata_path)
+        
+    def _read_section_config(self, section_id: str) -> Optional[Dict]:
+        """Read a section's config, logging why it is unusable"""
         section_dir = self.root_path / section_id
         if not section_dir.exists():
             logger.error(f"Section directory not found: {section_id}")
-            return False
+            return None
             
         config_path = section_dir / 'section_config.json'
-        if not config_path.exists():
+        if not self.fs.exists(config_path):
             logger.error(f"Section config not found: {section_id}")
-            return False
+            return None
             
         try:
-            # Load current metadata
-            metadata = self.load_metadata()
+            return json.loads(self.fs.read_text(config_path))
+        except Exception as e:
+            logger.error(f"Error reading config for {section_id}: {str(e)}")
+            return None
             
-            # Load section config
-            with open(config_path, 'r', encoding='utf-8') as f:
-                section_config = json.load(f)
-                
-            # Create or update entry
-            entry = {
-                "id": section_id,
-                "title": section_config['template']['slots']['meta']['title'],
-                "path": section_id,
-                "type": "document",
-                "summary": section_config['template']['slots']['meta']['description'],
-                "tags": section_config['template']['slots']['meta']['keywords'],
-                "created": section_config['metadata']['created'],
-                "modified": section_config['metadata']['modified'],
-                "author": section_config['metadata']['author']
-            }
+    def _build_entry(self, section_id: str, section_config: Dict) -> Dict:
+        """Create the metadata entry for a section"""
+        meta = section_config['template']['slots']['meta']
+        return {
+            "id": section_id,
+            "title": meta['title'],
+            "path": section_id,
+            "type": "document",
+            "summary": meta['description'],
+            "tags": meta['keywords'],
+            "created": section_config['metadata']['created'],
+            "modified": section_config['metadata']['modified'],
+            "author": section_config['metadata']['author']
+        }
+        
+    def update_sections(self, section_ids: Iterable[str]) -> Dict[str, bool]:
+        """Update metadata for many sections with one load and one save"""
+        section_ids = list(dict.fromkeys(section_ids))
+        
+        # Config reads are I/O bound, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            configs = list(executor.map(self._read_section_config, section_ids))
             
-            # Update or add entry
-            entry_index = next((i for i, e in enumerate(metadata['entries']) 
-                              if e['id'] == section_id), None)
-            if entry_index is not None:
-                metadata['entries'][entry_index] = entry
-            else:
-                metadata['entries'].append(entry)
+        results = {}
+        updated = {}
+        for section_id, section_config in zip(section_ids, configs):
+            if section_config is None:
+                results[section_id] = False
+                continue
+            try:
+                updated[section_id] = self._build_entry(section_id, section_config)
+                results[section_id] = True
+            except Exception as e:
+                logger.error(f"Error updating metadata for {section_id}: {str(e)}")
+                results[section_id] = False
                 
-            # Update last modified
+        if not updated:
+            return results
+        if self.store is not None:
+            # Upserts touch only the changed rows, in a single transaction
+            self.store.upsert(updated.values())
+            self.export_metadata()
+        else:
+            metadata = self.load_metadata()
+            # Index entries by id so each update is a dict lookup, keeping file order
+            entries = {entry['id']: entry for entry in metadata['entries']}
+            entries.update(updated)
+            metadata['entries'] = list(entries.values())
             metadata['lastUpdated'] = datetime.utcnow().isoformat()
-            
-            # Save changes
             self.save_metadata(metadata)
-            logger.info(f"Updated metadata for section: {section_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error updating metadata for {section_id}: {str(e)}")
-            return False
+        logger.info(f"Updated metadata for {len(updated)} sections")
+        return results
+        
+    def discover_sections(self) -> List[str]:
+        """List the ids of all section directories"""
+        return sorted(
+            d.name for d in self.root_path.iterdir()
+            if d.is_dir() and self.SECTION_PATTERN.match(d.name)
+        )
+        
+    def sections_by_tag(self, tag: str) -> List[Dict]:
+        """Entries carrying a tag"""
+        if self.store is not None:
+            return self.store.by_tag(tag)
+        return [e for e in self.load_metadata()['entries'] if tag in (e.get('tags') or [])]
+        
+    def sections_by_category(self, category: str) -> List[Dict]:
+        """Entries filed under a category"""
+        if self.store is not None:
+            return self.store.by_category(category)
+        return [e for e in self.load_metadata()['entries'] if category in entry_categories(e)]
+        
+    def recently_modified(self, limit: int = 10) -> List[Dict]:
+        """Most recently modified entries, newest first"""
+        if self.store is not None:
+            return self.store.recently_modified(limit)
+        entries = [e for e in self.load_metadata()['entries'] if e.get('modified')]
+        entries.sort(key=lambda e: e['id'])
+        entries.sort(key=lambda e: e['modified'], reverse=True)
+        return entries[:limit]
+        
+    def update_all(self) -> Dict[str, bool]:
+        """Refresh the metadata of every section"""
+        return self.update_sections(self.discover_sections())
+        
+    def update_section_metadata(self, section_id: str) -> bool:
+        """Update metadata for a single section"""
+        return self.update_sections([section_id])[section_id]
             
     def migrate_section(self, section_id: str) -> bool:
         """Migrate a section to the new structure and update metadata"""
+        return self.migrate_sections([section_id])[section_id]
+        
+    def migrate_sections(self, section_ids: Iterable[str]) -> Dict[str, bool]:
+        """Migrate many sections, then update their metadata in one batch"""
+        section_ids = list(dict.fromkeys(section_ids))
+        migrated = [section_id for section_id in section_ids if self._migrate_files(section_id)]
+        results = dict.fromkeys(section_ids, False)
+        if migrated:
+            results.update(self.update_sections(migrated))
+        for section_id in migrated:
+            if results[section_id]:
+                logger.info(f"Successfully migrated section: {section_id}")
+        return results
+        
+    def _migrate_files(self, section_id: str) -> bool:
+        """Create a section's config and SEO files from its README"""
         section_dir = self.root_path / section_id
         if not section_dir.exists():
             logger.error(f"Section directory not found: {section_id}")
@@ -117,11 +241,9 @@ class MetadataManager:
                 logger.error(f"README.md not found in {section_id}")
                 return False
                 
-            with open(readme_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self.fs.read_text(readme_path)
                 
             # Extract title and description
-            import re
             title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
             desc_match = re.search(r'^##\s+Overview.+?\n(.+?)(?=\n\n|\n##|$)', 
                                  content, re.MULTILINE | re.DOTALL)
@@ -154,6 +276,7 @@ class MetadataManager:
                 # Save config
                 with open(config_path, 'w', encoding='utf-8') as f:
                     json.dump(config, f, indent=4)
+                self.fs.invalidate(config_path)
                     
             # Create SEO.md if it doesn't exist
             seo_path = section_dir / 'SEO.md'
@@ -177,10 +300,6 @@ class MetadataManager:
                 with open(seo_path, 'w', encoding='utf-8') as f:
                     f.write(seo_content)
                     
-            # Update metadata
-            self.update_section_metadata(section_id)
-            
-            logger.info(f"Successfully migrated section: {section_id}")
             return True
             
         except Exception as e:
@@ -188,21 +307,7 @@ class MetadataManager:
             return False
             
 if __name__ == '__main__':
-    import argparse
-    
-    parser = argparse.ArgumentParser(description='Manage iHelper.tech library metadata')
-    parser.add_argument('action', choices=['update', 'migrate'])
-    parser.add_argument('section_id', help='Section ID to process')
-    
-    args = parser.parse_args()
-    
-    manager = MetadataManager('C:/Users/ihelp/Knowledge_Library/iHelper.tech')
+    import sys
+    from ...cli import main
     
-    if args.action == 'update':
-        success = manager.update_section_metadata(args.section_id)
-        if not success:
-            parser.exit(1, 'Failed to update metadata\n')
-    elif args.action == 'migrate':
-        success = manager.migrate_section(args.section_id)
-        if not success:
-            parser.exit(1, 'Failed to migrate section\n')
+    sys.exit(main(['metadata', *sys.argv[1:]]))
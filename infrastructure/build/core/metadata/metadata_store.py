@@ -0,0 +1,169 @@
+"""
+Metadata Store - SQLite backend for library metadata with indexed tag and category lookups
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    modified TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_modified ON entries (modified);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    entry_id TEXT NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (entry_id, tag)
+);
+CREATE INDEX IF NOT EXISTS entry_tags_tag ON entry_tags (tag);
+CREATE TABLE IF NOT EXISTS entry_categories (
+    entry_id TEXT NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    PRIMARY KEY (entry_id, category)
+);
+CREATE INDEX IF NOT EXISTS entry_categories_category ON entry_categories (category);
+"""
+
+# Key order of exported entries, following config/schema/library_metadata_schema.json
+ENTRY_KEY_ORDER = ('id', 'title', 'path', 'type', 'summary', 'tags', 'created',
+                   'modified', 'author', 'dependencies', 'metadata')
+
+
+def entry_categories(entry: Dict) -> List[str]:
+    """Categories live in the free-form metadata object, or at the top level in older entries"""
+    extra = entry.get('metadata') or {}
+    found = []
+    for source in (entry, extra):
+        if source.get('category'):
+            found.append(source['category'])
+        found.extend(source.get('categories') or [])
+    return sorted(set(found))
+
+
+def _canonical(entry: Dict) -> Dict:
+    """Order an entry's keys by the schema, then alphabetically"""
+    ordered = {key: entry[key] for key in ENTRY_KEY_ORDER if key in entry}
+    ordered.update((key, entry[key]) for key in sorted(entry) if key not in ordered)
+    return ordered
+
+
+class MetadataStore:
+    """Library metadata in SQLite: transactional upserts, indexed queries, deterministic JSON export"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def is_empty(self) -> bool:
+        return self.conn.execute('SELECT 1 FROM entries LIMIT 1').fetchone() is None
+
+    def upsert(self, entries: Iterable[Dict], version: Optional[str] = None,
+               last_updated: Optional[str] = None) -> int:
+        """Insert or replace entries in one transaction"""
+        count = 0
+        with self.conn as conn:
+            for entry in entries:
+                entry_id = entry['id']
+                conn.execute(
+                    'INSERT INTO entries (id, title, type, modified, data) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (id) DO UPDATE SET title = excluded.title, type = excluded.type, '
+                    'modified = excluded.modified, data = excluded.data',
+                    (entry_id, entry['title'], entry['type'], entry.get('modified'),
+                     json.dumps(entry, ensure_ascii=False))
+                )
+                conn.execute('DELETE FROM entry_tags WHERE entry_id = ?', (entry_id,))
+                conn.executemany('INSERT OR IGNORE INTO entry_tags (entry_id, tag) VALUES (?, ?)',
+                                 ((entry_id, tag) for tag in entry.get('tags') or []))
+                conn.execute('DELETE FROM entry_categories WHERE entry_id = ?', (entry_id,))
+                conn.executemany('INSERT INTO entry_categories (entry_id, category) VALUES (?, ?)',
+                                 ((entry_id, category) for category in entry_categories(entry)))
+                count += 1
+            conn.execute('INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)',
+                         ('lastUpdated', last_updated or datetime.utcnow().isoformat()))
+            if version is not None:
+                conn.execute('INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)',
+                             ('version', version))
+        return count
+
+    def delete(self, entry_ids: Iterable[str]) -> None:
+        """Remove entries (and their tags and categories) in one transaction"""
+        with self.conn as conn:
+            conn.executemany('DELETE FROM entries WHERE id = ?', ((i,) for i in entry_ids))
+
+    def import_json(self, metadata: Dict) -> int:
+        """Load a library_metadata.json document"""
+        return self.upsert(metadata.get('entries', []), metadata.get('version'),
+                           metadata.get('lastUpdated'))
+
+    def _entries(self, sql: str, params=()) -> List[Dict]:
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def ids(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT id FROM entries ORDER BY id')]
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        entries = self._entries('SELECT data FROM entries WHERE id = ?', (entry_id,))
+        return entries[0] if entries else None
+
+    def by_tag(self, tag: str) -> List[Dict]:
+        return self._entries(
+            'SELECT e.data FROM entry_tags t JOIN entries e ON e.id = t.entry_id '
+            'WHERE t.tag = ? ORDER BY e.id', (tag,)
+        )
+
+    def by_category(self, category: str) -> List[Dict]:
+        return self._entries(
+            'SELECT e.data FROM entry_categories c JOIN entries e ON e.id = c.entry_id '
+            'WHERE c.category = ? ORDER BY e.id', (category,)
+        )
+
+    def recently_modified(self, limit: int = 10) -> List[Dict]:
+        return self._entries(
+            'SELECT data FROM entries WHERE modified IS NOT NULL '
+            'ORDER BY modified DESC, id LIMIT ?', (limit,)
+        )
+
+    def export(self) -> Dict:
+        """Produce library_metadata.json content; identical store contents give identical output"""
+        info = dict(self.conn.execute('SELECT key, value FROM info'))
+        return {
+            'version': info.get('version', '1.0.0'),
+            'lastUpdated': info.get('lastUpdated', ''),
+            'entries': [_canonical(entry)
+                        for entry in self._entries('SELECT data FROM entries ORDER BY id')]
+        }
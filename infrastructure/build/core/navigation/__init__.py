@@ -0,0 +1,8 @@
+"""
+Site navigation module
+"""
+
+from .related_sections import RelatedSections
+from .site_navigation import SectionTerms, SiteNavigation
+
+__all__ = ['RelatedSections', 'SectionTerms', 'SiteNavigation']
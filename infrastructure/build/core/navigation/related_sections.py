@@ -0,0 +1,107 @@
+"""
+Related Sections - TF-IDF similarity across every section, computed with matrix products
+"""
+
+import logging
+import importlib.util
+from collections import Counter
+from itertools import chain, repeat
+from typing import TYPE_CHECKING, Dict, List, Mapping, Tuple
+
+# numpy loads with the first computation, so commands that never compute don't pay for it
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Related = Dict[str, List[Tuple[str, float]]]
+
+
+class RelatedSections:
+    """Finds the top-k most similar sections for every section in one vectorized pass
+
+    Each section becomes an L2-normalised TF-IDF row, so cosine similarity is
+    a plain dot product and all pairs come out of X @ X.T. The product runs
+    over blocks of rows to bound memory at N x block_size scores.
+    """
+
+    def __init__(self, top_k: int = 5, max_features: int = 1024, block_size: int = 1024,
+                 min_score: float = 0.05):
+        self.top_k = top_k
+        self.max_features = max_features
+        self.block_size = block_size
+        self.min_score = min_score
+
+    def _vocabulary(self, docs: List[Mapping[str, int]]) -> Dict[str, int]:
+        """Pick the terms that can link two sections, keeping the most widespread ones"""
+        df = Counter()
+        for terms in docs:
+            df.update(terms.keys())
+        # A term in a single section can't relate it to anything; one in most sections can't tell them apart
+        max_df = max(2, len(docs) // 2)
+        candidates = [(n, term) for term, n in df.items() if 2 <= n <= max_df]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return {term: i for i, (_, term) in enumerate(candidates[:self.max_features])}
+
+    def _matrix(self, docs: List[Mapping[str, int]], vocabulary: Dict[str, int]) -> 'np.ndarray':
+        """Build the row-normalised TF-IDF matrix"""
+        import numpy as np
+        # Flatten every (section, term, count) triple; the lookups run in map() rather than a Python loop
+        total = sum(len(terms) for terms in docs)
+        rows = np.repeat(np.arange(len(docs), dtype=np.intp), [len(terms) for terms in docs])
+        cols = np.fromiter(map(vocabulary.get, chain.from_iterable(docs), repeat(-1)),
+                           dtype=np.intp, count=total)
+        counts = np.fromiter(chain.from_iterable(terms.values() for terms in docs),
+                             dtype=np.float32, count=total)
+        kept = cols >= 0
+        rows, cols, counts = rows[kept], cols[kept], counts[kept]
+
+        matrix = np.zeros((len(docs), len(vocabulary)), dtype=np.float32)
+        # Sublinear term frequency keeps long pages from dominating
+        matrix[rows, cols] = 1.0 + np.log(counts)
+
+        df = np.bincount(cols, minlength=len(vocabulary)).astype(np.float32)
+        matrix *= np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
+
+    def compute(self, docs: Dict[str, Mapping[str, int]]) -> Related:
+        """Map each section name to its most similar sections and their cosine scores"""
+        names = sorted(docs)
+        related: Related = {name: [] for name in names}
+        if not HAS_NUMPY:
+            logger.warning("numpy not installed. Related sections will not be computed.")
+            return related
+        if len(names) < 2 or self.top_k < 1:
+            return related
+        import numpy as np
+
+        term_docs = [docs[name] for name in names]
+        vocabulary = self._vocabulary(term_docs)
+        if not vocabulary:
+            return related
+        matrix = self._matrix(term_docs, vocabulary)
+
+        k = min(self.top_k, len(names) - 1)
+        for start in range(0, len(names), self.block_size):
+            block = matrix[start:start + self.block_size]
+            scores = block @ matrix.T
+            # A section is never related to itself
+            scores[np.arange(len(block)), np.arange(start, start + len(block))] = -1.0
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            # argpartition leaves the top k unordered; sort them by score, then name order
+            order = np.lexsort((top, -top_scores), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for offset, (indices, values) in enumerate(zip(top.tolist(), top_scores.tolist())):
+                related[names[start + offset]] = [
+                    (names[i], round(score, 4))
+                    for i, score in zip(indices, values) if score >= self.min_score
+                ]
+        logger.info(f"Related sections: {len(names)} sections, {len(vocabulary)} terms")
+        return related
@@ -0,0 +1,166 @@
+"""
+Site Navigation - Reading order, category tree and related sections, built once per build
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from ..search.tokenizer import term_counts, tokenize
+from .related_sections import Related
+
+logger = logging.getLogger(__name__)
+
+TERMS_VERSION = 1
+
+
+def _write_json(path: Path, data) -> None:
+    """Write JSON atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, separators=(',', ':'), ensure_ascii=False, sort_keys=True))
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class SectionTerms:
+    """Term counts per section source, cached on disk by content digest"""
+
+    # Title terms count as if they appeared this many times in the body, as in the search index
+    TITLE_WEIGHT = 3
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.cache_path.exists():
+                try:
+                    data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+                    if data.get('version') == TERMS_VERSION:
+                        self._entries = data['sections']
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable section terms cache: {str(e)}")
+        return self._entries
+
+    def collect(self, sources: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+        """Term counts for each section's title and text, tokenizing only changed sources"""
+        entries = self._load()
+        fresh = {}
+        terms = {}
+        tokenized = 0
+        for name, source in sources.items():
+            digest = hashlib.sha1(f"{source['title']}\0{source['text']}".encode('utf-8')).hexdigest()
+            entry = entries.get(name)
+            if entry is None or entry['digest'] != digest:
+                counts = term_counts(source['text'])
+                for term in tokenize(source['title']):
+                    counts[term] += self.TITLE_WEIGHT
+                entry = {'digest': digest, 'terms': dict(counts)}
+                tokenized += 1
+            fresh[name] = entry
+            terms[name] = entry['terms']
+        if tokenized or len(fresh) != len(entries):
+            _write_json(self.cache_path, {'version': TERMS_VERSION, 'sections': fresh})
+        self._entries = fresh
+        logger.debug(f"Section terms: {tokenized} of {len(sources)} sections tokenized")
+        return terms
+
+
+class SiteNavigation:
+    """Previous/next links, category groups and related sections for every page
+
+    Pages are stored by section name; page() resolves the neighbours a page
+    links to into titles and URLs, which is everything a template needs.
+    """
+
+    FILE = 'navigation.json'
+
+    def __init__(self, pages: Dict[str, Dict], categories: List[Dict]):
+        self.pages = pages
+        self.categories = categories
+
+    @classmethod
+    def build(cls, sections: List[Dict[str, str]], related: Related) -> 'SiteNavigation':
+        """Assemble the navigation from sections given in reading order"""
+        pages = {}
+        categories: Dict[str, List[str]] = {}
+        names = [section['name'] for section in sections]
+        for i, section in enumerate(sections):
+            name = section['name']
+            pages[name] = {
+                'title': section['title'],
+                'url': f'/{name}/',
+                'category': section['category'],
+                'prev': names[i - 1] if i > 0 else None,
+                'next': names[i + 1] if i + 1 < len(names) else None,
+                'related': [[other, score] for other, score in related.get(name, [])]
+            }
+            categories.setdefault(section['category'], []).append(name)
+        return cls(pages, [{'name': category, 'sections': members}
+                           for category, members in categories.items()])
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional['SiteNavigation']:
+        """Load the navigation written by a previous build, None if missing or unreadable"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            return cls(data['pages'], data['categories'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable site navigation: {str(e)}")
+            return None
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the navigation for client-side use and the next incremental build"""
+        _write_json(Path(path), {'pages': self.pages, 'categories': self.categories})
+
+    def _link(self, name: Optional[str]) -> Optional[Dict[str, str]]:
+        if name is None or name not in self.pages:
+            return None
+        page = self.pages[name]
+        return {'name': name, 'title': page['title'], 'url': page['url']}
+
+    def page(self, name: str) -> Optional[Dict]:
+        """Template context for one page, with linked pages resolved to titles and URLs"""
+        page = self.pages.get(name)
+        if page is None:
+            return None
+        return {
+            'category': page['category'],
+            'prev': self._link(page['prev']),
+            'next': self._link(page['next']),
+            'related': [self._link(other) for other, _ in page['related']]
+        }
+
+    def category_links(self) -> List[Dict[str, str]]:
+        """Site-wide category menu, each category linking to its first page"""
+        return [{'name': category['name'], 'url': self.pages[category['sections'][0]]['url']}
+                for category in self.categories if category['sections']]
+
+    def related_ids(self, name: str) -> List[str]:
+        """Names of the sections most similar to a page"""
+        return [other for other, _ in self.pages.get(name, {}).get('related', [])]
+
+    def page_digest(self, name: str) -> str:
+        """Hash of what a page shows from the navigation, for its input hash"""
+        payload = json.dumps(self.page(name), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def changed_pages(self, previous: Optional['SiteNavigation'], names: Iterable[str]) -> List[str]:
+        """Pages whose navigation differs from a previous build's"""
+        if previous is None:
+            return sorted(names)
+        return sorted(name for name in names if self.page(name) != previous.page(name))
@@ -0,0 +1,7 @@
+"""
+Build profiling module
+"""
+
+from .profiler import Profiler, profiler, span, count
+
+__all__ = ['Profiler', 'profiler', 'span', 'count']
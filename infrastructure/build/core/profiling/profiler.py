@@ -0,0 +1,144 @@
+"""
+Profiler - Span timing and counters for build stages, exported as Chrome trace events
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Shared no-op returned while profiling is off, so instrumented code costs almost nothing
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """Records one complete ('X') trace event on exit"""
+
+    __slots__ = ('profiler', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str, cat: str, args: Dict[str, Any]):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        event = {
+            'name': self.name,
+            'cat': self.cat,
+            'ph': 'X',
+            # perf_counter is monotonic system-wide, so worker timestamps line up
+            'ts': self.start / 1000,
+            'dur': (end - self.start) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': self.args
+        }
+        if exc_type is not None:
+            event['args'] = {**self.args, 'error': str(exc)}
+        self.profiler._add(event)
+
+
+class Profiler:
+    """Collects spans and counters for a build; disabled unless enable() is called"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict] = []
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, cat: str = 'build', **args: Any):
+        """Time a block as a named stage; keyword arguments end up in the trace"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a named counter such as cache hits or bytes written"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def _add(self, event: Dict) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def drain(self) -> Dict:
+        """Hand over and reset everything recorded so far (used to ship worker data to the parent)"""
+        with self._lock:
+            data = {'events': self.events, 'counters': dict(self.counters)}
+            self.events = []
+            self.counters = Counter()
+        return data
+
+    def merge(self, data: Dict) -> None:
+        """Fold in data drained from another process"""
+        with self._lock:
+            self.events.extend(data['events'])
+            self.counters.update(data['counters'])
+
+    def write_trace(self, path: Path) -> None:
+        """Write a Chrome trace-event file (load in chrome://tracing or Perfetto)"""
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        end_ts = max((e['ts'] + e['dur'] for e in events), default=0)
+        events.extend({'name': name, 'ph': 'C', 'ts': end_ts, 'pid': os.getpid(),
+                       'args': {'value': value}} for name, value in sorted(counters.items()))
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}),
+                        encoding='utf-8')
+        logger.info(f"Wrote trace with {len(events)} events to {path}")
+
+    def summary(self, top: int = 10) -> str:
+        """Tables of the slowest sections, time per stage and counters"""
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+
+        lines = [f"Slowest sections (top {top}):"]
+        sections = sorted((e for e in events if e['name'] == 'section'),
+                          key=lambda e: e['dur'], reverse=True)
+        for event in sections[:top]:
+            lines.append(f"  {event['dur'] / 1000:10.1f} ms  {event['args'].get('section', '?')}")
+
+        stages = defaultdict(lambda: [0, 0.0])
+        for event in events:
+            stages[event['name']][0] += 1
+            stages[event['name']][1] += event['dur']
+        lines.append("Stages (summed over all sections and workers):")
+        lines.append(f"  {'stage':<20} {'calls':>7} {'total ms':>12} {'mean ms':>10}")
+        for name, (calls, total) in sorted(stages.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {name:<20} {calls:>7} {total / 1000:>12.1f} {total / 1000 / calls:>10.2f}")
+
+        if counters:
+            lines.append("Counters:")
+            for name, value in sorted(counters.items()):
+                lines.append(f"  {name:<28} {value:>14,}")
+        return '\n'.join(lines)
+
+
+# Process-wide profiler used by the instrumented build code
+profiler = Profiler()
+span = profiler.span
+count = profiler.count
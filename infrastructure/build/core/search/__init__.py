@@ -0,0 +1,8 @@
+"""
+Search index module
+"""
+
+from .search_indexer import SearchIndexer
+from .tokenizer import stem, term_counts, tokenize
+
+__all__ = ['SearchIndexer', 'stem', 'term_counts', 'tokenize']
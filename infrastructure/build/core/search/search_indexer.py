@@ -0,0 +1,203 @@
+"""
+Search Indexer - Builds a prefix-sharded inverted index with BM25 statistics
+"""
+
+import os
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .tokenizer import html_text, term_counts, tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+def shard_name(term: str, prefix_length: int) -> str:
+    """Map a term to the file holding its postings"""
+    prefix = term[:prefix_length]
+    return ''.join(c if c.isascii() and c.isalnum() else f'_{ord(c):04x}' for c in prefix)
+
+
+def _write_json(path: Path, data) -> None:
+    """Write compact JSON atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class SearchIndexer:
+    """Maintains the site search index, touching only the shards a changed section affects
+
+    Rendering stores each section's term frequencies under docs_dir; update()
+    then merges changed sections into the shards. Shards hold raw term
+    frequencies, so corpus-wide BM25 statistics (N, average length) live in
+    meta.json and adding a page never rewrites unrelated shards. The index
+    state stays beside the stored terms, so only the index itself is
+    published.
+    """
+
+    META_FILE = 'meta.json'
+    STATE_FILE = '.index_state.json'
+    SHARD_DIR = 'shards'
+    # Title terms count as if they appeared this many times in the body
+    TITLE_WEIGHT = 3
+
+    def __init__(self, index_dir: Path, docs_dir: Path, prefix_length: int = 2):
+        self.index_dir = Path(index_dir)
+        self.docs_dir = Path(docs_dir)
+        self.prefix_length = prefix_length
+
+    def _doc_path(self, section_name: str) -> Path:
+        return self.docs_dir / f'{section_name}.json'
+
+    def extract(self, section_name: str, title: str, html: str) -> None:
+        """Record the terms of a freshly rendered section (safe to call from worker processes)"""
+        terms = term_counts(html_text(html))
+        for term in tokenize(title):
+            terms[term] += self.TITLE_WEIGHT
+        _write_json(self._doc_path(section_name), {
+            'title': title,
+            'url': f'/{section_name}/',
+            'length': sum(terms.values()),
+            'terms': dict(terms)
+        })
+
+    def forget(self, section_name: str) -> None:
+        """Drop the stored terms of a deleted section"""
+        self._doc_path(section_name).unlink(missing_ok=True)
+
+    def unindexed(self, sections: Iterable[str]) -> List[str]:
+        """Sections with no stored terms, which must be rendered again before update() can index them"""
+        return [name for name in sections if not self._doc_path(name).exists()]
+
+    def _load_state(self) -> Optional[Dict]:
+        path = self.docs_dir / self.STATE_FILE
+        if not path.exists():
+            return None
+        try:
+            state = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable search index state: {str(e)}")
+            return None
+        if state.get('version') != INDEX_VERSION or state.get('prefix_length') != self.prefix_length:
+            return None
+        # The state outlives the build directory; if the index files it describes are gone, start over
+        shards = {shard for doc in state['docs'].values() for shard in doc['shards']}
+        if not (self.index_dir / self.META_FILE).exists():
+            return None
+        if not all(self._shard_path(shard).exists() for shard in shards):
+            return None
+        return state
+
+    def _load_doc(self, section_name: str) -> Optional[Dict]:
+        path = self._doc_path(section_name)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def _shard_path(self, shard: str) -> Path:
+        return self.index_dir / self.SHARD_DIR / f'{shard}.json'
+
+    def update(self, sections: Iterable[str], changed: Iterable[str]) -> None:
+        """Merge changed (rebuilt or deleted) sections into the index"""
+        sections = set(sections)
+        state = self._load_state()
+        if state is None:
+            # No usable index yet: start over from every section's stored terms
+            shard_dir = self.index_dir / self.SHARD_DIR
+            if shard_dir.exists():
+                for path in shard_dir.glob('*.json'):
+                    path.unlink()
+            state = {'version': INDEX_VERSION, 'prefix_length': self.prefix_length,
+                     'next_id': 0, 'docs': {}}
+            changed = set(sections)
+        else:
+            changed = set(changed) | (set(state['docs']) - sections)
+
+        docs = state['docs']
+        touched: Set[str] = set()
+        changed_ids: Set[int] = set()
+        new_terms: Dict[int, Dict[str, int]] = {}
+        unextracted = []
+        for name in sorted(changed):
+            old = docs.pop(name, None)
+            if old is not None:
+                touched.update(old['shards'])
+                changed_ids.add(old['id'])
+            doc = self._load_doc(name) if name in sections else None
+            if doc is None:
+                if name in sections:
+                    unextracted.append(name)
+                continue
+            if old is not None:
+                doc_id = old['id']
+            else:
+                doc_id = state['next_id']
+                state['next_id'] += 1
+            shards = sorted({shard_name(term, self.prefix_length) for term in doc['terms']})
+            touched.update(shards)
+            changed_ids.add(doc_id)
+            new_terms[doc_id] = doc['terms']
+            docs[name] = {'id': doc_id, 'title': doc['title'], 'url': doc['url'],
+                          'length': doc['length'], 'shards': shards}
+
+        rewritten = self._rewrite_shards(touched, changed_ids, new_terms)
+        self._write_meta(docs, state['next_id'])
+        _write_json(self.docs_dir / self.STATE_FILE, state)
+        if unextracted:
+            logger.error(f"Search index is missing {len(unextracted)} sections with no stored terms: "
+                         f"{', '.join(unextracted)}")
+        logger.info(f"Search index: {len(docs)} pages, {rewritten} shards rewritten")
+
+    def _rewrite_shards(self, touched: Set[str], changed_ids: Set[int],
+                        new_terms: Dict[int, Dict[str, int]]) -> int:
+        """Replace the postings of changed documents in each touched shard, returning how many changed"""
+        by_shard: Dict[str, Dict[str, List[List[int]]]] = {shard: {} for shard in touched}
+        for doc_id, terms in new_terms.items():
+            for term, tf in terms.items():
+                postings = by_shard[shard_name(term, self.prefix_length)].setdefault(term, [])
+                postings.append([doc_id, tf])
+
+        rewritten = 0
+        for shard, additions in by_shard.items():
+            path = self._shard_path(shard)
+            current = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+            index = {term: [p for p in postings if p[0] not in changed_ids]
+                     for term, postings in current.items()}
+            for term, postings in additions.items():
+                index.setdefault(term, []).extend(postings)
+            index = {term: sorted(postings) for term, postings in index.items() if postings}
+            if index == current:
+                # A page rebuilt with the same text leaves its shards as they were
+                continue
+            if index:
+                _write_json(path, index)
+            else:
+                path.unlink(missing_ok=True)
+            rewritten += 1
+        return rewritten
+
+    def _write_meta(self, docs: Dict[str, Dict], next_id: int) -> None:
+        """Write the document table and corpus statistics the browser needs for BM25"""
+        table: List[Optional[List]] = [None] * next_id
+        for doc in docs.values():
+            table[doc['id']] = [doc['title'], doc['url'], doc['length']]
+        total_length = sum(doc['length'] for doc in docs.values())
+        _write_json(self.index_dir / self.META_FILE, {
+            'version': INDEX_VERSION,
+            'prefix_length': self.prefix_length,
+            'doc_count': len(docs),
+            'avg_length': total_length / len(docs) if docs else 0,
+            'docs': table
+        })
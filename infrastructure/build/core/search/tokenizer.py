@@ -0,0 +1,97 @@
+"""
+Tokenizer - Splits page text into stemmed search terms
+
+The rules here are mirrored by static/js/components/search.js; change both together.
+"""
+
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import List
+
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+this to was were will with you your
+""".split())
+
+# (suffix, replacement, minimum stem length), tried in order; first match wins
+SUFFIX_RULES = (
+    ('sses', 'ss', 2),
+    ('ies', 'y', 2),
+    ('ational', 'ate', 3),
+    ('ization', 'ize', 3),
+    ('fulness', 'ful', 3),
+    ('ness', '', 3),
+    ('ments', '', 3),
+    ('ment', '', 3),
+    ('ings', '', 3),
+    ('ing', '', 3),
+    ('edly', '', 3),
+    ('ed', '', 3),
+    ('ly', '', 3),
+    ('es', '', 3),
+    ('s', '', 3),
+)
+
+
+def stem(word: str) -> str:
+    """Strip common English suffixes with a small, portable rule set"""
+    if word.endswith('ss'):
+        return word
+    for suffix, replacement, min_length in SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_length:
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split, drop stopwords and stem"""
+    terms = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        terms.append(stem(word))
+    return terms
+
+
+def term_counts(text: str) -> Counter:
+    """Count the terms tokenize() would produce, stemming each distinct word once"""
+    counts = Counter()
+    for word, n in Counter(WORD_PATTERN.findall(text.lower())).items():
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        counts[stem(word)] += n
+    return counts
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML fragment"""
+
+    SKIP_TAGS = ('script', 'style')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_text(html: str) -> str:
+    """Extract the visible text of rendered HTML"""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return ' '.join(extractor.parts)
@@ -2,7 +2,11 @@
 Section management module
 """
 
-from .section_manager import SectionManager
-from .migrate_sections import migrate_sections
+from ..lazy import lazy_exports
 
-__all__ = ['SectionManager', 'migrate_sections']
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'SchemaValidator': '.schema_validator',
+    'SectionManager': '.section_manager'
+})
+
+__all__ = ['SchemaValidator', 'SectionManager']
@@ -0,0 +1,214 @@
+"""
+Schema Validator - Applies the JSON schemas in config/schema to every section config and the library metadata
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# jsonschema takes a noticeable time to import, so a fully cached run never loads it
+HAS_JSONSCHEMA = importlib.util.find_spec('jsonschema') is not None
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shape of a cache entry changes
+CACHE_VERSION = 2
+
+# Schema file applied to each kind of document
+SCHEMA_FILES = {
+    'section': 'section.json',
+    'library_metadata': 'library_metadata_schema.json'
+}
+
+# Validators compiled once per process, by document kind
+_validators: Dict[str, object] = {}
+
+
+def _compile_validators(schemas: Dict[str, Dict]) -> None:
+    """Check and compile every schema (runs once in each worker process)"""
+    from jsonschema.validators import validator_for
+
+    for kind, schema in schemas.items():
+        validator_cls = validator_for(schema)
+        validator_cls.check_schema(schema)
+        _validators[kind] = validator_cls(schema, format_checker=validator_cls.FORMAT_CHECKER)
+
+
+def validate_document(kind: str, data: bytes) -> List[Dict[str, str]]:
+    """Schema errors for one document, as JSON paths and messages (runs in a worker process)"""
+    try:
+        document = json.loads(data)
+    except ValueError as e:
+        return [{'path': '$', 'message': f"Invalid JSON: {str(e)}"}]
+    errors = _validators[kind].iter_errors(document)
+    return sorted(({'path': error.json_path, 'message': error.message} for error in errors),
+                  key=lambda error: (error['path'], error['message']))
+
+
+def _read(path: str) -> Tuple[bytes, str]:
+    """File contents and their hash"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def _usable(entry) -> bool:
+    """Whether a cache entry has the current shape; anything else counts as a miss"""
+    return isinstance(entry, dict) and isinstance(entry.get('hash'), str) and isinstance(entry.get('errors'), list)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class SchemaValidator:
+    """Bulk validation of section_config.json files and library_metadata.json
+
+    Each schema is compiled once per process. Results are cached by the
+    hash of each file, so a run only validates files that changed, and a
+    change to any schema discards the cache. Files whose size and mtime
+    match the cache are not even read. Many changed files are
+    validated on a process pool; a few stay in this process, where
+    starting workers would cost more than the validation.
+    """
+
+    CACHE_FILE = 'results.json'
+    CONFIG_FILE = 'section_config.json'
+    METADATA_FILE = 'library_metadata.json'
+    # Below this many changed files a process pool costs more than it saves
+    PROCESS_THRESHOLD = 64
+
+    def __init__(self, schema_dir: Union[str, Path], content_dir: Union[str, Path],
+                 cache_dir: Optional[Union[str, Path]] = None, max_workers: Optional[int] = None):
+        self.schema_dir = Path(schema_dir)
+        self.content_dir = Path(content_dir)
+        self.cache_path = Path(cache_dir) / self.CACHE_FILE if cache_dir else None
+        self.max_workers = max_workers
+
+    def _load_schemas(self) -> Tuple[Dict[str, Dict], str]:
+        """Every schema by document kind, and one digest covering them all"""
+        schemas = {}
+        digest = hashlib.sha256()
+        for kind, name in sorted(SCHEMA_FILES.items()):
+            data = (self.schema_dir / name).read_bytes()
+            digest.update(name.encode('utf-8') + b'\0' + data)
+            schemas[kind] = json.loads(data)
+        return schemas, digest.hexdigest()
+
+    def _load_cache(self, schema_digest: str) -> Dict[str, Dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable schema validation cache: {str(e)}")
+            return {}
+        if data.get('version') != CACHE_VERSION or data.get('schemas') != schema_digest:
+            return {}
+        files = data.get('files')
+        return files if isinstance(files, dict) else {}
+
+    def _documents(self, section_ids: Optional[Iterable[str]]) -> List[Tuple[str, str]]:
+        """(kind, path relative to the content directory) for every document to check"""
+        if section_ids is None:
+            from .section_manager import SectionManager
+            # scandir rather than discover_sections, whose Path objects add up over thousands of sections
+            with os.scandir(self.content_dir) as entries:
+                section_ids = sorted(entry.name for entry in entries
+                                     if entry.is_dir() and SectionManager.SECTION_PATTERN.match(entry.name))
+            documents = [('section', f'{section_id}/{self.CONFIG_FILE}') for section_id in section_ids]
+            if (self.content_dir / self.METADATA_FILE).exists():
+                documents.append(('library_metadata', self.METADATA_FILE))
+            return documents
+        return [('section', f'{section_id}/{self.CONFIG_FILE}') for section_id in section_ids]
+
+    def _validate(self, schemas: Dict[str, Dict], jobs: List[Tuple[str, bytes]]) -> List[List[Dict[str, str]]]:
+        if len(jobs) >= self.PROCESS_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_compile_validators,
+                                     initargs=(schemas,)) as executor:
+                chunksize = max(1, len(jobs) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                return list(executor.map(validate_document, *zip(*jobs), chunksize=chunksize))
+        _compile_validators(schemas)
+        return [validate_document(kind, data) for kind, data in jobs]
+
+    def validate_all(self, section_ids: Optional[Iterable[str]] = None, force: bool = False) -> Dict:
+        """Validate every section config (or only section_ids) and the library metadata
+
+        Returns a JSON-serialisable report; errors maps each invalid file to
+        its schema errors.
+        """
+        if not HAS_JSONSCHEMA:
+            raise RuntimeError("jsonschema is not installed; run pip install -r requirements.txt")
+        start = time.perf_counter()
+        schemas, schema_digest = self._load_schemas()
+        cache = self._load_cache(schema_digest)
+        documents = self._documents(section_ids)
+
+        results: Dict[str, Dict] = {}
+        unstamped = []
+        missing = 0
+        for kind, rel in documents:
+            try:
+                st = os.stat(os.path.join(self.content_dir, rel))
+            except FileNotFoundError:
+                results[rel] = {'hash': None, 'errors': [{'path': '$', 'message': 'File not found'}]}
+                missing += 1
+                continue
+            stamp = [st.st_size, st.st_mtime_ns]
+            entry = cache.get(rel)
+            # An unchanged size and mtime is trusted, as git trusts its index; otherwise the hash decides
+            if not force and _usable(entry) and entry.get('stamp') == stamp:
+                results[rel] = entry
+            else:
+                unstamped.append((kind, rel, stamp))
+
+        # Reading and hashing is I/O bound and stays on threads
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            contents = list(executor.map(_read, (os.path.join(self.content_dir, rel) for _, rel, _ in unstamped)))
+
+        jobs = []
+        pending = []
+        for (kind, rel, stamp), (data, digest) in zip(unstamped, contents):
+            entry = cache.get(rel)
+            if not force and _usable(entry) and entry['hash'] == digest:
+                results[rel] = {'stamp': stamp, 'hash': digest, 'errors': entry['errors']}
+            else:
+                jobs.append((kind, data))
+                pending.append((rel, stamp, digest))
+        for (rel, stamp, digest), errors in zip(pending, self._validate(schemas, jobs) if jobs else []):
+            results[rel] = {'stamp': stamp, 'hash': digest, 'errors': errors}
+
+        removed = section_ids is None and len(cache) != len(results) - missing
+        if self.cache_path is not None and (unstamped or removed):
+            # A full run keeps only the files it found; a run over some sections updates their entries
+            files = dict(cache) if section_ids is not None else {}
+            files.update((rel, result) for rel, result in results.items() if result['hash'] is not None)
+            _write_atomic(self.cache_path, json.dumps(
+                {'version': CACHE_VERSION, 'schemas': schema_digest, 'files': files}, separators=(',', ':')
+            ))
+
+        errors = {rel: result['errors'] for rel, result in sorted(results.items()) if result['errors']}
+        return {
+            'files': len(results),
+            'valid': len(results) - len(errors),
+            'invalid': len(errors),
+            'validated': len(pending),
+            'cached': len(results) - len(pending) - missing,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+            'errors': errors
+        }
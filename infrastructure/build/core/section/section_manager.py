@@ -3,6 +3,7 @@
 Section Manager - Tool for managing iHelper.tech knowledge library sections
 """
 
+import re
 import json
 import shutil
 from pathlib import Path
@@ -10,6 +11,8 @@ from typing import Dict, List, Optional
 from datetime import datetime
 
 class SectionManager:
+    SECTION_PATTERN = re.compile(r'^\d{2}_\w+')
+    
     def __init__(self, root_path: str):
         self.root_path = Path(root_path)
         self.templates_dir = self.root_path / 'templates'
@@ -142,40 +145,20 @@ class SectionManager:
             
         return errors
         
+    def discover_sections(self) -> List[str]:
+        """List the ids of all section directories"""
+        return sorted(
+            d.name for d in self.root_path.iterdir()
+            if d.is_dir() and self.SECTION_PATTERN.match(d.name)
+        )
+        
     def _load_config_template(self) -> Dict:
         """Load the base configuration template"""
         with open(self.config_template, 'r', encoding='utf-8') as f:
             return json.load(f)
             
 if __name__ == '__main__':
-    import argparse
-    
-    parser = argparse.ArgumentParser(description='Manage iHelper.tech knowledge library sections')
-    parser.add_argument('action', choices=['create', 'update', 'validate'])
-    parser.add_argument('section_id', help='Section ID (e.g., 01_Welcome_Message)')
-    parser.add_argument('--title', help='Section title')
-    parser.add_argument('--description', help='Section description')
-    
-    args = parser.parse_args()
-    
-    manager = SectionManager('C:/Users/ihelp/Knowledge_Library/iHelper.tech')
+    import sys
+    from ...cli import main
     
-    if args.action == 'create':
-        if not args.title or not args.description:
-            parser.error('create requires --title and --description')
-        manager.create_section(args.section_id, args.title, args.description)
-    elif args.action == 'update':
-        kwargs = {}
-        if args.title:
-            kwargs['title'] = args.title
-        if args.description:
-            kwargs['description'] = args.description
-        manager.update_section(args.section_id, **kwargs)
-    elif args.action == 'validate':
-        errors = manager.validate_section(args.section_id)
-        if errors:
-            print('Validation errors:')
-            for error in errors:
-                print(f'- {error}')
-        else:
-            print('Section is valid')
+    sys.exit(main(['section', *sys.argv[1:]]))
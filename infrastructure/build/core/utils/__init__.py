@@ -0,0 +1,15 @@
+"""
+Build utilities
+"""
+
+from ..lazy import lazy_exports
+
+# The HTTP client and its TLS setup load only when external links are checked
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'HttpChecker': '.http_checker',
+    'LinkChecker': '.link_checker',
+    'check_html_links': '.link_checker',
+    'validate_links': '.link_checker'
+})
+
+__all__ = ['HttpChecker', 'LinkChecker', 'check_html_links', 'validate_links']
@@ -0,0 +1,255 @@
+"""
+HTTP Checker - Concurrent external link checks over pooled keep-alive connections
+"""
+
+import os
+import ssl
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Servers that refuse HEAD answer with these; the check is retried with GET
+HEAD_REFUSED_STATUSES = (403, 405, 501)
+
+# Statuses that say nothing about the link itself and are never cached
+TRANSIENT_STATUSES = (429, 502, 503, 504)
+
+MAX_HEADER_BYTES = 64 * 1024
+
+HostKey = Tuple[str, str, int]
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port), with a cap on connections per host"""
+
+    def __init__(self, max_per_host: int, ssl_context: ssl.SSLContext):
+        self.max_per_host = max_per_host
+        self.ssl_context = ssl_context
+        self._idle: Dict[HostKey, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._slots: Dict[HostKey, asyncio.Semaphore] = {}
+
+    def slot(self, key: HostKey) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent requests to one host"""
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(self.max_per_host)
+        return self._slots[key]
+
+    async def acquire(self, key: HostKey) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """An idle connection if one is open, else a new one; the flag says whether it was reused"""
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port,
+            ssl=self.ssl_context if scheme == 'https' else None,
+            server_hostname=host if scheme == 'https' else None,
+            limit=MAX_HEADER_BYTES
+        )
+        return reader, writer, False
+
+    def release(self, key: HostKey, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Return a connection whose response was fully read"""
+        self._idle.setdefault(key, []).append((reader, writer))
+
+    async def close(self) -> None:
+        writers = [writer for idle in self._idle.values() for _, writer in idle]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+
+class _Response:
+    """Status and headers of one HTTP response"""
+
+    def __init__(self, status: int, headers: Dict[str, str], keep_alive: bool):
+        self.status = status
+        self.headers = headers
+        self.keep_alive = keep_alive
+
+
+class HttpChecker:
+    """Checks external URLs concurrently, caching results on disk for ttl seconds
+
+    Requests go out as HEAD (GET when a server refuses HEAD) over a small
+    asyncio HTTP/1.1 client. Connections are kept alive and reused per
+    host, at most max_per_host requests run against one host at a time and
+    max_connections across all hosts. The timeout applies to each connect
+    and each request once it holds a slot. Redirects are followed. Results with
+    a definite status are cached for ttl seconds; network errors for the
+    shorter error_ttl, and rate limiting or gateway errors not at all.
+    """
+
+    def __init__(self, cache_path: Optional[Union[str, Path]] = None, ttl: float = 7 * 24 * 3600,
+                 error_ttl: float = 3600, timeout: float = 10.0, max_connections: int = 32,
+                 max_per_host: int = 4, max_redirects: int = 5,
+                 user_agent: str = 'iHelper-LinkChecker/1.0', verify_tls: bool = True):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        self.verify_tls = verify_tls
+        self.stats = {'checked': 0, 'cached': 0, 'reused_connections': 0}
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable link cache: {str(e)}")
+            return {}
+        return data.get('urls', {}) if data.get('version') == CACHE_VERSION else {}
+
+    def _save_cache(self, entries: Dict[str, Dict]) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'version': CACHE_VERSION, 'urls': entries}, separators=(',', ':')))
+            os.replace(tmp_path, self.cache_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _fresh(self, entry: Optional[Dict], now: float) -> bool:
+        if entry is None:
+            return False
+        ttl = self.ttl if entry.get('status') is not None else self.error_ttl
+        return now - entry['checked'] < ttl
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Result for each URL: ok, the final status (None on network errors) and any error"""
+        urls = list(dict.fromkeys(urls))
+        now = time.time()
+        cache = self._load_cache()
+        pending = [url for url in urls if not self._fresh(cache.get(url), now)]
+        self.stats = {'checked': len(pending), 'cached': len(urls) - len(pending), 'reused_connections': 0}
+        if pending:
+            results = asyncio.run(self._check_all(pending))
+            for url, result in results.items():
+                if result['status'] not in TRANSIENT_STATUSES:
+                    cache[url] = result
+            # Entries age out of the file once nothing links to them and they go stale
+            cache = {url: entry for url, entry in cache.items() if self._fresh(entry, now) or url in results}
+            self._save_cache(cache)
+        else:
+            results = {}
+        return {url: results.get(url) or cache[url] for url in urls}
+
+    async def _check_all(self, urls: List[str]) -> Dict[str, Dict]:
+        ssl_context = ssl.create_default_context()
+        if not self.verify_tls:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        pool = _ConnectionPool(self.max_per_host, ssl_context)
+        limit = asyncio.Semaphore(self.max_connections)
+        try:
+            results = await asyncio.gather(*(self._check_url(pool, limit, url) for url in urls))
+        finally:
+            await pool.close()
+        return dict(zip(urls, results))
+
+    async def _check_url(self, pool: _ConnectionPool, limit: asyncio.Semaphore, url: str) -> Dict:
+        status, error = None, None
+        try:
+            status = await self._resolve(pool, limit, url)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout:g} s"
+        except (OSError, ssl.SSLError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            error = str(e) or type(e).__name__
+        return {
+            'ok': status is not None and status < 400,
+            'status': status,
+            'error': error,
+            'checked': time.time()
+        }
+
+    async def _resolve(self, pool: _ConnectionPool, limit: asyncio.Semaphore, url: str) -> int:
+        """Final status of a URL after following redirects"""
+        for _ in range(self.max_redirects + 1):
+            response = await self._request(pool, limit, 'HEAD', url)
+            if response.status in HEAD_REFUSED_STATUSES:
+                response = await self._request(pool, limit, 'GET', url)
+            location = response.headers.get('location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response.status
+            url = urljoin(url, location)
+        raise ValueError(f"more than {self.max_redirects} redirects")
+
+    async def _request(self, pool: _ConnectionPool, limit: asyncio.Semaphore, method: str, url: str) -> _Response:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        host = parts.hostname if parts.port is None else f'{parts.hostname}:{parts.port}'
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        # GET bodies are never read, so those connections are closed rather than pooled
+        connection = 'keep-alive' if method == 'HEAD' else 'close'
+        request = (f'{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {self.user_agent}\r\n'
+                   f'Accept: */*\r\nConnection: {connection}\r\n\r\n').encode('latin-1')
+
+        async with limit, pool.slot(key):
+            # Timeouts start once a slot is held, so waiting behind other URLs never counts
+            reader, writer, reused = await asyncio.wait_for(pool.acquire(key), self.timeout)
+            try:
+                try:
+                    response = await asyncio.wait_for(self._exchange(reader, writer, request), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused:
+                        raise
+                    # The server closed an idle connection; retry once on a fresh one
+                    writer.close()
+                    reader, writer, reused = await asyncio.wait_for(pool.acquire(key), self.timeout)
+                    response = await asyncio.wait_for(self._exchange(reader, writer, request), self.timeout)
+            except BaseException:
+                writer.close()
+                raise
+            if reused:
+                self.stats['reused_connections'] += 1
+            if method == 'HEAD' and response.keep_alive:
+                pool.release(key, reader, writer)
+            else:
+                writer.close()
+            return response
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        request: bytes) -> _Response:
+        writer.write(request)
+        await writer.drain()
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(' ', 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        return _Response(int(status), headers, keep_alive)
@@ -0,0 +1,284 @@
+"""
+Link Checker - Scans built pages once and checks every internal and external link they hold
+"""
+
+import os
+import json
+import logging
+import posixpath
+import tempfile
+from pathlib import Path
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from ..content.site_index import SiteIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+READ_CHUNK = 64 * 1024
+
+# Attributes holding one URL, by tag
+URL_ATTRIBUTES = {
+    'a': 'href', 'area': 'href', 'link': 'href',
+    'img': 'src', 'script': 'src', 'iframe': 'src', 'embed': 'src',
+    'source': 'src', 'track': 'src', 'audio': 'src', 'video': 'src'
+}
+
+# <link> relations that name an origin rather than a document
+SKIPPED_RELS = {'preconnect', 'dns-prefetch'}
+
+# Fragments browsers resolve without a matching id
+IMPLICIT_FRAGMENTS = {'', 'top'}
+
+
+class PageLinks(NamedTuple):
+    links: List[str]
+    ids: List[str]
+
+
+class LinkExtractor(HTMLParser):
+    """Streaming collector of the URLs and fragment targets in one page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.ids: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        if attributes.get('id'):
+            self.ids.append(attributes['id'])
+        if tag == 'a' and attributes.get('name'):
+            self.ids.append(attributes['name'])
+
+        url_attribute = URL_ATTRIBUTES.get(tag)
+        if url_attribute is None:
+            return
+        if tag == 'link' and SKIPPED_RELS.intersection((attributes.get('rel') or '').lower().split()):
+            return
+        url = attributes.get(url_attribute)
+        if url:
+            self.links.append(url.strip())
+        srcset = attributes.get('srcset')
+        if srcset and not srcset.lstrip().startswith('data:'):
+            for candidate in srcset.split(','):
+                parts = candidate.split()
+                if parts:
+                    self.links.append(parts[0])
+
+
+def scan_page(path: str) -> PageLinks:
+    """Feed one page through the extractor a chunk at a time (runs in a worker process)"""
+    extractor = LinkExtractor()
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), ''):
+            extractor.feed(chunk)
+    extractor.close()
+    return PageLinks(extractor.links, extractor.ids)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class LinkChecker:
+    """Checks the links in a build directory against its own files and, optionally, the web
+
+    Each page is parsed once with html.parser; the links and ids found are
+    cached by file size and mtime, so a check after an incremental build
+    only parses the pages that build wrote. Internal links and fragments
+    then resolve as set lookups against the files in the build directory.
+    Links to the site's own domains count as internal. External URLs go to
+    an HttpChecker with its own result cache.
+    """
+
+    PAGES_CACHE = 'pages.json'
+    EXTERNAL_CACHE = 'external.json'
+
+    def __init__(self, build_dir: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                 site_domains: Iterable[str] = (), max_workers: Optional[int] = None,
+                 http_options: Optional[Dict] = None):
+        self.build_dir = Path(build_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.site_domains = {domain.lower() for domain in site_domains}
+        self.max_workers = max_workers
+        self.http_options = http_options or {}
+
+    def _load_scans(self) -> Dict[str, Dict]:
+        if self.cache_dir is None:
+            return {}
+        path = self.cache_dir / self.PAGES_CACHE
+        if not path.exists():
+            return {}
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page scan cache: {str(e)}")
+            return {}
+        return data.get('pages', {}) if data.get('version') == CACHE_VERSION else {}
+
+    def _walk(self) -> Tuple[Set[str], Dict[str, Tuple[int, int]]]:
+        """Every file in the build, and the size and mtime of each page"""
+        files = set()
+        pages = {}
+        for dirpath, dirnames, filenames in os.walk(self.build_dir):
+            rel_dir = Path(dirpath).relative_to(self.build_dir).as_posix()
+            prefix = '' if rel_dir == '.' else rel_dir + '/'
+            for name in filenames:
+                rel = prefix + name
+                files.add(rel)
+                if name.endswith('.html'):
+                    st = os.stat(os.path.join(dirpath, name))
+                    pages[rel] = (st.st_size, st.st_mtime_ns)
+        return files, pages
+
+    def scan(self, pages: Dict[str, Tuple[int, int]]) -> Dict[str, PageLinks]:
+        """Links and ids of every page, parsing only pages changed since the last scan"""
+        cached = self._load_scans()
+        scans: Dict[str, PageLinks] = {}
+        changed = []
+        for rel, stamp in pages.items():
+            entry = cached.get(rel)
+            if entry is not None and tuple(entry['stamp']) == stamp:
+                scans[rel] = PageLinks(entry['links'], entry['ids'])
+            else:
+                changed.append(rel)
+
+        if changed:
+            # html.parser is pure Python, so many pages are worth a process pool
+            pool = ProcessPoolExecutor if len(changed) > 1 else ThreadPoolExecutor
+            paths = [str(self.build_dir / rel) for rel in changed]
+            with pool(max_workers=self.max_workers) as executor:
+                chunksize = max(1, len(paths) // ((self.max_workers or os.cpu_count() or 1) * 4))
+                kwargs = {'chunksize': chunksize} if pool is ProcessPoolExecutor else {}
+                for rel, result in zip(changed, executor.map(scan_page, paths, **kwargs)):
+                    scans[rel] = result
+
+        if self.cache_dir is not None and (changed or len(cached) != len(scans)):
+            entries = {rel: {'stamp': list(pages[rel]), 'links': scan.links, 'ids': scan.ids}
+                       for rel, scan in scans.items()}
+            _write_atomic(self.cache_dir / self.PAGES_CACHE,
+                          json.dumps({'version': CACHE_VERSION, 'pages': entries}, separators=(',', ':')))
+        logger.debug(f"Parsed {len(changed)} of {len(pages)} pages")
+        return scans
+
+    def _classify(self, href: str) -> Tuple[str, Optional[str]]:
+        """('external', url without fragment), ('internal', href) or ('skip', None)"""
+        lowered = href.lower()
+        if lowered.startswith('//'):
+            href, lowered = 'https:' + href, 'https:' + lowered
+        if lowered.startswith(('http:', 'https:')):
+            parts = urlsplit(href)
+            if (parts.hostname or '') in self.site_domains:
+                path = parts.path or '/'
+                return 'internal', path + (f'#{parts.fragment}' if parts.fragment else '')
+            return 'external', href.split('#', 1)[0]
+        if lowered.startswith(SiteIndex.EXTERNAL_PREFIXES):
+            return 'skip', None
+        return 'internal', href
+
+    def _judge(self, index: SiteIndex, page: str, href: str, ids: Dict[str, Set[str]]) -> Tuple[str, Optional[str]]:
+        """('ok', None), ('broken', None), ('skip', None) or ('external', url) for one link on a page"""
+        kind, target_href = self._classify(href)
+        if kind != 'internal':
+            return kind, target_href
+        fragment = unquote(target_href.split('#', 1)[1]) if '#' in target_href else None
+        if target_href.startswith('#'):
+            target = page
+        else:
+            target = index.resolve(posixpath.dirname(page), target_href)
+            if target is None:
+                return 'skip', None
+            if not index.exists(target):
+                return 'broken', None
+            if target not in ids and f'{target}/index.html' in ids:
+                target = f'{target}/index.html'
+        if fragment is not None and fragment not in IMPLICIT_FRAGMENTS and target in ids \
+                and fragment not in ids[target]:
+            return 'broken', None
+        return 'ok', None
+
+    def _check_page(self, index: SiteIndex, page: str, scan: PageLinks, ids: Dict[str, Set[str]],
+                    verdicts: Dict[Tuple[str, str], Tuple[str, Optional[str]]],
+                    external: Dict[str, List[str]]) -> List[str]:
+        """Broken internal links of one page; external URLs are collected for later"""
+        page_dir = posixpath.dirname(page)
+        broken = []
+        for href in dict.fromkeys(scan.links):
+            # Absolute links mean the same on every page, relative ones on every page in a directory
+            if href.startswith('#'):
+                key = (page, href)
+            elif href.startswith('/') or ':' in href.split('/', 1)[0]:
+                key = ('', href)
+            else:
+                key = (page_dir, href)
+            verdict = verdicts.get(key)
+            if verdict is None:
+                verdict = verdicts[key] = self._judge(index, page, href, ids)
+            kind, url = verdict
+            if kind == 'broken':
+                broken.append(href)
+            elif kind == 'external':
+                external.setdefault(url, []).append(page)
+        return broken
+
+    def run(self, check_external: bool = False) -> Dict:
+        """Check the whole build and return a report of what is broken"""
+        files, pages = self._walk()
+        scans = self.scan(pages)
+        index = SiteIndex(sources=(), outputs=files, sections=())
+        ids = {page: set(scan.ids) for page, scan in scans.items()}
+
+        broken: Dict[str, List[str]] = {}
+        external: Dict[str, List[str]] = {}
+        verdicts: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        for page in sorted(scans):
+            page_broken = self._check_page(index, page, scans[page], ids, verdicts, external)
+            if page_broken:
+                broken[page] = page_broken
+
+        report = {
+            'pages': len(scans),
+            'links': sum(len(scan.links) for scan in scans.values()),
+            'broken': broken,
+            'broken_count': sum(len(hrefs) for hrefs in broken.values()),
+            'external': {'urls': len(external), 'checked': 0, 'cached': 0, 'broken': {}}
+        }
+        if check_external and external:
+            # asyncio and ssl load only when external links are checked
+            from .http_checker import HttpChecker
+            cache_path = self.cache_dir / self.EXTERNAL_CACHE if self.cache_dir else None
+            checker = HttpChecker(cache_path, **self.http_options)
+            results = checker.check(external)
+            report['external'].update(
+                checked=checker.stats['checked'],
+                cached=checker.stats['cached'],
+                broken={url: {'status': result['status'], 'error': result['error'], 'pages': external[url]}
+                        for url, result in sorted(results.items()) if not result['ok']}
+            )
+        return report
+
+
+def check_html_links(build_dir: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                     site_domains: Iterable[str] = (), max_workers: Optional[int] = None) -> Dict:
+    """Check internal links and fragments in every built page"""
+    return LinkChecker(build_dir, cache_dir, site_domains, max_workers).run()
+
+
+def validate_links(build_dir: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                   site_domains: Iterable[str] = (), max_workers: Optional[int] = None,
+                   **http_options) -> Dict:
+    """Check internal links and every external URL the built pages link to"""
+    return LinkChecker(build_dir, cache_dir, site_domains, max_workers, http_options).run(check_external=True)
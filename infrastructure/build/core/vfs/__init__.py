@@ -0,0 +1,7 @@
+"""
+Virtual filesystem module
+"""
+
+from .snapshot_fs import SnapshotFS
+
+__all__ = ['SnapshotFS']
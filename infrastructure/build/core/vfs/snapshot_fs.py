@@ -0,0 +1,139 @@
+"""
+Snapshot FS - Read-through file cache validated against each file's stat
+"""
+
+import os
+import fnmatch
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..profiling import count
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+StatKey = Tuple[int, int, int]
+
+
+class SnapshotFS:
+    """Serves file contents and directory listings from memory while (mtime_ns, size, inode) still match"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._files: 'OrderedDict[Path, Tuple[StatKey, bytes]]' = OrderedDict()
+        self._listings: Dict[Path, Tuple[StatKey, Tuple[str, ...]]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    @staticmethod
+    def _stat_key(path: Path) -> Optional[StatKey]:
+        """Identity of a file's current contents, or None if it does not exist"""
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def exists(self, path: Union[str, Path]) -> bool:
+        """Check whether a path exists"""
+        return self._stat_key(Path(path)) is not None
+
+    def is_file(self, path: Union[str, Path]) -> bool:
+        """Check whether a path is a regular file"""
+        return Path(path).is_file()
+
+    def read_bytes(self, path: Union[str, Path]) -> bytes:
+        """Return file contents, re-reading only if the file changed since it was cached"""
+        path = Path(path)
+        key = self._stat_key(path)
+        if key is None:
+            raise FileNotFoundError(f"No such file: {path}")
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry[0] == key:
+                self._files.move_to_end(path)
+                self.hits += 1
+                count('snapshot.hits')
+                return entry[1]
+
+        # Keyed by the stat taken before reading, so a write that races the
+        # read is picked up by the next stat
+        data = path.read_bytes()
+        count('snapshot.misses')
+        count('bytes_read', len(data))
+        with self._lock:
+            self.misses += 1
+            self.bytes_read += len(data)
+            previous = self._files.pop(path, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            if len(data) <= self.max_bytes:
+                self._files[path] = (key, data)
+                self._size += len(data)
+                self._evict()
+        return data
+
+    def read_text(self, path: Union[str, Path], encoding: str = 'utf-8') -> str:
+        """Return file text with newlines normalised the way Path.read_text does"""
+        text = self.read_bytes(path).decode(encoding)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    def list_dir(self, path: Union[str, Path]) -> List[str]:
+        """Return the sorted entry names of a directory, cached until it changes"""
+        path = Path(path)
+        key = self._stat_key(path)
+        if key is None:
+            return []
+        with self._lock:
+            entry = self._listings.get(path)
+            if entry is not None and entry[0] == key:
+                return list(entry[1])
+        names = tuple(sorted(os.listdir(path)))
+        with self._lock:
+            self._listings[path] = (key, names)
+        return list(names)
+
+    def glob(self, path: Union[str, Path], pattern: str) -> List[Path]:
+        """Non-recursive glob over a cached directory listing"""
+        path = Path(path)
+        return [path / name for name in self.list_dir(path) if fnmatch.fnmatchcase(name, pattern)]
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """Drop any cached state for a path and its parent listing"""
+        path = Path(path)
+        with self._lock:
+            entry = self._files.pop(path, None)
+            if entry is not None:
+                self._size -= len(entry[1])
+            self._listings.pop(path, None)
+            self._listings.pop(path.parent, None)
+
+    def clear(self) -> None:
+        """Drop everything"""
+        with self._lock:
+            self._files.clear()
+            self._listings.clear()
+            self._size = 0
+
+    def _evict(self) -> None:
+        """Drop least recently used files until under the byte budget (caller holds the lock)"""
+        while self._size > self.max_bytes and self._files:
+            _, (_, data) = self._files.popitem(last=False)
+            self._size -= len(data)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters plus current memory use"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes_read': self.bytes_read,
+                'cached_bytes': self._size,
+                'cached_files': len(self._files)
+            }
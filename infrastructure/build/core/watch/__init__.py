@@ -0,0 +1,8 @@
+"""
+Watch mode module
+"""
+
+from .file_watcher import FileWatcher
+from .live_reload import LiveReloadServer
+
+__all__ = ['FileWatcher', 'LiveReloadServer']
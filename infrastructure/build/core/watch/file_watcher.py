@@ -0,0 +1,137 @@
+"""
+File Watcher - Reports batches of changed files using inotify, or polling as a fallback
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+# Optional imports
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+
+logger = logging.getLogger(__name__)
+
+
+def _is_ignored(path: Path) -> bool:
+    """Skip editor swap files and other hidden temporaries"""
+    name = path.name
+    return name.startswith('.') or name.endswith(('~', '.swp', '.tmp'))
+
+
+if HAS_WATCHDOG:
+    class _QueueHandler(FileSystemEventHandler):
+        """Forward every filesystem event to a queue"""
+
+        def __init__(self, events: 'queue.Queue[Path]'):
+            self.events = events
+
+        def on_any_event(self, event) -> None:
+            if event.is_directory and event.event_type == 'modified':
+                return
+            self.events.put(Path(event.src_path))
+            dest_path = getattr(event, 'dest_path', '')
+            if dest_path:
+                self.events.put(Path(dest_path))
+
+
+class FileWatcher:
+    """Watches directory trees and calls back with debounced sets of changed paths"""
+
+    def __init__(self, paths: Iterable[Path], callback: Callable[[Set[Path]], None],
+                 debounce: float = 0.05, poll_interval: float = 0.25,
+                 use_polling: bool = False):
+        self.paths = [Path(p) for p in paths if Path(p).exists()]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling or not HAS_WATCHDOG
+        self._events: 'queue.Queue[Path]' = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+
+    def start(self) -> None:
+        """Start watching in background threads"""
+        if self.use_polling:
+            logger.info("Watching for changes by polling")
+            self._spawn(self._poll_loop)
+        else:
+            logger.info("Watching for changes with native filesystem events")
+            self._observer = Observer()
+            handler = _QueueHandler(self._events)
+            for path in self.paths:
+                self._observer.schedule(handler, str(path), recursive=True)
+            self._observer.start()
+        self._spawn(self._dispatch_loop)
+
+    def stop(self) -> None:
+        """Stop watching and wait for the background threads"""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        for thread in self._threads:
+            thread.join()
+
+    def _spawn(self, target: Callable[[], None]) -> None:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _dispatch_loop(self) -> None:
+        """Collect events until the tree settles, then hand them over as one batch"""
+        while not self._stop.is_set():
+            try:
+                first = self._events.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            changed = {first}
+            deadline = time.monotonic() + self.debounce
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    changed.add(self._events.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            changed = {p for p in changed if not _is_ignored(p)}
+            if not changed:
+                continue
+            try:
+                self.callback(changed)
+            except Exception as e:
+                logger.error(f"Error handling changes: {str(e)}")
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Stat every file under the watched paths"""
+        snapshot = {}
+        for root in self.paths:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _poll_loop(self) -> None:
+        """Fallback for platforms without native events: diff stat snapshots"""
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path in previous.keys() | current.keys():
+                if previous.get(path) != current.get(path):
+                    self._events.put(path)
+            previous = current
@@ -0,0 +1,132 @@
+"""
+Live Reload Server - Serves the build directory and tells open browsers to reload
+"""
+
+import logging
+import threading
+from pathlib import Path
+from functools import partial
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+RELOAD_PATH = '/__livereload'
+RELOAD_SCRIPT = (
+    '<script>new EventSource("' + RELOAD_PATH + '")'
+    '.onmessage = function () { location.reload(); };</script>'
+).encode('utf-8')
+
+
+class _ReloadState:
+    """Generation counter that SSE clients wait on"""
+
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def bump(self) -> None:
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class _LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Static file handler that injects the reload client and serves the event stream"""
+
+    def __init__(self, *args, state: _ReloadState, **kwargs):
+        self.state = state
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+    def do_GET(self) -> None:
+        if self.path == RELOAD_PATH:
+            self._serve_events()
+            return
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not urlsplit(self.path).path.endswith('/'):
+                # http.server redirects to the URL with a trailing slash, so relative links resolve
+                super().do_GET()
+                return
+            path = path / 'index.html'
+        if path.suffix == '.html' and path.is_file():
+            self._serve_html(path)
+            return
+        super().do_GET()
+
+    def _serve_html(self, path: Path) -> None:
+        body = path.read_bytes()
+        index = body.rfind(b'</body>')
+        body = body[:index] + RELOAD_SCRIPT + body[index:] if index != -1 else body + RELOAD_SCRIPT
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_events(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        state = self.state
+        with state.condition:
+            seen = state.generation
+        try:
+            while True:
+                with state.condition:
+                    state.condition.wait_for(
+                        lambda: state.generation != seen or state.closed, timeout=15
+                    )
+                    if state.closed:
+                        return
+                    changed = state.generation != seen
+                    seen = state.generation
+                # Comments keep idle connections alive through proxies
+                self.wfile.write(b'data: reload\n\n' if changed else b': ping\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class LiveReloadServer:
+    """Local HTTP server for the build directory with server-sent reload events"""
+
+    def __init__(self, build_dir: Path, host: str = '127.0.0.1', port: int = 8000):
+        self.build_dir = Path(build_dir)
+        self.host = host
+        self.port = port
+        self._state = _ReloadState()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> None:
+        """Start serving in a background thread"""
+        handler = partial(_LiveReloadHandler, directory=str(self.build_dir), state=self._state)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Serving {self.build_dir} at http://{self.host}:{self.port}/")
+
+    def notify_reload(self) -> None:
+        """Tell every connected browser to reload"""
+        self._state.bump()
+
+    def stop(self) -> None:
+        """Shut the server down"""
+        self._state.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
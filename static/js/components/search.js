@@ -0,0 +1,119 @@
+/*
+ * Library search client.
+ *
+ * Queries the prefix-sharded index written by core/search at build time,
+ * downloading only the shards holding the query's terms, and ranks pages
+ * with BM25. Tokenizing and stemming mirror core/search/tokenizer.py.
+ */
+(function () {
+    'use strict';
+
+    var INDEX_URL = '/search/';
+    var K1 = 1.2;
+    var B = 0.75;
+
+    var STOPWORDS = new Set((
+        'a an and are as at be but by for from has have in is it its of on or that the ' +
+        'this to was were will with you your'
+    ).split(' '));
+
+    var SUFFIX_RULES = [
+        ['sses', 'ss', 2], ['ies', 'y', 2], ['ational', 'ate', 3], ['ization', 'ize', 3],
+        ['fulness', 'ful', 3], ['ness', '', 3], ['ments', '', 3], ['ment', '', 3],
+        ['ings', '', 3], ['ing', '', 3], ['edly', '', 3], ['ed', '', 3], ['ly', '', 3],
+        ['es', '', 3], ['s', '', 3]
+    ];
+
+    function stem(word) {
+        if (word.endsWith('ss')) {
+            return word;
+        }
+        for (var i = 0; i < SUFFIX_RULES.length; i++) {
+            var rule = SUFFIX_RULES[i];
+            if (word.endsWith(rule[0]) && word.length - rule[0].length >= rule[2]) {
+                return word.slice(0, word.length - rule[0].length) + rule[1];
+            }
+        }
+        return word;
+    }
+
+    function tokenize(text) {
+        var words = text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+        return words
+            .filter(function (word) { return word.length >= 2 && !STOPWORDS.has(word); })
+            .map(stem);
+    }
+
+    function shardName(term, prefixLength) {
+        return Array.from(term).slice(0, prefixLength).map(function (c) {
+            return /^[a-z0-9]$/.test(c) ? c : '_' + c.codePointAt(0).toString(16).padStart(4, '0');
+        }).join('');
+    }
+
+    var metaPromise = null;
+    var shardCache = new Map();
+
+    function fetchJSON(url) {
+        return fetch(url).then(function (response) {
+            if (response.status === 404) {
+                return {};
+            }
+            if (!response.ok) {
+                throw new Error('Search index request failed: ' + url);
+            }
+            return response.json();
+        });
+    }
+
+    function loadMeta() {
+        if (!metaPromise) {
+            metaPromise = fetchJSON(INDEX_URL + 'meta.json');
+        }
+        return metaPromise;
+    }
+
+    function loadShard(name) {
+        if (!shardCache.has(name)) {
+            shardCache.set(name, fetchJSON(INDEX_URL + 'shards/' + name + '.json'));
+        }
+        return shardCache.get(name);
+    }
+
+    function search(query, limit) {
+        var terms = Array.from(new Set(tokenize(query)));
+        if (!terms.length) {
+            return Promise.resolve([]);
+        }
+        return loadMeta().then(function (meta) {
+            return Promise.all(terms.map(function (term) {
+                return loadShard(shardName(term, meta.prefix_length)).then(function (shard) {
+                    return shard[term] || [];
+                });
+            })).then(function (postingLists) {
+                var scores = new Map();
+                postingLists.forEach(function (postings) {
+                    var idf = Math.log(1 + (meta.doc_count - postings.length + 0.5) / (postings.length + 0.5));
+                    postings.forEach(function (posting) {
+                        var doc = meta.docs[posting[0]];
+                        if (!doc) {
+                            return;
+                        }
+                        var tf = posting[1];
+                        var norm = K1 * (1 - B + B * doc[2] / meta.avg_length);
+                        var score = idf * tf * (K1 + 1) / (tf + norm);
+                        scores.set(posting[0], (scores.get(posting[0]) || 0) + score);
+                    });
+                });
+                return Array.from(scores.entries())
+                    .sort(function (a, b) { return b[1] - a[1]; })
+                    .slice(0, limit || 10)
+                    .map(function (entry) {
+                        var doc = meta.docs[entry[0]];
+                        return {title: doc[0], url: doc[1], score: entry[1]};
+                    });
+            });
+        });
+    }
+
+    window.LibrarySearch = {search: search, tokenize: tokenize};
+})();
@@ -0,0 +1,10 @@
+"""
+Shared pytest setup: makes the infrastructure package importable from the repository root
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
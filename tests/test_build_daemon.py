@@ -0,0 +1,34 @@
+"""
+Tests for BuildDaemon's configuration reload
+"""
+
+import os
+
+from infrastructure.build import build
+from infrastructure.build.core.daemon.build_daemon import BuildDaemon
+
+
+class _StubBuilder:
+    def __init__(self, root_path, executor=None):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_config_reload_closes_the_old_builder(tmp_path, monkeypatch):
+    config = tmp_path / 'build_config.json'
+    config.write_text('{}', encoding='utf-8')
+    monkeypatch.setattr(build, 'Builder', _StubBuilder)
+    daemon = BuildDaemon(tmp_path, socket_path=tmp_path / 'daemon.sock')
+    old = daemon.builder = _StubBuilder(tmp_path)
+    daemon._config_stamp = daemon._stat_config()
+
+    daemon._refresh()
+    assert daemon.builder is old and not old.closed
+
+    config.write_text('{"site": {}}', encoding='utf-8')
+    os.utime(config, ns=(1, 1))
+    daemon._refresh()
+    assert old.closed
+    assert daemon.builder is not old and not daemon.builder.closed
@@ -0,0 +1,20 @@
+"""
+Tests for the Additional Resources list on section pages
+"""
+
+from infrastructure.build.build import Builder
+from infrastructure.build.core.vfs import SnapshotFS
+
+
+def test_each_resource_is_listed_once(tmp_path):
+    for name in ('README.md', 'SEO.md', 'worksheet.md', 'guide.pdf', 'slides.pptx'):
+        (tmp_path / name).write_text('x', encoding='utf-8')
+    builder = Builder.__new__(Builder)
+    builder.fs = SnapshotFS()
+
+    resources = builder._gather_resources(tmp_path)
+
+    assert resources.count('<li>') == 3
+    for name in ('worksheet.md', 'guide.pdf', 'slides.pptx'):
+        assert resources.count(f'href="{name}"') == 1
+    assert 'README.md' not in resources and 'SEO.md' not in resources
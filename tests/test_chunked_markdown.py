@@ -0,0 +1,120 @@
+"""
+Tests that chunked markdown rendering matches a single markdown2 pass
+"""
+
+import html
+import threading
+
+import markdown2
+import pytest
+
+from infrastructure.build.core.content.chunked_markdown import (
+    ChunkedMarkdown, ChunkedMarkdownRenderer, split_blocks
+)
+
+EXTRAS = ['metadata', 'tables', 'fenced-code-blocks', 'header-ids', 'footnotes', 'smarty-pants']
+
+SECTION = """# Setup
+
+Install it as the [guide][install] says, or see [the FAQ](/faq/ "Questions")[^{n}].
+
+<div class="note">
+Raw *HTML* block {n}, left as written.
+</div>
+
+## Usage
+
+| Step | Command |
+|------|---------|
+| {n}  | `run --fast` |
+
+```python
+# Not a heading inside fenced code
+print("chunk {n}")
+```
+
+"Quoted" text -- with smarty pants... and an inline <span>tag</span>.
+
+"""
+
+FOOTER = """
+[install]: https://example.com/install "Install guide"
+
+[^{n}]: Footnote {n}, defined far from its marker.
+"""
+
+
+def _document(sections: int = 12) -> str:
+    body = ''.join(SECTION.format(n=n) for n in range(sections))
+    footer = ''.join(FOOTER.format(n=n) for n in range(sections))
+    return '---\ntitle: Chunked\nauthor: Docs Team\n---\n\n' + body + footer
+
+
+@pytest.fixture
+def renderer(request):
+    renderer = ChunkedMarkdownRenderer(EXTRAS, max_workers=2, min_size=0, chunk_size=request.param)
+    yield renderer
+    renderer.close()
+
+
+@pytest.mark.parametrize('renderer', [1, 256, 2048], indirect=True)
+def test_matches_single_pass(renderer):
+    text = _document()
+    prepared = ChunkedMarkdown(extras=EXTRAS).prepare(text)
+    assert len(split_blocks(prepared, renderer.chunk_size)) > 1
+
+    chunked = renderer.render(text)
+    single = ChunkedMarkdown(extras=EXTRAS).convert(text)
+    stock = markdown2.Markdown(extras=EXTRAS).convert(text)
+
+    assert chunked == single
+    assert chunked == stock
+    assert chunked.metadata == stock.metadata == {'title': 'Chunked', 'author': 'Docs Team'}
+
+
+@pytest.mark.parametrize('renderer', [1], indirect=True)
+def test_duplicate_header_ids_follow_document_order(renderer):
+    chunked = renderer.render(_document(sections=3))
+
+    for header_id in ('setup', 'setup-2', 'setup-3', 'usage', 'usage-2', 'usage-3'):
+        assert f'id="{header_id}"' in chunked
+    assert chunked.index('id="setup"') < chunked.index('id="setup-2"') < chunked.index('id="setup-3"')
+
+
+@pytest.mark.parametrize('renderer', [1], indirect=True)
+def test_footnotes_and_raw_html_survive_chunking(renderer):
+    chunked = renderer.render(_document(sections=3))
+
+    assert chunked.count('class="footnote-ref"') == 3
+    assert 'Footnote 2, defined far from its marker.' in chunked
+    assert chunked.count('<div class="note">') == 3
+    assert '<a href="https://example.com/install" title="Install guide">guide</a>' in chunked
+
+
+@pytest.mark.parametrize('renderer', [1], indirect=True)
+def test_email_links_are_reproducible(renderer):
+    text = _document(sections=3) + '\nWrite to <docs@example.com>.\n'
+    chunked = renderer.render(text)
+    stock = markdown2.Markdown(extras=EXTRAS).convert(text)
+
+    # Stock markdown2 encodes addresses at random; decoded, both must say the same
+    assert chunked == ChunkedMarkdown(extras=EXTRAS).convert(text)
+    assert html.unescape(chunked) == html.unescape(stock)
+
+
+@pytest.mark.parametrize('renderer', [1], indirect=True)
+def test_pool_is_created_once_across_threads(renderer):
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def grab():
+        barrier.wait()
+        pools.append(renderer._pool())
+
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(pool) for pool in pools}) == 1
@@ -0,0 +1,58 @@
+"""
+Tests for include tracking and invalidation through the dependency graph
+"""
+
+from infrastructure.build.core.content.content_processor import ContentProcessor
+from infrastructure.build.core.content.dependency_graph import DependencyGraph
+
+
+def _site(root):
+    (root / 'shared').mkdir()
+    (root / 'shared' / 'intro.md').write_text('Shared intro, first edition.\n\n@include(file:outro.md)\n', encoding='utf-8')
+    (root / 'shared' / 'outro.md').write_text('Shared outro.\n', encoding='utf-8')
+    for name in ('01_First', '02_Second', '03_Alone'):
+        (root / name).mkdir()
+    (root / '01_First' / 'README.md').write_text('# First\n\n@include(file:../shared/intro.md)\n', encoding='utf-8')
+    (root / '02_Second' / 'README.md').write_text('# Second\n\n@include(file:../shared/outro.md)\n', encoding='utf-8')
+    (root / '03_Alone' / 'README.md').write_text('# Alone\n\nNothing shared.\n', encoding='utf-8')
+    return ContentProcessor(root)
+
+
+def test_changed_include_invalidates_its_pages(tmp_path):
+    processor = _site(tmp_path)
+    for name in ('01_First', '02_Second', '03_Alone'):
+        processor.process_page(tmp_path / name)
+
+    graph = processor.dependency_graph
+    assert graph.dependencies('01_First') == {'shared/intro.md', 'shared/outro.md'}
+    assert processor.invalidate(tmp_path / 'shared' / 'intro.md') == ['01_First']
+    # Nested includes reach every page that pulls them in
+    assert processor.invalidate(tmp_path / 'shared' / 'outro.md') == ['01_First', '02_Second']
+    assert processor.invalidate(tmp_path / '03_Alone' / 'README.md') == []
+
+
+def test_invalidated_include_is_read_again(tmp_path):
+    processor = _site(tmp_path)
+    processor.process_page(tmp_path / '01_First')
+
+    intro = tmp_path / 'shared' / 'intro.md'
+    intro.write_text('Shared intro, second edition.\n', encoding='utf-8')
+    processor.invalidate(intro)
+    _, html, page = processor.process_page(tmp_path / '01_First')
+
+    assert 'second edition' in html
+    assert processor.dependency_graph.dependencies('01_First') == {'shared/intro.md'}
+
+
+def test_graph_round_trips_and_forgets_pages(tmp_path):
+    graph = DependencyGraph()
+    graph.record('01_First', ['shared/intro.md', 'shared/outro.md'])
+    graph.record('02_Second', ['shared/outro.md'])
+    graph.save(tmp_path / 'graph.json')
+
+    loaded = DependencyGraph.load(tmp_path / 'graph.json')
+    assert loaded.pages_to_rebuild(['shared/outro.md']) == ['01_First', '02_Second']
+
+    loaded.remove('01_First')
+    assert loaded.pages_to_rebuild(['shared/intro.md', 'shared/outro.md']) == ['02_Second']
+    assert DependencyGraph.load(tmp_path / 'missing.json').pages_to_rebuild(['shared/outro.md']) == []
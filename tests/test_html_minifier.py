@@ -0,0 +1,83 @@
+"""
+Tests for the streaming HTML minifier
+"""
+
+import pytest
+
+from infrastructure.build.core.assets.html_minifier import minify, minify_stream
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <!--[if lt IE 9]><script src="html5shiv.js"></script><![endif]-->
+    <style>
+      body  {  margin: 0;  }
+    </style>
+    <script>
+      if (a < b && c > d) {  run("  </p>  ");  }
+    </script>
+  </head>
+  <body>
+    <!-- dropped comment -->
+    <p class="lead">Some   text &amp; more&nbsp;text   &#169;</p>
+    <pre>
+  keep   this
+      indentation
+    </pre>
+    <textarea name="t">  two  spaces  </textarea>
+    <svg><style><![CDATA[ .a > .b { fill: red; } ]]></style></svg>
+    <![if !IE]><p>Not IE</p><![endif]>
+    <!--[if IE]><p>IE only</p><![endif]-->
+    <br/>
+  </body>
+</html>
+"""
+
+
+def _chunked(html, size):
+    parts = []
+    minify_stream((html[i:i + size] for i in range(0, len(html), size)), parts.append)
+    return ''.join(parts)
+
+
+def test_cdata_is_closed():
+    assert minify('<![CDATA[x]]>') == '<![CDATA[x]]>'
+    assert minify('<svg><![CDATA[ a  <  b ]]></svg>') == '<svg><![CDATA[ a  <  b ]]></svg>'
+
+
+def test_preserved_content_passes_through():
+    result = minify(PAGE)
+
+    assert '<pre>\n  keep   this\n      indentation\n    </pre>' in result
+    assert '<textarea name="t">  two  spaces  </textarea>' in result
+    assert 'if (a < b && c > d) {  run("  </p>  ");  }' in result
+    assert 'body  {  margin: 0;  }' in result
+
+
+def test_comments_and_conditionals():
+    result = minify(PAGE)
+
+    assert 'dropped comment' not in result
+    assert '<!--[if lt IE 9]><script src="html5shiv.js"></script><![endif]-->' in result
+    assert '<!--[if IE]><p>IE only</p><![endif]-->' in result
+    assert '<![if !IE]><p>Not IE</p><![endif]>' in result
+
+
+def test_text_whitespace_collapses_and_entities_stay():
+    result = minify(PAGE)
+
+    assert '<p class="lead">Some text &amp; more&nbsp;text &#169;</p>' in result
+    assert '\n\n' not in result.split('<pre>')[0]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 7, 16, 64, 4096])
+def test_output_is_independent_of_chunk_size(size):
+    assert _chunked(PAGE, size) == minify(PAGE)
+
+
+def test_every_split_point_gives_the_same_output():
+    expected = minify(PAGE)
+    for cut in range(1, len(PAGE)):
+        parts = []
+        minify_stream((PAGE[:cut], PAGE[cut:]), parts.append)
+        assert ''.join(parts) == expected, cut
@@ -0,0 +1,101 @@
+"""
+Tests for HttpChecker against a local stub server
+"""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from infrastructure.build.core.utils.http_checker import HttpChecker
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers by path: /ok, /missing, /moved (to /ok), /slow and /queued"""
+
+    protocol_version = 'HTTP/1.1'
+    # Seconds /slow and /queued wait before answering, set per test
+    delays = {'/slow': 2.0, '/queued': 0.0}
+
+    def do_HEAD(self):
+        path = self.path.split('?', 1)[0]
+        self.server.hits.append(path)
+        if path in self.delays:
+            time.sleep(self.delays[path])
+        if path in ('/ok', '/slow', '/queued'):
+            self._reply(200)
+        elif path == '/moved':
+            self._reply(301, location='/ok')
+        else:
+            self._reply(404)
+
+    def _reply(self, status, location=None):
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    httpd.hits = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_statuses(server, tmp_path):
+    _, base = server
+    checker = HttpChecker(tmp_path / 'external.json', timeout=5)
+    results = checker.check([f'{base}/ok', f'{base}/missing', f'{base}/moved'])
+
+    assert results[f'{base}/ok']['ok'] and results[f'{base}/ok']['status'] == 200
+    assert not results[f'{base}/missing']['ok'] and results[f'{base}/missing']['status'] == 404
+    assert results[f'{base}/moved']['ok'] and results[f'{base}/moved']['status'] == 200
+    assert checker.stats['checked'] == 3
+
+
+def test_timeout(server, tmp_path, monkeypatch):
+    _, base = server
+    monkeypatch.setitem(StubHandler.delays, '/slow', 2.0)
+    checker = HttpChecker(tmp_path / 'external.json', timeout=0.5)
+    result = checker.check([f'{base}/slow'])[f'{base}/slow']
+
+    assert not result['ok']
+    assert result['status'] is None
+    assert result['error'].startswith('timed out')
+
+
+def test_waiting_for_a_slot_does_not_count_against_the_timeout(server, tmp_path, monkeypatch):
+    _, base = server
+    monkeypatch.setitem(StubHandler.delays, '/queued', 0.2)
+    # 20 requests two at a time take about 2 s in all, each well inside its own timeout
+    urls = [f'{base}/queued?n={n}' for n in range(20)]
+    checker = HttpChecker(tmp_path / 'external.json', timeout=1, max_per_host=2)
+    results = checker.check(urls)
+
+    assert [url for url, result in results.items() if not result['ok']] == []
+
+
+def test_cache_hit(server, tmp_path):
+    httpd, base = server
+    urls = [f'{base}/ok', f'{base}/missing']
+    HttpChecker(tmp_path / 'external.json', timeout=5).check(urls)
+    hits = len(httpd.hits)
+
+    checker = HttpChecker(tmp_path / 'external.json', timeout=5)
+    results = checker.check(urls)
+
+    assert len(httpd.hits) == hits
+    assert checker.stats == {'checked': 0, 'cached': 2, 'reused_connections': 0}
+    assert results[f'{base}/ok']['status'] == 200
+    assert results[f'{base}/missing']['status'] == 404
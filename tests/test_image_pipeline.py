@@ -0,0 +1,71 @@
+"""
+Tests for ImagePipeline cache entries shared by identical images
+"""
+
+import pytest
+
+from infrastructure.build.core.assets.image_pipeline import HAS_PIL, ImagePipeline
+
+pytestmark = pytest.mark.skipif(not HAS_PIL, reason="Pillow is not installed")
+
+
+def _png(path):
+    from PIL import Image
+    Image.new('RGB', (8, 8), (200, 30, 30)).save(path, format='PNG')
+    return path
+
+
+def test_identical_images_keep_their_own_names(tmp_path):
+    logo = _png(tmp_path / 'logo.png')
+    icon = tmp_path / 'icon.png'
+    icon.write_bytes(logo.read_bytes())
+    out = tmp_path / 'out'
+    pipeline = ImagePipeline(tmp_path / 'cache', max_workers=1)
+
+    pipeline.run([(logo, out / 'a'), (icon, out / 'b')])
+
+    assert sorted(p.name for p in (out / 'a').iterdir()) == ['logo.png', 'logo.webp']
+    assert sorted(p.name for p in (out / 'b').iterdir()) == ['icon.png', 'icon.webp']
+    assert pipeline.misses == 1
+
+
+def test_cache_hit_installs_under_the_new_name(tmp_path):
+    logo = _png(tmp_path / 'logo.png')
+    ImagePipeline(tmp_path / 'cache', max_workers=1).run([(logo, tmp_path / 'first')])
+
+    icon = tmp_path / 'icon.png'
+    icon.write_bytes(logo.read_bytes())
+    pipeline = ImagePipeline(tmp_path / 'cache', max_workers=1)
+    pipeline.run([(icon, tmp_path / 'second')])
+
+    assert pipeline.hits == 1
+    assert sorted(p.name for p in (tmp_path / 'second').iterdir()) == ['icon.png', 'icon.webp']
+
+
+def _image_builder(root):
+    from infrastructure.build.build import Builder
+
+    builder = Builder.__new__(Builder)
+    builder.config = {'assets': {'optimize_images': True}}
+    builder.build_dir = root / 'build'
+    builder.image_pipeline = ImagePipeline(root / 'cache', max_workers=1)
+    return builder
+
+
+def test_section_rebuild_prunes_removed_images(tmp_path):
+    section = tmp_path / 'content' / '01_Intro'
+    (section / 'images').mkdir(parents=True)
+    _png(section / 'images' / 'kept.png')
+    gone = _png(section / 'images' / 'gone.png')
+    builder = _image_builder(tmp_path)
+    builder.process_section_images([section])
+    output = tmp_path / 'build' / '01_Intro' / 'images'
+    assert sorted(p.name for p in output.iterdir()) == ['gone.png', 'gone.webp', 'kept.png', 'kept.webp']
+
+    gone.unlink()
+    builder.process_section_images([section])
+    assert sorted(p.name for p in output.iterdir()) == ['kept.png', 'kept.webp']
+
+    (section / 'images' / 'kept.png').unlink()
+    builder.process_section_images([section])
+    assert not output.exists()
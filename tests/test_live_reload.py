@@ -0,0 +1,52 @@
+"""
+Tests for the live-reload development server
+"""
+
+import http.client
+
+import pytest
+
+from infrastructure.build.core.watch.live_reload import RELOAD_SCRIPT, LiveReloadServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / '01_Alpha').mkdir()
+    (tmp_path / '01_Alpha' / 'index.html').write_text('<html><body><p>Alpha</p></body></html>', encoding='utf-8')
+    (tmp_path / 'site.css').write_text('p { margin: 0; }', encoding='utf-8')
+    server = LiveReloadServer(tmp_path, port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _get(server, path):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, response.getheader('Location'), response.read()
+    finally:
+        connection.close()
+
+
+def test_directory_without_slash_redirects(server):
+    status, location, _ = _get(server, '/01_Alpha')
+    assert (status, location) == (301, '/01_Alpha/')
+
+    status, location, _ = _get(server, '/01_Alpha?tab=2')
+    assert (status, location) == (301, '/01_Alpha/?tab=2')
+
+
+def test_directory_index_gets_the_reload_client(server):
+    status, _, body = _get(server, '/01_Alpha/')
+
+    assert status == 200
+    assert body.endswith(RELOAD_SCRIPT + b'</body></html>')
+
+
+def test_other_files_are_served_unchanged(server):
+    status, _, body = _get(server, '/site.css')
+
+    assert status == 200
+    assert body == b'p { margin: 0; }'
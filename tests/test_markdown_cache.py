@@ -0,0 +1,58 @@
+"""
+Tests for MarkdownCache size accounting and least-recently-used eviction
+"""
+
+import os
+
+from infrastructure.build.core.cache.markdown_cache import MarkdownCache
+
+EXTRAS = ['fenced-code-blocks', 'tables']
+
+
+def _age(cache, source, seconds):
+    path = cache._entry_path(cache.key(source))
+    stamp = path.stat().st_mtime_ns - seconds * 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_overwriting_an_entry_does_not_grow_the_size(tmp_path):
+    cache = MarkdownCache(tmp_path, EXTRAS, max_bytes=10_000)
+    cache.put('a', 'x' * 100)
+    cache.put('b', 'y' * 100)
+    assert cache._size == 200
+
+    cache.put('a', 'x' * 100)
+    cache.put('a', 'z' * 40)
+    assert cache._size == cache._scan_size() == 140
+    assert cache.get('a') == 'z' * 40
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'writes': 4, 'evictions': 0}
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = MarkdownCache(tmp_path, EXTRAS, max_bytes=1_000)
+    for age, source in enumerate(('old', 'used', 'new'), start=1):
+        cache.put(source, source[0] * 300)
+        _age(cache, source, 100 // age)
+    # A hit counts as a use, so the middle entry outlives the oldest
+    assert cache.get('used') == 'u' * 300
+
+    cache.put('fourth', 'f' * 300)
+
+    assert cache.evictions == 1
+    assert cache.get('old') is None
+    assert cache.get('used') is not None and cache.get('new') is not None
+    assert cache._size == cache._scan_size() == 900
+
+
+def test_size_is_scanned_from_disk_once(tmp_path):
+    cache = MarkdownCache(tmp_path, EXTRAS)
+    cache.put('a', 'x' * 100)
+    _age(cache, 'a', 10)
+    cache = MarkdownCache(tmp_path, EXTRAS, max_bytes=150)
+
+    cache.put('b', 'y' * 100)
+
+    # 200 bytes on disk is over the cap, so the older entry goes
+    assert cache.evictions == 1
+    assert cache._size == 100
+    assert cache.get('a') is None and cache.get('b') == 'y' * 100
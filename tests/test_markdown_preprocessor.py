@@ -0,0 +1,76 @@
+"""
+Tests that the single-pass preprocessor matches the regex passes it replaced
+"""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from infrastructure.build.core.content.markdown_preprocessor import MarkdownPreprocessor, PreprocessResult
+
+SECTIONS_DIR = Path(__file__).resolve().parent.parent / 'content' / 'sections'
+
+LEGACY_INCLUDE_PATTERN = re.compile(r'@include\((code|file):(.*?)\)')
+
+
+def _legacy(content, resolve):
+    """The link rewrite and include expansion ContentProcessor used to run as separate passes"""
+    content = re.sub(r'\[(.*?)\]\((.*?\.md)\)', lambda m: f'[{m.group(1)}]({m.group(2)[:-3]}.html)', content)
+    return LEGACY_INCLUDE_PATTERN.sub(lambda m: resolve(m.group(1), m.group(2)), content)
+
+
+def _legacy_headings(content):
+    return [(len(hashes), title.rstrip().rstrip('#').rstrip())
+            for hashes, title in re.findall(r'^(#{1,6})[ \t]*([^\s#][^\n]*)', content, re.MULTILINE)]
+
+
+def _fragment(kind, target):
+    return f'<{kind} {target}>'
+
+
+def _preprocessor():
+    return MarkdownPreprocessor(lambda kind, target, base, stack: PreprocessResult(content=_fragment(kind, target)))
+
+
+SAMPLE = """# Guide
+
+See [the basics](basics.md) and [setup](../02_Setup/README.md#install).
+![diagram](images/flow.png) and [site](https://example.com/page.md).
+
+## Details ##
+
+@include(file:shared/notes.md)
+@include(code:scripts/run.py)
+
+### Deep [link](deep.md) in a title
+"""
+
+
+@pytest.mark.parametrize('readme', sorted(SECTIONS_DIR.glob('*/README.md')), ids=lambda p: p.parent.name)
+def test_library_content_matches_legacy_passes(readme):
+    content = readme.read_text(encoding='utf-8')
+    result = _preprocessor().run(content, readme.parent)
+
+    assert result.content == _legacy(content, _fragment)
+    assert [(h.level, h.title) for h in result.headings] == _legacy_headings(content)
+
+
+def test_sample_matches_legacy_passes():
+    result = _preprocessor().run(SAMPLE, Path('.'))
+
+    assert result.content == _legacy(SAMPLE, _fragment)
+    assert [(h.level, h.title) for h in result.headings] == _legacy_headings(SAMPLE)
+    assert [h.anchor for h in result.headings] == ['guide', 'details', 'deep-linkdeepmd-in-a-title']
+    assert [link.href for link in result.links] == [
+        'basics.md', '../02_Setup/README.md#install', 'images/flow.png', 'https://example.com/page.md', 'deep.md'
+    ]
+
+
+def test_fenced_blocks_are_left_alone_except_includes():
+    content = "```\n# not a heading\n[kept](kept.md)\n@include(file:inside.md)\n```\n# Real\n"
+    result = _preprocessor().run(content, Path('.'))
+
+    assert result.content == "```\n# not a heading\n[kept](kept.md)\n<file inside.md>\n```\n# Real\n"
+    assert [h.title for h in result.headings] == ['Real']
+    assert result.links == []
@@ -0,0 +1,46 @@
+"""
+Tests for MetadataEnricher's cache placement and snapshot reads
+"""
+
+import json
+
+from infrastructure.build.core.metadata.metadata_enricher import LEGACY_CACHE_FILE, MetadataEnricher
+from infrastructure.build.core.vfs import SnapshotFS
+
+
+def _make_block(content_dir, name, summary):
+    block = content_dir / name
+    block.mkdir(parents=True)
+    (block / 'README.md').write_text(f'{summary}\n\nMore detail.\n', encoding='utf-8')
+    (block / 'notes.md').write_text('# Notes\n', encoding='utf-8')
+
+
+def test_cache_lives_outside_the_content_tree(tmp_path):
+    content_dir = tmp_path / 'content'
+    cache_dir = tmp_path / '.cache' / 'metadata'
+    _make_block(content_dir, '01_Getting_Started', 'First steps.')
+    (content_dir / LEGACY_CACHE_FILE).write_text('{}', encoding='utf-8')
+
+    enricher = MetadataEnricher(str(content_dir), cache_dir=str(cache_dir))
+    metadata = enricher.enrich_library_metadata()
+
+    assert metadata['knowledge_blocks']['01_Getting_Started']['summary'] == 'First steps.'
+    assert json.loads((cache_dir / 'enricher.json').read_text(encoding='utf-8'))['folders']
+    assert not (content_dir / LEGACY_CACHE_FILE).exists()
+    assert sorted(p.name for p in content_dir.iterdir()) == ['01_Getting_Started', 'library_metadata.json']
+
+    rerun = MetadataEnricher(str(content_dir), cache_dir=str(cache_dir))
+    rerun.enrich_library_metadata()
+    assert rerun.stats == {'reused': 1, 'generated': 0}
+
+
+def test_readmes_are_read_through_the_snapshot(tmp_path):
+    content_dir = tmp_path / 'content'
+    _make_block(content_dir, '01_Getting_Started', 'First steps.')
+    _make_block(content_dir, '02_Next_Steps', 'Keep going.')
+    fs = SnapshotFS()
+
+    MetadataEnricher(str(content_dir), fs=fs).enrich_library_metadata()
+
+    assert fs.misses == 2
+    assert not list(content_dir.glob('.*'))
@@ -0,0 +1,67 @@
+"""
+Tests for MetadataManager's batched section updates on both backends
+"""
+
+import json
+
+import pytest
+
+from infrastructure.build.core.metadata.metadata_manager import MetadataManager
+
+
+def _section(root, section_id, title, keywords):
+    section_dir = root / section_id
+    section_dir.mkdir()
+    config = {
+        'template': {'slots': {'meta': {'title': title, 'description': f'About {title}', 'keywords': keywords}}},
+        'metadata': {'created': '2026-01-01', 'modified': '2026-01-02', 'author': 'Library Team'}
+    }
+    (section_dir / 'section_config.json').write_text(json.dumps(config), encoding='utf-8')
+
+
+@pytest.fixture
+def library(tmp_path):
+    existing = {'version': '1.0.0', 'lastUpdated': '', 'entries': [
+        {'id': '00_Index', 'title': 'Index', 'type': 'document'},
+        {'id': '02_Second', 'title': 'Stale', 'type': 'document'},
+    ]}
+    (tmp_path / 'library_metadata.json').write_text(json.dumps(existing), encoding='utf-8')
+    _section(tmp_path, '01_First', 'First', ['intro'])
+    _section(tmp_path, '02_Second', 'Second', ['intro', 'seo'])
+    (tmp_path / '03_Broken').mkdir()
+    return tmp_path
+
+
+def test_json_batch_writes_once_and_keeps_order(library, monkeypatch):
+    manager = MetadataManager(library, max_workers=1)
+    saves = []
+    original_save = manager.save_metadata
+    monkeypatch.setattr(manager, 'save_metadata', lambda metadata: saves.append(1) or original_save(metadata))
+
+    results = manager.update_sections(['02_Second', '01_First', '03_Broken', '01_First'])
+
+    assert results == {'02_Second': True, '01_First': True, '03_Broken': False}
+    assert len(saves) == 1
+    entries = json.loads((library / 'library_metadata.json').read_text(encoding='utf-8'))['entries']
+    # Existing entries update in place; new ones are appended
+    assert [entry['id'] for entry in entries] == ['00_Index', '02_Second', '01_First']
+    assert entries[1]['title'] == 'Second' and entries[1]['tags'] == ['intro', 'seo']
+
+
+def test_sqlite_batch_matches_json_export(library):
+    manager = MetadataManager(library, max_workers=1, backend='sqlite', db_path=library / 'metadata.db')
+
+    results = manager.update_sections(['01_First', '02_Second', '03_Broken'])
+
+    assert results == {'01_First': True, '02_Second': True, '03_Broken': False}
+    assert [entry['id'] for entry in manager.sections_by_tag('seo')] == ['02_Second']
+    exported = json.loads((library / 'library_metadata.json').read_text(encoding='utf-8'))
+    assert [entry['id'] for entry in exported['entries']] == ['00_Index', '01_First', '02_Second']
+    assert exported == manager.store.export()
+
+
+def test_nothing_to_update_leaves_the_file_alone(library):
+    before = (library / 'library_metadata.json').read_text(encoding='utf-8')
+
+    assert MetadataManager(library, max_workers=1).update_sections(['03_Broken']) == {'03_Broken': False}
+    assert (library / 'library_metadata.json').read_text(encoding='utf-8') == before
@@ -0,0 +1,58 @@
+"""
+Tests for MetadataStore round-trips and indexed lookups
+"""
+
+from infrastructure.build.core.metadata.metadata_store import MetadataStore
+
+DOCUMENT = {
+    'version': '1.2.0',
+    'lastUpdated': '2026-01-02T03:04:05',
+    'entries': [
+        {'id': 'b-guide', 'title': 'Guide', 'type': 'guide', 'tags': ['seo', 'email'],
+         'modified': '2026-01-02', 'metadata': {'category': 'Marketing', 'extra': 'kept'}},
+        {'tags': ['seo'], 'type': 'template', 'title': 'Template', 'id': 'a-template',
+         'modified': '2026-01-01', 'categories': ['Templates']},
+    ]
+}
+
+
+def test_import_export_round_trips(tmp_path):
+    store = MetadataStore(tmp_path / 'metadata.db')
+    assert store.is_empty()
+    assert store.import_json(DOCUMENT) == 2
+
+    exported = store.export()
+    assert exported['version'] == '1.2.0'
+    assert exported['lastUpdated'] == '2026-01-02T03:04:05'
+    assert [entry['id'] for entry in exported['entries']] == ['a-template', 'b-guide']
+    assert exported['entries'][1] == DOCUMENT['entries'][0]
+    # Keys follow the schema order whatever order they were stored in
+    assert list(exported['entries'][0]) == ['id', 'title', 'type', 'tags', 'modified', 'categories']
+    store.close()
+
+    # A second store over the same file exports the same document
+    reopened = MetadataStore(tmp_path / 'metadata.db')
+    assert reopened.export() == exported
+    copy = MetadataStore(tmp_path / 'copy.db')
+    copy.import_json(exported)
+    assert copy.export() == exported
+
+
+def test_lookups_follow_upserts_and_deletes(tmp_path):
+    store = MetadataStore(tmp_path / 'metadata.db')
+    store.import_json(DOCUMENT)
+
+    assert [e['id'] for e in store.by_tag('seo')] == ['a-template', 'b-guide']
+    assert [e['id'] for e in store.by_category('Marketing')] == ['b-guide']
+    assert [e['id'] for e in store.recently_modified(1)] == ['b-guide']
+
+    updated = dict(DOCUMENT['entries'][0], tags=['email'], metadata={'category': 'Outreach'})
+    store.upsert([updated], last_updated='2026-02-01T00:00:00')
+    assert [e['id'] for e in store.by_tag('seo')] == ['a-template']
+    assert store.by_category('Marketing') == []
+    assert store.get('b-guide') == updated
+
+    store.delete(['a-template'])
+    assert store.ids() == ['b-guide']
+    assert store.by_tag('seo') == [] and store.by_category('Templates') == []
+    assert store.export()['lastUpdated'] == '2026-02-01T00:00:00'
@@ -0,0 +1,32 @@
+"""
+Tests that the package exports resolve
+"""
+
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize('package', ['infrastructure.build', 'infrastructure.build.core'])
+def test_star_import(package):
+    namespace = {}
+    exec(f'from {package} import *', namespace)
+
+    module = importlib.import_module(package)
+    for name in module.__all__:
+        assert name in namespace
+
+
+def test_template_tools_are_optional():
+    from infrastructure.build.build import Builder
+
+    builder = Builder.__new__(Builder)
+    builder.config = {}
+    try:
+        importlib.import_module('infrastructure.build.core.template')
+    except ImportError:
+        assert builder.template_generator is None
+        assert builder.template_validator is None
+    else:
+        assert builder.template_generator is not None
+        assert builder.template_validator is not None
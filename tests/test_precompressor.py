@@ -0,0 +1,48 @@
+"""
+Tests for Precompressor's sibling bookkeeping
+"""
+
+import gzip
+
+from infrastructure.build.core.assets.precompressor import Precompressor
+
+PAGE = '<html><body>' + '<p>Compressible text.</p>' * 64 + '</body></html>'
+
+
+def test_siblings_follow_their_outputs(tmp_path):
+    (tmp_path / 'index.html').write_text(PAGE, encoding='utf-8')
+    (tmp_path / 'old.html').write_text(PAGE, encoding='utf-8')
+    precompressor = Precompressor(tmp_path, use_brotli=False, max_workers=1)
+    precompressor.run()
+    assert gzip.decompress((tmp_path / 'index.html.gz').read_bytes()).decode('utf-8') == PAGE
+    assert (tmp_path / 'old.html.gz').exists()
+
+    (tmp_path / 'old.html').unlink()
+    precompressor.run()
+
+    assert not (tmp_path / 'old.html.gz').exists()
+    assert (tmp_path / 'index.html.gz').exists()
+
+
+def test_shipped_archives_are_left_alone(tmp_path):
+    (tmp_path / 'downloads').mkdir()
+    archive = tmp_path / 'downloads' / 'templates.tar.gz'
+    archive.write_bytes(gzip.compress(b'tar contents'))
+    stray = tmp_path / 'notes.txt.br'
+    stray.write_bytes(b'not ours')
+
+    Precompressor(tmp_path, use_brotli=False, max_workers=1).run()
+
+    assert archive.exists()
+    assert stray.exists()
+
+
+def test_manifest_can_live_outside_the_build(tmp_path):
+    build_dir, state_dir = tmp_path / 'build', tmp_path / 'state'
+    build_dir.mkdir()
+    (build_dir / 'index.html').write_text(PAGE, encoding='utf-8')
+
+    Precompressor(build_dir, use_brotli=False, max_workers=1, state_dir=state_dir).run()
+
+    assert (state_dir / Precompressor.STATE_FILE).exists()
+    assert not (build_dir / Precompressor.STATE_FILE).exists()
@@ -0,0 +1,107 @@
+"""
+Tests for SchemaValidator's results cache
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from infrastructure.build.core.section.schema_validator import CACHE_VERSION, HAS_JSONSCHEMA, SchemaValidator
+
+pytestmark = pytest.mark.skipif(not HAS_JSONSCHEMA, reason="jsonschema is not installed")
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / 'config' / 'schema'
+
+
+@pytest.fixture
+def validator(tmp_path):
+    for name in ('01_Alpha', '02_Beta'):
+        (tmp_path / 'content' / name).mkdir(parents=True)
+        (tmp_path / 'content' / name / SchemaValidator.CONFIG_FILE).write_text('{"id": 1}', encoding='utf-8')
+    return SchemaValidator(SCHEMA_DIR, tmp_path / 'content', tmp_path / 'cache')
+
+
+def _rewrite_cache(validator, update):
+    data = json.loads(validator.cache_path.read_text(encoding='utf-8'))
+    update(data)
+    validator.cache_path.write_text(json.dumps(data), encoding='utf-8')
+
+
+def test_second_run_is_cached(validator):
+    first = validator.validate_all()
+    second = validator.validate_all()
+
+    assert first['validated'] == 2
+    assert second['validated'] == 0 and second['cached'] == 2
+    assert second['errors'] == first['errors']
+
+
+def test_entries_without_a_stamp_are_misses(validator):
+    validator.validate_all()
+    _rewrite_cache(validator, lambda data: [entry.pop('stamp') for entry in data['files'].values()])
+
+    report = validator.validate_all()
+
+    assert report['files'] == 2 and report['validated'] == 0 and report['cached'] == 2
+
+
+def test_malformed_entries_are_revalidated(validator):
+    first = validator.validate_all()
+    _rewrite_cache(validator, lambda data: data['files'].update({
+        '01_Alpha/section_config.json': {'stamp': data['files']['01_Alpha/section_config.json']['stamp']},
+        '02_Beta/section_config.json': 'garbage'
+    }))
+
+    report = validator.validate_all()
+
+    assert report['validated'] == 2
+    assert report['errors'] == first['errors']
+
+
+def test_cache_from_another_version_is_ignored(validator):
+    validator.validate_all()
+    _rewrite_cache(validator, lambda data: data.update(version=CACHE_VERSION - 1))
+
+    assert validator.validate_all()['validated'] == 2
+
+
+def _cached_files(validator):
+    return sorted(json.loads(validator.cache_path.read_text(encoding='utf-8'))['files'])
+
+
+def test_only_changed_files_are_revalidated(validator, tmp_path):
+    validator.validate_all()
+    config = tmp_path / 'content' / '02_Beta' / SchemaValidator.CONFIG_FILE
+    config.write_text('{"id": 22}', encoding='utf-8')
+
+    report = validator.validate_all()
+    assert report['validated'] == 1 and report['cached'] == 1
+
+    # A touch changes the stamp but not the hash, so the cached result stands
+    config.write_text('{"id": 22}', encoding='utf-8')
+    report = validator.validate_all()
+    assert report['validated'] == 0 and report['cached'] == 2
+
+
+def test_removed_section_leaves_the_cache(validator, tmp_path):
+    validator.validate_all()
+    (tmp_path / 'content' / '02_Beta' / SchemaValidator.CONFIG_FILE).unlink()
+    (tmp_path / 'content' / '02_Beta').rmdir()
+
+    report = validator.validate_all()
+
+    assert report['files'] == 1 and report['cached'] == 1
+    assert '02_Beta/section_config.json' not in report['errors']
+    assert _cached_files(validator) == ['01_Alpha/section_config.json']
+
+
+def test_removed_config_is_reported_and_not_cached(validator, tmp_path):
+    validator.validate_all()
+    (tmp_path / 'content' / '02_Beta' / SchemaValidator.CONFIG_FILE).unlink()
+
+    report = validator.validate_all()
+
+    assert report['files'] == 2 and report['validated'] == 0 and report['cached'] == 1
+    assert report['errors']['02_Beta/section_config.json'] == [{'path': '$', 'message': 'File not found'}]
+    assert _cached_files(validator) == ['01_Alpha/section_config.json']
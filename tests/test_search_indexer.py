@@ -0,0 +1,59 @@
+"""
+Tests for SearchIndexer rebuilding its index from stored section terms
+"""
+
+import json
+import logging
+
+from infrastructure.build.core.search import SearchIndexer
+
+
+def _indexer(tmp_path):
+    return SearchIndexer(tmp_path / 'build' / 'search', tmp_path / 'cache' / 'search')
+
+
+def test_unindexed_lists_sections_without_stored_terms(tmp_path):
+    indexer = _indexer(tmp_path)
+    indexer.extract('01_Alpha', 'Alpha', '<p>apples and pears</p>')
+
+    assert indexer.unindexed(['01_Alpha', '02_Beta']) == ['02_Beta']
+
+
+def test_rebuild_without_state_reports_missing_sections(tmp_path, caplog):
+    indexer = _indexer(tmp_path)
+    indexer.extract('01_Alpha', 'Alpha', '<p>apples and pears</p>')
+    indexer.extract('02_Beta', 'Beta', '<p>bananas</p>')
+    indexer.update(['01_Alpha', '02_Beta'], ['01_Alpha', '02_Beta'])
+
+    (indexer.docs_dir / SearchIndexer.STATE_FILE).unlink()
+    indexer.forget('02_Beta')
+    with caplog.at_level(logging.ERROR):
+        indexer.update(['01_Alpha', '02_Beta'], [])
+    assert '02_Beta' in caplog.text
+
+    indexer.extract('02_Beta', 'Beta', '<p>bananas</p>')
+    indexer.update(['01_Alpha', '02_Beta'], ['02_Beta'])
+    meta = json.loads((indexer.index_dir / SearchIndexer.META_FILE).read_text(encoding='utf-8'))
+    assert meta['doc_count'] == 2
+
+
+def test_state_stays_out_of_the_published_index(tmp_path):
+    indexer = _indexer(tmp_path)
+    indexer.extract('01_Alpha', 'Alpha', '<p>apples and pears</p>')
+    indexer.update(['01_Alpha'], ['01_Alpha'])
+
+    assert not (indexer.index_dir / SearchIndexer.STATE_FILE).exists()
+    assert (indexer.docs_dir / SearchIndexer.STATE_FILE).exists()
+
+
+def test_deleted_index_is_rebuilt_from_state(tmp_path):
+    indexer = _indexer(tmp_path)
+    indexer.extract('01_Alpha', 'Alpha', '<p>apples and pears</p>')
+    indexer.update(['01_Alpha'], ['01_Alpha'])
+    shards = sorted(p.name for p in (indexer.index_dir / SearchIndexer.SHARD_DIR).iterdir())
+
+    for path in (indexer.index_dir / SearchIndexer.SHARD_DIR).iterdir():
+        path.unlink()
+    indexer.update(['01_Alpha'], [])
+
+    assert sorted(p.name for p in (indexer.index_dir / SearchIndexer.SHARD_DIR).iterdir()) == shards
@@ -0,0 +1,47 @@
+"""
+Tests for SiteIndex link checks and the LinkGraph report
+"""
+
+from infrastructure.build.core.content.link_graph import LinkGraph
+from infrastructure.build.core.content.markdown_preprocessor import Link
+from infrastructure.build.core.content.site_index import SiteIndex
+
+
+def _index(tmp_path):
+    section = tmp_path / '01_Alpha'
+    (section / 'images').mkdir(parents=True)
+    for name in ('README.md', 'notes.md', 'guide.pdf', 'images/logo.png'):
+        (section / name).write_text('x', encoding='utf-8')
+    (tmp_path / '02_Beta').mkdir()
+    return SiteIndex.scan(tmp_path, [section, tmp_path / '02_Beta'], ['static/site.css'])
+
+
+def _broken(index, *hrefs):
+    return index.check_links('01_Alpha', [Link('text', href, href.endswith('.png')) for href in hrefs])[1]
+
+
+def test_links_to_outputs_resolve(tmp_path):
+    index = _index(tmp_path)
+
+    assert _broken(index, 'images/logo.png', '../02_Beta/', '../02_Beta', '/static/site.css', '#top') == []
+
+
+def test_sources_that_are_not_published_are_broken(tmp_path):
+    index = _index(tmp_path)
+
+    assert _broken(index, 'notes.md', 'notes.html', 'guide.pdf', 'README.md') == \
+        ['notes.md', 'notes.html', 'guide.pdf', 'README.md']
+
+
+def test_link_graph_report_is_stable(tmp_path):
+    graph = LinkGraph()
+    graph.record('01_Alpha', {'02_Beta'}, [])
+    graph.record('02_Beta', set(), ['missing.html'])
+    path = tmp_path / 'link_graph.json'
+
+    graph.save(path)
+    first = path.read_text(encoding='utf-8')
+    graph.save(path)
+
+    assert path.read_text(encoding='utf-8') == first
+    assert 'generated' not in graph.report()
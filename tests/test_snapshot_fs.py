@@ -0,0 +1,89 @@
+"""
+Tests for SnapshotFS staleness checks by mtime, size and inode
+"""
+
+import os
+
+from infrastructure.build.core.vfs import SnapshotFS
+
+
+def _pin_mtime(path, stamp):
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_unchanged_file_is_served_from_memory(tmp_path):
+    page = tmp_path / 'page.md'
+    page.write_text('one', encoding='utf-8')
+    fs = SnapshotFS()
+
+    assert fs.read_text(page) == 'one'
+    assert fs.read_text(page) == 'one'
+    assert (fs.hits, fs.misses) == (1, 1)
+
+
+def test_mtime_change_alone_is_a_miss(tmp_path):
+    page = tmp_path / 'page.md'
+    page.write_text('one', encoding='utf-8')
+    stamp = page.stat().st_mtime_ns
+    fs = SnapshotFS()
+    fs.read_text(page)
+
+    page.write_text('two', encoding='utf-8')
+    _pin_mtime(page, stamp + 1_000_000_000)
+
+    assert fs.read_text(page) == 'two'
+    assert fs.misses == 2
+
+
+def test_size_change_alone_is_a_miss(tmp_path):
+    page = tmp_path / 'page.md'
+    page.write_text('one', encoding='utf-8')
+    stamp = page.stat().st_mtime_ns
+    fs = SnapshotFS()
+    fs.read_text(page)
+
+    page.write_text('three', encoding='utf-8')
+    _pin_mtime(page, stamp)
+
+    assert fs.read_text(page) == 'three'
+    assert fs.misses == 2
+
+
+def test_replaced_file_is_a_miss_by_inode(tmp_path):
+    page = tmp_path / 'page.md'
+    page.write_text('one', encoding='utf-8')
+    stamp = page.stat().st_mtime_ns
+    fs = SnapshotFS()
+    fs.read_text(page)
+
+    # Same size and mtime, but an editor's atomic save swapped in a new file
+    replacement = tmp_path / 'page.md.tmp'
+    replacement.write_text('two', encoding='utf-8')
+    _pin_mtime(replacement, stamp)
+    os.replace(replacement, page)
+
+    assert fs.read_text(page) == 'two'
+    assert fs.misses == 2
+
+
+def test_listing_follows_directory_changes(tmp_path):
+    fs = SnapshotFS()
+    (tmp_path / 'a.pdf').write_bytes(b'a')
+    assert [p.name for p in fs.glob(tmp_path, '*.pdf')] == ['a.pdf']
+
+    (tmp_path / 'b.pdf').write_bytes(b'b')
+    fs.invalidate(tmp_path / 'b.pdf')
+    assert [p.name for p in fs.glob(tmp_path, '*.pdf')] == ['a.pdf', 'b.pdf']
+
+
+def test_least_recently_used_files_leave_first(tmp_path):
+    fs = SnapshotFS(max_bytes=10)
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_bytes(name.encode() * 4)
+    fs.read_bytes(tmp_path / 'a')
+    fs.read_bytes(tmp_path / 'b')
+    fs.read_bytes(tmp_path / 'c')
+
+    fs.read_bytes(tmp_path / 'c')
+    fs.read_bytes(tmp_path / 'a')
+    assert (fs.hits, fs.misses) == (1, 4)